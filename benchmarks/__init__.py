@@ -0,0 +1,9 @@
+"""
+Load and latency benchmarks for the event API.
+
+Run ``python -m benchmarks --help``. A run seeds (or reuses) a dedicated
+SQLite database at the requested scale, replays each scenario through
+the Django test client sequentially and from concurrent threads, and
+reports latency percentiles and queries per request as JSON that can be
+saved as a baseline for later comparisons.
+"""
@@ -0,0 +1,124 @@
+"""
+Command-line entry point: ``python -m benchmarks``.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+
+
+def parse_args(argv=None):
+    from .scales import SCALES
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--scenario', action='append', help='Run only this scenario (repeatable).')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed sequential requests per scenario.')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads for the concurrent run (0 skips it).')
+    parser.add_argument('--concurrent-requests', type=int, default=400)
+    parser.add_argument('--database', help='SQLite file to seed and reuse (default: benchmarks/bench-<scale>.sqlite3).')
+    parser.add_argument('--reseed', action='store_true', help='Recreate the database even if it is already seeded.')
+    parser.add_argument('--with-cache', action='store_true', help='Keep the response cache on (measures cache hits).')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout.')
+    parser.add_argument('--baseline', help='Report to compare against; exits 1 on regressions.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative latency growth vs the baseline.')
+    return parser.parse_args(argv)
+
+
+def configure(args):
+    """Point Django at a dedicated benchmark database with production-like settings."""
+    sys.path.insert(0, str(BENCHMARK_DIR.parent))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management.settings')
+    os.environ['DEBUG'] = 'False'
+    # Scenarios replay one user's writes far faster than any real client
+    os.environ['THROTTLE_ENABLED'] = 'False'
+    if not args.with_cache:
+        os.environ['EVENTS_RESPONSE_CACHE_TIMEOUT'] = '0'
+
+    import django
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+    connection.settings_dict['TEST']['NAME'] = args.database or str(BENCHMARK_DIR / f'bench-{args.scale}.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=not args.reseed)
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure(args)
+
+    import django
+    from django.contrib.auth.models import User
+    from django.db import connection
+
+    from events.models import Event, RSVP, Review
+    from .compare import compare
+    from .fixtures import is_seeded, seed
+    from .scales import SCALES
+    from .runner import run_concurrent, run_sequential
+    from .scenarios import SCENARIOS, SCENARIOS_BY_NAME, Context
+
+    scale = SCALES[args.scale]
+    if not is_seeded(scale):
+        if User.objects.exists():
+            log('The benchmark database holds a different dataset; rerun with --reseed.')
+            return 2
+        seed(scale, log=log)
+
+    scenarios = [SCENARIOS_BY_NAME[name] for name in args.scenario] if args.scenario else SCENARIOS
+    context = Context.build()
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'scale': args.scale,
+            'dataset': scale.as_dict(),
+            'rows': {
+                'users': User.objects.count(),
+                'events': Event.objects.count(),
+                'rsvps': RSVP.objects.count(),
+                'reviews': Review.objects.count(),
+            },
+            'iterations': args.iterations,
+            'response_cache': args.with_cache,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'scenarios': {},
+    }
+    for scenario in scenarios:
+        log(f'Running {scenario.name}')
+        results = {'sequential': run_sequential(scenario, context, args.iterations, args.warmup)}
+        if args.concurrency:
+            results['concurrent'] = run_concurrent(scenario, context, args.concurrent_requests, args.concurrency)
+        report['scenarios'][scenario.name] = results
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            log(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Regression checks against a saved baseline report.
+"""
+
+# Latency is noisy, so it gets a relative tolerance; query counts are exact
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+EXACT_METRICS = ('queries_per_request', 'errors')
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    Return human-readable regressions of ``current`` against ``baseline``.
+
+    A latency percentile regresses when it grows by more than
+    ``tolerance`` (a fraction); queries per request and errors regress on
+    any increase.
+    """
+    regressions = []
+    for name, modes in current['scenarios'].items():
+        for mode, result in modes.items():
+            previous = baseline.get('scenarios', {}).get(name, {}).get(mode)
+            if not previous:
+                continue
+            for metric in LATENCY_METRICS + EXACT_METRICS:
+                old, new = previous.get(metric), result.get(metric)
+                if old is None or new is None:
+                    continue
+                limit = old * (1 + tolerance) if metric in LATENCY_METRICS else old
+                if new > limit:
+                    regressions.append(f'{name}/{mode} {metric}: {old} -> {new}')
+    return regressions
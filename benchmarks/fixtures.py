@@ -0,0 +1,134 @@
+"""
+Deterministic bulk fixture generation.
+
+Users and events go through ``bulk_create``; RSVPs and reviews, the
+largest tables, are inserted with ``executemany`` to skip model
+instantiation. Derived data (stats, search index, planner statistics) is
+rebuilt once at the end instead of row by row.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from events import geo
+from events.models import Event, RSVP, Review
+from events.search import get_search_backend
+from events.stats import rebuild_stats
+
+WORDS = [
+    'summit', 'python', 'django', 'music', 'festival', 'startup', 'meetup', 'design', 'data', 'cloud',
+    'yoga', 'marathon', 'art', 'film', 'food', 'workshop', 'hackathon', 'security', 'mobile', 'jazz',
+]
+CITIES = [
+    ('Mumbai', 19.0760, 72.8777), ('Pune', 18.5204, 73.8567), ('Delhi', 28.6139, 77.2090),
+    ('Bengaluru', 12.9716, 77.5946), ('Chennai', 13.0827, 80.2707),
+]
+STATUSES = [status for status, _ in RSVP.STATUS_CHOICES]
+
+
+def is_seeded(scale):
+    return User.objects.count() == scale.users and Event.objects.count() == scale.events
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_many(model, columns, rows, batch_size):
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(connection.ops.quote_name(column) for column in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    sql = f'INSERT INTO {table} ({names}) VALUES ({placeholders})'
+    with connection.cursor() as cursor:
+        for batch in _batches(rows, batch_size):
+            with transaction.atomic():
+                cursor.executemany(sql, batch)
+
+
+def seed(scale, seed=42, batch_size=5000, log=print):
+    """Populate an empty database with ``scale`` worth of rows."""
+    rng = random.Random(seed)
+    now = timezone.now().replace(microsecond=0)
+    password = make_password('benchmark')
+
+    log(f'Creating {scale.users} users')
+    for batch in _batches(range(scale.users), batch_size):
+        User.objects.bulk_create([
+            User(username=f'bench{i}', email=f'bench{i}@example.com', password=password) for i in batch
+        ])
+    user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+
+    log(f'Creating {scale.events} events')
+
+    def make_event(i):
+        city, latitude, longitude = CITIES[i % len(CITIES)]
+        latitude += rng.uniform(-0.2, 0.2)
+        longitude += rng.uniform(-0.2, 0.2)
+        start = now + timedelta(hours=rng.randint(-24 * 90, 24 * 365))
+        return Event(
+            title=' '.join(rng.sample(WORDS, 3)).title(),
+            description=' '.join(rng.choices(WORDS, k=20)),
+            # The first user RSVPs through the API in the write scenarios, so never organizes
+            organizer_id=user_ids[1 + i % (len(user_ids) - 1)],
+            location=f'{city} Hall {i % scale.venues_per_city}',
+            latitude=latitude,
+            longitude=longitude,
+            geohash=geo.encode(latitude, longitude),
+            start_time=start,
+            end_time=start + timedelta(hours=rng.randint(1, 8)),
+            is_public=rng.random() < 0.8,
+        )
+
+    for batch in _batches(range(scale.events), batch_size):
+        Event.objects.bulk_create([make_event(i) for i in batch])
+    events = list(Event.objects.order_by('pk').values_list('pk', 'organizer_id'))
+
+    def attendees(organizer_id, count):
+        picked = set()
+        while len(picked) < min(count, len(user_ids) - 2):
+            user_id = user_ids[rng.randrange(1, len(user_ids))]
+            if user_id != organizer_id:
+                picked.add(user_id)
+        return picked
+
+    log(f'Creating {scale.events * scale.rsvps_per_event} RSVPs')
+    _insert_many(RSVP, ['event_id', 'user_id', 'status', 'created_at'], (
+        (event_id, user_id, rng.choice(STATUSES), now)
+        for event_id, organizer_id in events
+        for user_id in attendees(organizer_id, scale.rsvps_per_event)
+    ), batch_size)
+
+    log(f'Creating {scale.events * scale.reviews_per_event} reviews')
+    _insert_many(Review, ['event_id', 'user_id', 'rating', 'comment', 'created_at'], (
+        (event_id, user_id, rng.randint(1, 5), ' '.join(rng.choices(WORDS, k=8)),
+         now - timedelta(minutes=rng.randint(0, 10 ** 5)))
+        for event_id, organizer_id in events
+        for user_id in attendees(organizer_id, scale.reviews_per_event)
+    ), batch_size)
+
+    log(f'Creating {scale.blacklisted_tokens} blacklisted refresh tokens')
+    _insert_many(OutstandingToken, ['user_id', 'jti', 'token', 'created_at', 'expires_at'], (
+        (user_ids[i % len(user_ids)], f'bench-{i:032x}', '', now, now + timedelta(days=1 if i % 2 else -1))
+        for i in range(scale.blacklisted_tokens)
+    ), batch_size)
+    token_ids = OutstandingToken.objects.order_by('pk').values_list('pk', flat=True)
+    _insert_many(BlacklistedToken, ['token_id', 'blacklisted_at'], ((pk, now) for pk in token_ids), batch_size)
+
+    log('Rebuilding stats and search index')
+    rebuild_stats()
+    get_search_backend().rebuild()
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,148 @@
+"""
+RSVP contention stress test: ``python -m benchmarks.rsvp_stress``.
+
+Many threads RSVP "Going" to one capacity-limited event at once through
+the API, then a share of the attendees switch to "Not Going" concurrently
+so the waitlist gets promoted. After each phase the seat counters and the
+RSVP rows must agree and the event must never hold more Going RSVPs than
+seats. Throughput and latency are reported per phase.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import timedelta
+
+
+class Oversold(AssertionError):
+    pass
+
+
+def _hammer(requests, threads):
+    """Run ``(user, method, url, data)`` requests from ``threads`` threads; returns timings and failures."""
+    from django.db import connections
+    from rest_framework.test import APIClient
+
+    from .runner import percentile
+
+    chunks = [requests[i::threads] for i in range(threads)]
+    latencies, failures = [], []
+    start = threading.Barrier(len(chunks) + 1)
+
+    def worker(chunk):
+        client = APIClient()
+        timings = []
+        try:
+            start.wait()
+            for user, method, url, data in chunk:
+                client.force_authenticate(user=user)
+                began = time.perf_counter()
+                response = getattr(client, method)(url, data, format='json')
+                timings.append(time.perf_counter() - began)
+                if response.status_code >= 300:
+                    failures.append(f'{method.upper()} {url}: {response.status_code} {response.content[:200]!r}')
+        finally:
+            latencies.extend(timings)
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    for thread in workers:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        'requests': len(requests),
+        'errors': len(failures),
+        'rsvps_per_second': round(len(requests) / elapsed, 1),
+        'p50_ms': round(percentile(latencies_ms, 50), 2),
+        'p99_ms': round(percentile(latencies_ms, 99), 2),
+    }, failures
+
+
+def _check(event, expected_going):
+    """Compare the seat counters with the RSVP rows; raises ``Oversold`` on any disagreement."""
+    from django.db.models import Count
+
+    from events.models import EventStats
+
+    rows = dict(event.rsvps.order_by().values_list('status').annotate(total=Count('pk')))
+    stats = EventStats.objects.get(event=event)
+    going, waitlisted = rows.get('Going', 0), rows.get('Waitlisted', 0)
+    if going > event.capacity:
+        raise Oversold(f'{going} Going RSVPs for {event.capacity} seats')
+    if (stats.going_count, stats.waitlisted_count) != (going, waitlisted):
+        raise Oversold(
+            f'Counters say {stats.going_count} going / {stats.waitlisted_count} waitlisted, '
+            f'rows say {going} / {waitlisted}'
+        )
+    if going != expected_going:
+        raise Oversold(f'{going} Going RSVPs, expected {expected_going} (free seats left unclaimed)')
+    return {'going': going, 'waitlisted': waitlisted, 'not_going': rows.get('Not Going', 0)}
+
+
+def run(attendees=2000, capacity=500, threads=16, churn=0.2):
+    """Create a fresh event and attendees, run both phases and return the report."""
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+
+    from events.models import Event
+
+    now = timezone.now()
+    organizer = User.objects.create_user(username=f'stress-organizer-{time.time_ns()}')
+    event = Event.objects.create(
+        title='Launch', description='Stress test', organizer=organizer, location=f'Stress hall {organizer.pk}',
+        start_time=now + timedelta(days=30), end_time=now + timedelta(days=30, hours=2), capacity=capacity,
+    )
+    users = User.objects.bulk_create([
+        User(username=f'stress-{organizer.pk}-{i}') for i in range(attendees)
+    ])
+
+    url = f'/api/events/{event.id}/rsvp/'
+    rush, failures = _hammer([(user, 'post', url, {'status': 'Going'}) for user in users], threads)
+    rush.update(_check(event, min(capacity, attendees)))
+
+    leaving = list(event.rsvps.filter(status='Going').order_by('?').values_list('user_id', flat=True))
+    leaving = leaving[:int(len(leaving) * churn)]
+    by_id = {user.pk: user for user in users}
+    changes = [
+        (by_id[user_id], 'patch', f'{url}{user_id}/', {'status': 'Not Going'}) for user_id in leaving
+    ]
+    churned, churn_failures = _hammer(changes, threads)
+    churned.update(_check(event, min(capacity, attendees - len(leaving))))
+    return {
+        'attendees': attendees, 'capacity': capacity, 'threads': threads,
+        'rush': rush, 'churn': churned, 'failures': (failures + churn_failures)[:10],
+    }
+
+
+def main(argv=None):
+    from .__main__ import BENCHMARK_DIR, configure, log
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.rsvp_stress', description=__doc__)
+    parser.add_argument('--attendees', type=int, default=2000)
+    parser.add_argument('--capacity', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--churn', type=float, default=0.2, help='Share of Going attendees who then cancel.')
+    parser.add_argument('--database', default=str(BENCHMARK_DIR / 'rsvp-stress.sqlite3'),
+                        help='SQLite file, recreated on every run.')
+    args = parser.parse_args(argv)
+    args.scale, args.reseed, args.with_cache = None, True, False
+    configure(args)
+
+    try:
+        report = run(args.attendees, args.capacity, args.threads, args.churn)
+    except Oversold as exc:
+        log(f'OVERSOLD {exc}')
+        return 1
+    print(json.dumps(report, indent=2))
+    return 1 if report['rush']['errors'] or report['churn']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Timed execution of scenarios and latency summaries.
+
+Latency and query counts cover successful requests only; failures (e.g.
+lock timeouts under concurrent writes) are reported as ``errors``.
+"""
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections
+from django.test import Client
+
+
+class QueryCounter:
+    """Execute wrapper counting the statements a request issues."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def summarize(latencies, queries, errors, wall_time):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'p50_ms': _ms(percentile(ordered, 50)),
+        'p95_ms': _ms(percentile(ordered, 95)),
+        'p99_ms': _ms(percentile(ordered, 99)),
+        'mean_ms': _ms(statistics.fmean(ordered)) if ordered else None,
+        'max_ms': _ms(ordered[-1]) if ordered else None,
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+        'throughput_rps': round(len(latencies) / wall_time, 1) if wall_time else None,
+    }
+
+
+def _timed_request(client, scenario, context, i):
+    """Return (seconds, queries, ok) for iteration ``i``."""
+    if scenario.prepare:
+        scenario.prepare(context, i)
+    method, path, data = scenario.build(context, i)
+    extra = {'HTTP_AUTHORIZATION': f'Bearer {context.access_token}'} if scenario.authenticated else {}
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        if data is not None:
+            response = getattr(client, method)(path, data, **extra)
+        else:
+            response = getattr(client, method)(path, **extra)
+        elapsed = time.perf_counter() - start
+    return elapsed, counter.count, response.status_code in scenario.expected_status
+
+
+def run_sequential(scenario, context, iterations, warmup=5):
+    client = Client(raise_request_exception=False)
+    for i in range(warmup):
+        _timed_request(client, scenario, context, i)
+    latencies, queries, errors = [], [], 0
+    start = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        elapsed, count, ok = _timed_request(client, scenario, context, i)
+        if ok:
+            latencies.append(elapsed)
+            queries.append(count)
+        errors += not ok
+    return summarize(latencies, queries, errors, time.perf_counter() - start)
+
+
+def run_concurrent(scenario, context, requests, concurrency):
+    """Spread ``requests`` iterations over ``concurrency`` threads, each with its own client and connection."""
+    lock = threading.Lock()
+    latencies, queries, errors = [], [], [0]
+
+    def worker(offset):
+        client = Client(raise_request_exception=False)
+        try:
+            for i in range(offset, requests, concurrency):
+                elapsed, count, ok = _timed_request(client, scenario, context, i)
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                        queries.append(count)
+                    errors[0] += not ok
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    result = summarize(latencies, queries, errors[0], time.perf_counter() - start)
+    result['concurrency'] = concurrency
+    return result
@@ -0,0 +1,27 @@
+"""
+Dataset sizes. Kept free of Django imports so the CLI can list them
+before settings are configured.
+"""
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    events: int
+    rsvps_per_event: int
+    reviews_per_event: int
+    venues_per_city: int = 40
+    # Rotated refresh tokens already in the blacklist (half of them expired)
+    blacklisted_tokens: int = 0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+SCALES = {
+    'tiny': Scale(users=50, events=200, rsvps_per_event=3, reviews_per_event=1, blacklisted_tokens=500),
+    'small': Scale(users=2000, events=5000, rsvps_per_event=5, reviews_per_event=2, blacklisted_tokens=20000),
+    'medium': Scale(users=20000, events=50000, rsvps_per_event=10, reviews_per_event=3, blacklisted_tokens=200000),
+    'large': Scale(users=50000, events=100000, rsvps_per_event=20, reviews_per_event=5, blacklisted_tokens=1000000),
+}
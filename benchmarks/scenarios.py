@@ -0,0 +1,114 @@
+"""
+Benchmark scenarios: one representative request per endpoint.
+
+Each scenario turns an iteration number into a request, so runs are
+repeatable and spread over many rows instead of hammering one cached
+page. ``prepare`` hooks run untimed before each request.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.blacklist import FilteredRefreshToken
+
+from events.models import Event, RSVP
+
+from .fixtures import CITIES, WORDS
+
+
+@dataclass
+class Context:
+    """Row ids and precomputed URLs shared by the scenarios."""
+    event_ids: list
+    reviewed_event_ids: list
+    first_user_id: int
+    access_token: str = ''
+    cursor_urls: list = field(default_factory=list)
+    refresh_tokens: dict = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, sample_size=500, seed=7, deep_pages=50):
+        rng = random.Random(seed)
+        event_ids = list(Event.objects.filter(is_public=True).values_list('pk', flat=True)[:sample_size * 10])
+        rng.shuffle(event_ids)
+        reviewed = list(Event.objects.filter(stats__review_count__gt=0).values_list('pk', flat=True)[:sample_size])
+        context = cls(
+            event_ids=event_ids[:sample_size],
+            reviewed_event_ids=reviewed or event_ids[:sample_size],
+            first_user_id=User.objects.order_by('pk').values_list('pk', flat=True).first(),
+        )
+        context.access_token = str(AccessToken.for_user(User.objects.get(pk=context.first_user_id)))
+        # Walk the feed once so the deep-page scenario replays real cursors
+        client, url = Client(), '/api/events/?page_size=20'
+        while url and len(context.cursor_urls) < deep_pages:
+            context.cursor_urls.append(url)
+            url = client.get(url).json().get('next')
+        return context
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable  # (context, i) -> (method, path, data)
+    prepare: Optional[Callable] = None  # (context, i) -> None, untimed
+    expected_status: tuple = (200,)
+    authenticated: bool = False  # send the first user's access token
+
+
+def _pick(items, i):
+    return items[i % len(items)]
+
+
+def _get(path, **params):
+    return 'get', f'{path}?{urlencode(params)}' if params else path, None
+
+
+def _clear_first_user_rsvp(context, i):
+    # The RSVP view always acts as the first user; free the seat it is about to take
+    RSVP.objects.filter(event_id=_pick(context.event_ids, i), user_id=context.first_user_id).delete()
+
+
+def _mint_refresh_token(context, i):
+    # Rotation blacklists each refresh token, so every iteration needs a new one
+    user = User(pk=context.first_user_id)
+    context.refresh_tokens[i] = str(FilteredRefreshToken.for_user(user))
+
+
+SCENARIOS = [
+    Scenario('event_list', lambda c, i: _get('/api/events/', page_size=(10, 20, 50)[i % 3])),
+    Scenario('event_list_filtered', lambda c, i: _get(
+        '/api/events/', is_public='true', ordering=('start_time', '-created_at')[i % 2]
+    )),
+    Scenario('event_list_deep_pages', lambda c, i: ('get', _pick(c.cursor_urls, i), None)),
+    Scenario('event_search', lambda c, i: _get('/api/events/', search=_pick(WORDS, i))),
+    Scenario('event_near', lambda c, i: _get(
+        '/api/events/', near='{},{}'.format(*_pick(CITIES, i)[1:]), radius_km=(2, 5, 15)[i % 3]
+    )),
+    Scenario('event_detail', lambda c, i: ('get', f'/api/events/{_pick(c.event_ids, i)}/', None)),
+    # Lists authenticate from the token claims; the detail view resolves (and caches) the user
+    Scenario(
+        'event_list_authenticated', lambda c, i: _get('/api/events/', page_size=20), authenticated=True,
+    ),
+    Scenario(
+        'event_detail_authenticated', lambda c, i: ('get', f'/api/events/{_pick(c.event_ids, i)}/', None),
+        authenticated=True,
+    ),
+    Scenario('review_list', lambda c, i: ('get', f'/api/events/{_pick(c.reviewed_event_ids, i)}/reviews/', None)),
+    Scenario(
+        'rsvp_create',
+        lambda c, i: ('post', f'/api/events/{_pick(c.event_ids, i)}/rsvp/', {'status': 'Going'}),
+        prepare=_clear_first_user_rsvp,
+        expected_status=(201,),
+    ),
+    Scenario(
+        'token_refresh',
+        lambda c, i: ('post', '/api/token/refresh/', {'refresh': c.refresh_tokens.pop(i)}),
+        prepare=_mint_refresh_token,
+    ),
+]
+SCENARIOS_BY_NAME = {scenario.name: scenario for scenario in SCENARIOS}
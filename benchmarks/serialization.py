@@ -0,0 +1,112 @@
+"""
+Serialization microbenchmark: ``python -m benchmarks.serialization``.
+
+Times turning rows into response bytes through the serializer and
+``JSONRenderer`` versus ``.values()`` rows through a ``RowBuilder`` and
+``FastJSONRenderer``, reported per 1k rows. Both paths must produce the
+same bytes before anything is timed.
+"""
+import argparse
+import json
+import sys
+import time
+
+
+class OutputMismatch(AssertionError):
+    pass
+
+
+def best_of(function, repeat):
+    """Fastest of ``repeat`` runs, in seconds (the least noisy estimate for CPU-bound code)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare_paths(name, queryset, serializer_class, builder, rows, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from event_management.renderers import FastJSONRenderer
+
+    queryset = queryset.order_by('pk')[:rows]
+    instances = list(queryset)
+    values = list(builder.values(queryset))
+    if not instances:
+        raise ValueError(f'{name}: no rows to serialize; seed the benchmark database first.')
+
+    def reference():
+        return JSONRenderer().render(serializer_class(instances, many=True).data)
+
+    def fast():
+        return FastJSONRenderer().render(builder.build(values))
+
+    if reference() != fast():
+        raise OutputMismatch(f'{name}: the fast path does not match the serializer output')
+
+    per_1k = 1000 / len(instances)
+    result = {
+        'rows': len(instances),
+        'fetch_ms': {
+            'serializer': best_of(lambda: list(queryset.all()), repeat) * per_1k * 1000,
+            'fast': best_of(lambda: list(builder.values(queryset.all())), repeat) * per_1k * 1000,
+        },
+        'render_ms': {
+            'serializer': best_of(reference, repeat) * per_1k * 1000,
+            'fast': best_of(fast, repeat) * per_1k * 1000,
+        },
+    }
+    for timings in (result['fetch_ms'], result['render_ms']):
+        for key in timings:
+            timings[key] = round(timings[key], 3)
+    result['render_speedup'] = round(result['render_ms']['serializer'] / result['render_ms']['fast'], 2)
+    total = {path: result['fetch_ms'][path] + result['render_ms'][path] for path in ('serializer', 'fast')}
+    result['total_speedup'] = round(total['serializer'] / total['fast'], 2)
+    return result
+
+
+def run(rows=1000, repeat=5):
+    """Benchmark the event and review list representations against the current database."""
+    from events.fastpath import event_row_builder, review_row_builder
+    from events.models import Event, Review
+    from events.serializers import EventSerializer, ReviewSerializer
+
+    return {
+        'events': compare_paths(
+            'events', Event.objects.with_aggregates(), EventSerializer, event_row_builder(), rows, repeat
+        ),
+        'reviews': compare_paths('reviews', Review.objects.all(), ReviewSerializer, review_row_builder(), rows, repeat),
+    }
+
+
+def main(argv=None):
+    from .__main__ import configure, log
+    from .scales import SCALES
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization', description=__doc__)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--database', help='SQLite file to seed and reuse (default: benchmarks/bench-<scale>.sqlite3).')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the fastest is reported.')
+    args = parser.parse_args(argv)
+    args.reseed, args.with_cache = False, False
+    configure(args)
+
+    from .fixtures import is_seeded, seed
+
+    scale = SCALES[args.scale]
+    if not is_seeded(scale):
+        seed(scale, log=log)
+    try:
+        report = run(args.rows, args.repeat)
+    except OutputMismatch as exc:
+        log(str(exc))
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+WSGI vs ASGI throughput: ``python -m benchmarks.servers``.
+
+Replays the same read mix (event feed, event detail, review list) against
+one seeded database through Django's WSGI handler, with one thread per
+concurrent client, and through its ASGI handler, with one task per
+concurrent client on a single event loop serving the async views. Both
+run in-process, so the numbers compare the handlers and views rather
+than a particular server. For each concurrency level the report gives
+throughput, p50/p99 latency and the peak number of threads in use.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request_paths(context, requests, prefix):
+    """``requests`` paths cycling through the read mix, under ``/api/<prefix>``."""
+    mix = [
+        lambda i: 'events/?page_size=20',
+        lambda i: f'events/{context.event_ids[i % len(context.event_ids)]}/',
+        lambda i: f'events/{context.reviewed_event_ids[i % len(context.reviewed_event_ids)]}/reviews/',
+    ]
+    return [f'/api/{prefix}{mix[i % len(mix)](i)}' for i in range(requests)]
+
+
+def _summary(latencies, errors, wall_time, peak_threads):
+    from .runner import percentile
+    ordered = sorted(latencies)
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / wall_time, 1),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2) if ordered else None,
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2) if ordered else None,
+        'peak_threads': peak_threads,
+    }
+
+
+def run_wsgi(paths, concurrency):
+    from django.db import connections
+    from django.test import Client
+
+    lock = threading.Lock()
+    latencies, errors, peak = [], [0], [threading.active_count()]
+
+    def worker(offset):
+        client = Client(raise_request_exception=False)
+        try:
+            for path in paths[offset::concurrency]:
+                start = time.perf_counter()
+                response = client.get(path)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if response.status_code == 200:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+                    peak[0] = max(peak[0], threading.active_count())
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return _summary(latencies, errors[0], time.perf_counter() - start, peak[0])
+
+
+def run_asgi(paths, concurrency):
+    from django.test import AsyncClient
+
+    latencies, errors, peak = [], [0], [threading.active_count()]
+
+    async def worker(offset):
+        client = AsyncClient(raise_request_exception=False)
+        for path in paths[offset::concurrency]:
+            start = time.perf_counter()
+            response = await client.get(path)
+            elapsed = time.perf_counter() - start
+            if response.status_code == 200:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+            peak[0] = max(peak[0], threading.active_count())
+
+    async def run():
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return _summary(latencies, errors[0], time.perf_counter() - start, peak[0])
+
+
+def main(argv=None):
+    from .__main__ import configure, log
+    from .scales import SCALES
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.servers', description=__doc__)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--concurrency', type=int, action='append', help='Concurrent clients (repeatable; default 1, 16, 64, 256).')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per handler and concurrency level.')
+    parser.add_argument('--database', help='SQLite file to seed and reuse (default: benchmarks/bench-<scale>.sqlite3).')
+    parser.add_argument('--reseed', action='store_true', help='Recreate the database even if it is already seeded.')
+    args = parser.parse_args(argv)
+    # The async views never cache, so neither side may
+    args.with_cache = False
+    configure(args)
+
+    from django.contrib.auth.models import User
+
+    from .fixtures import is_seeded, seed
+    from .scenarios import Context
+
+    scale = SCALES[args.scale]
+    if not is_seeded(scale):
+        if User.objects.exists():
+            log('The benchmark database holds a different dataset; rerun with --reseed.')
+            return 2
+        seed(scale, log=log)
+
+    context = Context.build(deep_pages=1)
+    report = {'scale': args.scale, 'requests': args.requests, 'levels': {}}
+    for concurrency in args.concurrency or [1, 16, 64, 256]:
+        log(f'Concurrency {concurrency}')
+        report['levels'][str(concurrency)] = {
+            'wsgi': run_wsgi(request_paths(context, args.requests, ''), concurrency),
+            'asgi': run_asgi(request_paths(context, args.requests, 'async/'), concurrency),
+        }
+    print(json.dumps(report, indent=2))
+    failed = any(result['errors'] for level in report['levels'].values() for result in level.values())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.compare import compare
+from benchmarks.fixtures import is_seeded, seed
+from benchmarks.runner import percentile, run_sequential
+from benchmarks.scales import SCALES
+from benchmarks.scenarios import SCENARIOS, Context
+
+
+@pytest.mark.django_db
+def test_every_scenario_runs_against_seeded_data(settings):
+    # Benchmarks run uncached by default; cached hits would issue no queries
+    settings.EVENTS_RESPONSE_CACHE_TIMEOUT = 0
+    scale = SCALES['tiny']
+    seed(scale, log=lambda message: None)
+    assert is_seeded(scale)
+    context = Context.build(deep_pages=3)
+    assert len(context.cursor_urls) == 3
+    for scenario in SCENARIOS:
+        result = run_sequential(scenario, context, iterations=3, warmup=1)
+        assert result['errors'] == 0, scenario.name
+        assert result['p50_ms'] <= result['p99_ms']
+        assert result['queries_per_request'] >= 1
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_compare_flags_latency_beyond_tolerance_and_any_extra_query():
+    baseline = {'scenarios': {'event_list': {'sequential': {'p95_ms': 10.0, 'queries_per_request': 1.0}}}}
+    current = {'scenarios': {'event_list': {'sequential': {'p95_ms': 12.0, 'queries_per_request': 2.0}}}}
+    assert compare(current, baseline, tolerance=0.25) == ['event_list/sequential queries_per_request: 1.0 -> 2.0']
+    current['scenarios']['event_list']['sequential']['p95_ms'] = 13.0
+    assert len(compare(current, baseline, tolerance=0.25)) == 2
+
+
+@pytest.mark.django_db
+def test_serialization_paths_match_and_report_timings():
+    from benchmarks.serialization import run
+    seed(SCALES['tiny'], log=lambda message: None)
+    report = run(rows=50, repeat=1)
+    for name in ('events', 'reviews'):
+        assert report[name]['rows'] == 50
+        assert report[name]['render_ms']['fast'] > 0
+
+
+def test_rsvp_stress_never_oversells(tmp_path):
+    # A real SQLite file in a child process: the in-memory test database serializes threads on table locks
+    result = subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.rsvp_stress', '--attendees', '240', '--capacity', '60',
+            '--threads', '12', '--churn', '0.25', '--database', str(tmp_path / 'stress.sqlite3'),
+        ],
+        cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert (report['rush']['going'], report['rush']['waitlisted']) == (60, 180)
+    # Every seat given up went to the waitlist
+    assert (report['churn']['going'], report['churn']['not_going']) == (60, 15)
+    assert report['rush']['rsvps_per_second'] > 0
+
+
+def test_wsgi_and_asgi_serve_the_same_read_mix(tmp_path):
+    # The ASGI run reaches the database from the event loop's worker thread, so it needs a real file too
+    result = subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.servers', '--scale', 'tiny', '--requests', '30',
+            '--concurrency', '4', '--database', str(tmp_path / 'servers.sqlite3'),
+        ],
+        cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    level = json.loads(result.stdout)['levels']['4']
+    for handler in ('wsgi', 'asgi'):
+        assert (level[handler]['requests'], level[handler]['errors']) == (30, 0)
+        assert level[handler]['throughput_rps'] > 0
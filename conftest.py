@@ -0,0 +1,22 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses, version counters, venue indexes, users and the blacklist filter must not leak between tests."""
+    from events.intervals import clear_venue_indexes
+    from user.authentication import user_cache
+    from user.blacklist import blacklist_filter
+    from user.logins import discard_pending
+    cache.clear()
+    clear_venue_indexes()
+    user_cache.clear()
+    blacklist_filter.reset()
+    yield
+    cache.clear()
+    clear_venue_indexes()
+    user_cache.clear()
+    blacklist_filter.reset()
+    # Buffered logins belong to the test database, which is gone by exit time
+    discard_pending()
@@ -0,0 +1,211 @@
+"""
+In-process request metrics exposed in the Prometheus text format.
+
+``MetricsMiddleware`` opens a ``RequestMetrics`` for every request,
+records SQL through an execute wrapper installed on every database
+connection and serializer time through ``InstrumentedSerializerMixin``,
+then folds the totals into per-route histograms. The current request is
+tracked in a context variable, so queries that async views run in a
+worker thread are attributed to the right request. Each worker process aggregates its own requests;
+scrape every worker (or put them behind a per-process port) to see all
+traffic.
+"""
+import bisect
+import contextvars
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label set."""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # One slot per bucket plus +Inf, then the running sum
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                bucket_labels = ','.join(labels + [f'le="{bound}"'])
+                lines.append(f'{self.name}_bucket{{{bucket_labels}}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{",".join(labels)}}} {values[-1]}')
+            lines.append(f'{self.name}_count{{{",".join(labels)}}} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_LABELS = ('route', 'method', 'status')
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Wall time spent handling the request.', REQUEST_LABELS, LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries issued per request.', REQUEST_LABELS, QUERY_COUNT_BUCKETS
+)
+DB_TIME = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request.', REQUEST_LABELS, LATENCY_BUCKETS
+)
+SERIALIZE_TIME = Histogram(
+    'http_request_serialize_duration_seconds', 'Time spent in serializer to_representation per request.',
+    REQUEST_LABELS, LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Size of the response body (streamed bodies are not counted).',
+    REQUEST_LABELS, SIZE_BUCKETS
+)
+HISTOGRAMS = (REQUEST_LATENCY, DB_QUERIES, DB_TIME, SERIALIZE_TIME, RESPONSE_SIZE)
+
+# Collapses literals and IN lists so repeated queries share one shape
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+
+
+def sql_shape(sql):
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    return _IN_LIST_RE.sub('(?...)', shape)
+
+
+class RequestMetrics:
+    """Counters for the request currently being handled."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper (see ``connection.execute_wrapper``)."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - start
+            self.query_count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def repeated_queries(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper on every connection; counts the query against the current request, if any."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Wrappers live on the connection object, which survives reconnects
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def current_request_metrics():
+    return _current.get()
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def record(metrics, route, method, status, duration, response_size):
+    labels = {'route': route, 'method': method, 'status': str(status)}
+    REQUEST_LATENCY.observe(duration, **labels)
+    DB_QUERIES.observe(metrics.query_count, **labels)
+    DB_TIME.observe(metrics.query_time, **labels)
+    SERIALIZE_TIME.observe(metrics.serialize_time, **labels)
+    if response_size is not None:
+        RESPONSE_SIZE.observe(response_size, **labels)
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+class InstrumentedSerializerMixin:
+    """
+    Add the time spent in ``to_representation`` to the current request.
+
+    Only the outermost call is timed, so nested serializers are not
+    counted twice.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start
+            metrics.serializing = False
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires ``Bearer <METRICS_TOKEN>`` when that setting is set."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not constant_time_compare(supplied, token):
+            return HttpResponseForbidden()
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    return HttpResponse('\n'.join(lines) + '\n', content_type=CONTENT_TYPE)
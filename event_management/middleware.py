@@ -0,0 +1,195 @@
+"""
+Project-wide middleware.
+
+Every class here runs natively under both WSGI and ASGI, so an async view
+served through ``event_management.asgi`` is never pushed onto a thread
+by the middleware chain.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from . import metrics
+from .routers import primary_reads, replica_reads
+
+logger = logging.getLogger('event_management.metrics')
+
+
+class SyncAndAsyncMiddleware:
+    """Base for middleware that dispatches to ``__acall__`` when the rest of the chain is async."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class MetricsMiddleware(SyncAndAsyncMiddleware):
+    """
+    Time every request and record its SQL, serializer and size metrics
+    under the name of the matched URL pattern.
+
+    With ``METRICS_NPLUSONE_THRESHOLD`` set, any SQL shape repeated that
+    many times within one request is logged as a likely N+1 query.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.nplusone_threshold = getattr(settings, 'METRICS_NPLUSONE_THRESHOLD', 0)
+
+    def handle(self, request):
+        request_metrics, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        self.observe(request, response, request_metrics, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        request_metrics, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+        self.observe(request, response, request_metrics, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, request_metrics, duration):
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        if route != 'metrics':
+            size = None if response.streaming else len(response.content)
+            metrics.record(request_metrics, route, request.method, response.status_code, duration, size)
+            if self.nplusone_threshold:
+                self.report_repeated_queries(request, route, request_metrics)
+
+    def report_repeated_queries(self, request, route, request_metrics):
+        for shape, count in request_metrics.repeated_queries(self.nplusone_threshold):
+            logger.warning('Possible N+1 on %s %s (%s): %d x %s', request.method, request.path, route, count, shape)
+
+
+class ConcurrencyLimitMiddleware(SyncAndAsyncMiddleware):
+    """
+    Shed load before any view or ORM work once a process is handling
+    ``MAX_CONCURRENT_REQUESTS`` requests (or ``MAX_CONCURRENT_WRITES``
+    unsafe ones): the request waits up to ``CONCURRENCY_QUEUE_TIMEOUT``
+    seconds for a slot, then gets 503 with ``Retry-After``. 0 disables a
+    limit; paths in ``CONCURRENCY_EXEMPT_PATHS`` are never limited.
+
+    Under ASGI a waiting request polls for a slot instead of blocking the
+    event loop.
+    """
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+    poll_interval = 0.005
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.requests = self._semaphore(getattr(settings, 'MAX_CONCURRENT_REQUESTS', 0))
+        self.writes = self._semaphore(getattr(settings, 'MAX_CONCURRENT_WRITES', 0))
+        self.timeout = getattr(settings, 'CONCURRENCY_QUEUE_TIMEOUT', 0.1)
+        self.retry_after = getattr(settings, 'CONCURRENCY_RETRY_AFTER', 1)
+        self.exempt_paths = tuple(getattr(settings, 'CONCURRENCY_EXEMPT_PATHS', ()))
+
+    @staticmethod
+    def _semaphore(limit):
+        return threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    def semaphores(self, request):
+        if self.exempt_paths and request.path.startswith(self.exempt_paths):
+            return []
+        semaphores = [self.requests]
+        if request.method not in self.safe_methods:
+            semaphores.append(self.writes)
+        return [semaphore for semaphore in semaphores if semaphore is not None]
+
+    def handle(self, request):
+        acquired = []
+        try:
+            for semaphore in self.semaphores(request):
+                if not semaphore.acquire(timeout=self.timeout):
+                    return self.overloaded()
+                acquired.append(semaphore)
+            return self.get_response(request)
+        finally:
+            for semaphore in acquired:
+                semaphore.release()
+
+    async def __acall__(self, request):
+        acquired = []
+        try:
+            for semaphore in self.semaphores(request):
+                if not await self._acquire_async(semaphore):
+                    return self.overloaded()
+                acquired.append(semaphore)
+            return await self.get_response(request)
+        finally:
+            for semaphore in acquired:
+                semaphore.release()
+
+    async def _acquire_async(self, semaphore):
+        deadline = time.monotonic() + self.timeout
+        while not semaphore.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.poll_interval)
+        return True
+
+    def overloaded(self):
+        response = JsonResponse({'detail': 'Server is busy, please retry shortly.'}, status=503)
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+
+class ReplicaRoutingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Let GET and HEAD requests read routed models from a replica (see
+    ``event_management.routers``), except for clients that wrote within
+    the last ``REPLICA_PIN_SECONDS``, which read their own writes from the
+    primary until the replicas have caught up.
+    """
+    read_methods = ('GET', 'HEAD')
+    pin_cookie = 'primary_pin'
+
+    def reads(self, request):
+        if request.method in self.read_methods and self.pin_cookie not in request.COOKIES:
+            return replica_reads()
+        return primary_reads()
+
+    def pin(self, request, response):
+        pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        if request.method not in self.read_methods and pin_seconds and getattr(settings, 'DATABASE_REPLICAS', ()):
+            response.set_cookie(self.pin_cookie, '1', max_age=pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+    def handle(self, request):
+        with self.reads(request):
+            response = self.get_response(request)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        # The flag is a context variable, so ORM calls run in worker threads still see it
+        with self.reads(request):
+            response = await self.get_response(request)
+        return self.pin(request, response)
@@ -0,0 +1,76 @@
+"""
+JSON renderer backed by orjson, byte-compatible with DRF's JSONRenderer.
+
+Without orjson installed (or for anything it would render differently)
+the stdlib renderer is used.
+"""
+import math
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# orjson writes 1e-7 / 1e16 where the stdlib writes 1e-07 / 1e+16, and
+# 0.00001 where it writes 1e-05. Such floats contain "<digit>e<digit or
+# minus>" or "0.0000"; a match inside a string only costs a needless fallback.
+# Searching for the "e" first is several times faster than a leading \d.
+_EXPONENT_RE = re.compile(rb'e[-\d]')
+_SMALL_FLOAT = b'0.0000'
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Compact, UTF-8 JSON rendered by orjson.
+
+    Matches ``JSONRenderer`` byte for byte under the default settings
+    (compact, unicode, strict floats); indented output (the browsable API)
+    and non-default settings go through the stdlib renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self._is_default_style(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _formats_floats_differently(ret) or (b'null' in ret and _has_non_finite_float(data)):
+            # The stdlib renders these floats differently, or (NaN/Infinity, which
+            # orjson writes as null) refuses them in strict mode
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: these are valid JSON but not valid JavaScript
+        for raw, escaped in _LINE_SEPARATORS:
+            ret = ret.replace(raw, escaped)
+        return ret
+
+    def _is_default_style(self, accepted_media_type, renderer_context):
+        return (
+            self.get_indent(accepted_media_type, renderer_context or {}) is None
+            and self.compact and self.ensure_ascii is False and self.strict
+        )
+
+
+def _formats_floats_differently(ret):
+    for match in _EXPONENT_RE.finditer(ret):
+        if ret[match.start() - 1:match.start()].isdigit():
+            return True
+    return _SMALL_FLOAT in ret
+
+
+def _has_non_finite_float(data):
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        data = data.values()
+    elif not isinstance(data, (list, tuple)):
+        return False
+    return any(_has_non_finite_float(value) for value in data)
@@ -0,0 +1,72 @@
+"""
+Read-replica routing.
+
+Reads of the models in ``REPLICA_ROUTED_MODELS`` go to a random alias in
+``DATABASE_REPLICAS``, but only inside ``replica_reads()``, which
+``ReplicaRoutingMiddleware`` enters for GET and HEAD requests: a write
+request reads its own writes from the primary, and so does any read made
+inside a transaction on the primary. Everything else, including every
+write, uses ``default``.
+
+Replicas lag the primary by up to the ``sync_replicas`` interval, so a
+client that just wrote is pinned to the primary for ``REPLICA_PIN_SECONDS``
+(a cookie set by the middleware), and anything that outlives the request,
+such as a response cache fill, is read inside ``primary_reads()``.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Allow routed models to be read from a replica for the duration of the block."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read everything from the primary for the duration of the block, even inside ``replica_reads()``."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if not replicas or not _replica_reads.get():
+            return None
+        if model._meta.label not in getattr(settings, 'REPLICA_ROUTED_MODELS', ()):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, *getattr(settings, 'DATABASE_REPLICAS', ())}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas are copies of the migrated primary (see ``sync_replicas``)
+        if db in getattr(settings, 'DATABASE_REPLICAS', ()):
+            return False
+        return None
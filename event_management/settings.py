@@ -1,6 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import Csv, config
 
 #Build paths
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,6 +32,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'event_management.middleware.MetricsMiddleware',
+    'event_management.middleware.ConcurrencyLimitMiddleware',
+    'event_management.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,14 +64,43 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'event_management.wsgi.application'
 
-#Database - SQLITE3 (No PostgreSQL needed!)
+#Database - SQLITE3 (No PostgreSQL needed!), tuned for concurrent readers and writers
+SQLITE_OPTIONS = {
+    'pragmas': {
+        'journal_mode': config('SQLITE_JOURNAL_MODE', default='wal'),
+        'synchronous': config('SQLITE_SYNCHRONOUS', default='normal'),
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+        'mmap_size': config('SQLITE_MMAP_SIZE', default=268435456, cast=int),
+        'temp_store': 'memory',
+    },
+    'transaction_mode': 'IMMEDIATE',
+}
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': 'event_management.sqlite',
+        'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
 
+#Read replicas: comma-separated SQLite files refreshed from the primary by `manage.py sync_replicas`
+DATABASE_REPLICAS = []
+for number, name in enumerate(config('DATABASE_REPLICA_NAMES', default='', cast=Csv()), start=1):
+    DATABASE_REPLICAS.append(f'replica{number}')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'OPTIONS': {'pragmas': {**SQLITE_OPTIONS['pragmas'], 'query_only': 1}},
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['event_management.routers.ReplicaRouter']
+#GET/HEAD reads of these models may be served by a replica
+REPLICA_ROUTED_MODELS = ['events.Event', 'events.Review']
+#Seconds a client that wrote reads from the primary (cover the sync_replicas interval)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
 #Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,19 +137,37 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 #REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.CachedJWTAuthentication',
+        #DRF's defaults, which were in effect before the duplicate REST_FRAMEWORK block was removed
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # ✅ Allow all for testing
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
-    'DEFAULT_FILTER_BACKENDS': [
-        'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter'
+    'DEFAULT_THROTTLE_CLASSES': [
+        'event_management.throttling.TokenBucketThrottle',
     ],
 }
 
+#Token buckets per view throttle_scope, per user (or client IP): "<count>/<period>[ burst <n>]"
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+THROTTLE_RATES = {
+    'register': config('THROTTLE_RATE_REGISTER', default='10/hour burst 5'),
+    'token': config('THROTTLE_RATE_TOKEN', default='20/min burst 10'),
+    'rsvp': config('THROTTLE_RATE_RSVP', default='60/min burst 20'),
+    'review': config('THROTTLE_RATE_REVIEW', default='20/min burst 10'),
+}
+
+#Per-process load shedding (0 disables): requests beyond the limit wait CONCURRENCY_QUEUE_TIMEOUT seconds, then get 503
+MAX_CONCURRENT_REQUESTS = config('MAX_CONCURRENT_REQUESTS', default=0, cast=int)
+MAX_CONCURRENT_WRITES = config('MAX_CONCURRENT_WRITES', default=0, cast=int)
+CONCURRENCY_QUEUE_TIMEOUT = config('CONCURRENCY_QUEUE_TIMEOUT', default=0.1, cast=float)
+CONCURRENCY_RETRY_AFTER = 1
+CONCURRENCY_EXEMPT_PATHS = ['/metrics', '/admin/']
+
 
 
 
@@ -127,11 +177,50 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    #last_login is written in batches by the obtain serializer instead (see LAST_LOGIN_FLUSH_INTERVAL)
+    'UPDATE_LAST_LOGIN': False,
+    'TOKEN_OBTAIN_SERIALIZER': 'user.serializers.BatchedLoginTokenObtainPairSerializer',
+    #Checks the blacklist through an in-process bloom filter (user/blacklist.py)
+    'TOKEN_REFRESH_SERIALIZER': 'user.serializers.FilteredTokenRefreshSerializer',
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
 }
 
+#Seconds a user resolved from a JWT stays cached per process (0 disables) and how many are kept
+JWT_USER_CACHE_TTL = config('JWT_USER_CACHE_TTL', default=30, cast=int)
+JWT_USER_CACHE_SIZE = config('JWT_USER_CACHE_SIZE', default=10000, cast=int)
+#Let views marked token_user_allowed authenticate GET requests from the token claims alone
+JWT_ALLOW_TOKEN_USER = config('JWT_ALLOW_TOKEN_USER', default=True, cast=bool)
+#Seconds between batched last_login writes (0 writes on every login) and the batch size that forces a write
+LAST_LOGIN_FLUSH_INTERVAL = config('LAST_LOGIN_FLUSH_INTERVAL', default=60, cast=int)
+LAST_LOGIN_FLUSH_SIZE = config('LAST_LOGIN_FLUSH_SIZE', default=1000, cast=int)
+
+#Cache (local memory by default; any Django backend works, e.g. FileBasedCache)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='event-management'),
+    }
+}
+
+#Seconds a rendered event/review response stays cached (0 disables)
+EVENTS_RESPONSE_CACHE_TIMEOUT = config('EVENTS_RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+#Serve event/review lists from .values() rows instead of the serializer (same output, less CPU)
+EVENTS_FAST_READ_PATH = config('EVENTS_FAST_READ_PATH', default=True, cast=bool)
+
+#Reject events that overlap another event at the same venue (locations are free text, so off by default)
+EVENTS_PREVENT_VENUE_CONFLICTS = config('EVENTS_PREVENT_VENUE_CONFLICTS', default=False, cast=bool)
+
+#Request metrics (/metrics); set METRICS_TOKEN to require "Authorization: Bearer <token>"
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+#Log SQL shapes repeated this many times in one request as likely N+1 queries (0 disables)
+METRICS_NPLUSONE_THRESHOLD = config('METRICS_NPLUSONE_THRESHOLD', default=0, cast=int)
+
+#Geocoder used to place event locations (NullGeocoder: coordinates must be given explicitly)
+EVENTS_GEOCODER = config('EVENTS_GEOCODER', default='events.geocoding.NullGeocoder')
+EVENTS_GEOCODER_FILE = config('EVENTS_GEOCODER_FILE', default='')
+
 #Celery Configuration (uses Redis, not database)
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -139,6 +228,19 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'flush-notification-digests': {
+        'task': 'events.tasks.flush_notification_digests',
+        'schedule': 60.0,
+    },
+    'prune-token-blacklist': {
+        'task': 'user.tasks.prune_token_blacklist',
+        'schedule': 3600.0,
+    },
+}
+
+#Seconds organizer notifications are coalesced into one digest (0 = send each immediately)
+EVENT_NOTIFICATION_DIGEST_WINDOW = config('EVENT_NOTIFICATION_DIGEST_WINDOW', default=0, cast=int)
 
 #Email Configuration (Console backend for development)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -163,12 +265,6 @@ SWAGGER_SETTINGS = {
 }
 
 
-REST_FRAMEWORK = {
-    #existing settings 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
-}
-
 #Celery
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -178,11 +274,3 @@ CELERY_TASK_SERIALIZER = 'json'
 #Email
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@eventmanagement.com'
-
-#Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+SQLite backend tuned for concurrent access.
+
+``OPTIONS`` takes two keys on top of the ``sqlite3.connect()`` arguments:
+``pragmas``, applied to every new connection (e.g. WAL journaling and a
+``busy_timeout`` so writers wait for the lock instead of failing with
+"database is locked"), and ``transaction_mode``. With
+``'transaction_mode': 'IMMEDIATE'`` atomic blocks take the write lock when
+they begin; a deferred transaction that reads first and writes later
+cannot wait for the lock and fails immediately when another writer holds
+it, whatever the busy timeout.
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            if not PRAGMA_NAME_RE.match(name):
+                raise ImproperlyConfigured(f'Invalid SQLite pragma name {name!r}.')
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f'Invalid SQLite transaction_mode {mode!r}.')
+        self.cursor().execute(f'BEGIN {mode.upper()}')
@@ -0,0 +1,150 @@
+"""
+Token-bucket throttling backed by the configured cache.
+
+Each ``(scope, user or client IP)`` pair owns a bucket holding up to
+``burst`` tokens that refills at the scope's rate; a request takes one
+token or is rejected with 429 and a ``Retry-After`` of the time until the
+next token. Rates are configured per scope in ``THROTTLE_RATES`` as
+``"<count>/<period>"`` with an optional ``" burst <n>"`` (the burst
+defaults to the count).
+
+With Django's Redis cache the bucket is updated by a Lua script, atomic
+across processes. Other backends update it under a per-process lock,
+which is exact for ``LocMemCache`` and approximate under contention
+between processes sharing memcached or a database cache.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+try:
+    from django.core.cache.backends.redis import RedisCache
+except ImportError:  # pragma: no cover - Django < 4.0
+    RedisCache = None
+
+KEY_PREFIX = 'throttle:'
+PERIODS = {'s': 1, 'sec': 1, 'second': 1, 'm': 60, 'min': 60, 'minute': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+# KEYS[1] bucket; ARGV capacity, refill per second, now, cost, ttl (ms). Returns {allowed, tokens}.
+_REDIS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[5])
+return {allowed, tostring(tokens)}
+"""
+
+
+def parse_rate(rate):
+    """``'30/min burst 10'`` -> ``(capacity, refill per second)``."""
+    try:
+        spec, _, burst = rate.partition(' burst ')
+        count, period = spec.strip().split('/')
+        count = int(count)
+        seconds = PERIODS[period.strip()]
+        capacity = int(burst) if burst else count
+    except (KeyError, ValueError):
+        raise ImproperlyConfigured(f'Invalid throttle rate {rate!r}; expected e.g. "30/min" or "30/min burst 10".')
+    if count <= 0 or capacity <= 0:
+        raise ImproperlyConfigured(f'Invalid throttle rate {rate!r}; counts must be positive.')
+    return capacity, count / seconds
+
+
+LOCK_STRIPES = 256
+
+
+class TokenBucket:
+    """Cache-backed token buckets sharing one capacity and refill rate."""
+    # A fixed pool of striped locks: bounded however many client keys there are,
+    # and a key always maps to the same lock
+    _locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def __init__(self, capacity, rate, cache=cache):
+        self.capacity = capacity
+        self.rate = rate
+        self.cache = cache
+        # Once full again the stored state carries no information
+        self.ttl = max(1, int(capacity / rate) + 1)
+
+    def consume(self, key, cost=1, now=None):
+        """Take ``cost`` tokens; returns ``(allowed, seconds until enough tokens are available)``."""
+        now = time.time() if now is None else now
+        if RedisCache is not None and isinstance(self.cache, RedisCache):
+            allowed, tokens = self._consume_redis(key, cost, now)
+        else:
+            allowed, tokens = self._consume_locked(key, cost, now)
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+    def _consume_redis(self, key, cost, now):
+        client = self.cache._cache.get_client(key, write=True)
+        script = client.register_script(_REDIS_SCRIPT)
+        allowed, tokens = script(
+            keys=[self.cache.make_and_validate_key(key)],
+            args=[self.capacity, self.rate, now, cost, self.ttl * 1000],
+        )
+        return bool(int(allowed)), float(tokens)
+
+    def _consume_locked(self, key, cost, now):
+        with self._lock_for(key):
+            tokens, updated = self.cache.get(key) or (self.capacity, now)
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self.cache.set(key, (tokens, now), self.ttl)
+        return allowed, tokens
+
+    @classmethod
+    def _lock_for(cls, key):
+        return cls._locks[hash(key) % LOCK_STRIPES]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle keyed by the view's ``throttle_scope`` and the authenticated
+    user (or client IP). Safe methods pass untouched unless
+    ``throttle_safe_methods`` is set, so list/create views only throttle
+    writes.
+    """
+    throttle_safe_methods = False
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        if not getattr(settings, 'THROTTLE_ENABLED', True):
+            return True
+        if request.method in SAFE_METHODS and not self.throttle_safe_methods:
+            return True
+        scope = getattr(view, 'throttle_scope', None)
+        rate = getattr(settings, 'THROTTLE_RATES', {}).get(scope)
+        if rate is None:
+            return True
+
+        bucket = TokenBucket(*parse_rate(rate))
+        allowed, self.wait_seconds = bucket.consume(self.get_cache_key(request, scope))
+        return allowed
+
+    def get_cache_key(self, request, scope):
+        user = request.user
+        ident = f'user:{user.pk}' if user and user.is_authenticated else f'ip:{self.get_ident(request)}'
+        return f'{KEY_PREFIX}{scope}:{ident}'
+
+    def wait(self):
+        return self.wait_seconds
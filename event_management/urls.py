@@ -8,13 +8,15 @@ from django.conf.urls.static import static
 from django.http import HttpResponseRedirect
 from rest_framework import permissions
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
 )
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from user.views import ThrottledTokenObtainPairView
+from .metrics import metrics_view
+
 #Swagger/ReDoc Schema View
 schema_view = get_schema_view(
     openapi.Info(
@@ -60,10 +62,13 @@ urlpatterns = [
     path('swagger.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     
     #JWT Authentication
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
+    #Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
+    
     #App URLs
     path('api/', include('user.urls')),
     path('api/', include('events.urls')),
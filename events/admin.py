@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event, RSVP, Review
+from .models import Event, EventStats, OutboxMessage, RSVP, Review
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
@@ -16,3 +16,15 @@ class RSVPAdmin(admin.ModelAdmin):
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ['user', 'event', 'rating', 'created_at']
     list_filter = ['rating']
+
+
+@admin.register(EventStats)
+class EventStatsAdmin(admin.ModelAdmin):
+    list_display = ['event', 'going_count', 'capacity', 'waitlisted_count', 'maybe_count', 'not_going_count', 'review_count', 'rating_sum']
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['task_name', 'dedupe_key', 'attempts', 'available_at', 'dispatched_at']
+    list_filter = ['task_name']
+    search_fields = ['dedupe_key']
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class EventsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'events'
+
+    def ready(self):
+        from event_management import metrics  # noqa: F401  (records per-request SQL)
+        from . import checks  # noqa: F401  (registers the deploy checks)
+        from . import signals
+        post_migrate.connect(signals.setup_search_index, sender=self)
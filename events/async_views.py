@@ -0,0 +1,108 @@
+"""
+Async versions of the read-heavy event endpoints, for ASGI deployments.
+
+Each view reuses the configuration of its DRF counterpart (authentication,
+permissions, filters, sparse fieldsets, ordering and keyset pagination) and
+produces the same payload, but fetches rows with the async ORM so a slow
+query or client holds a coroutine instead of a worker thread. Setup that
+may touch the database (authentication, filter validation) runs in one
+``sync_to_async`` call. Requests the fast path does not cover (``?expand=``,
+the browsable API, ``EVENTS_FAST_READ_PATH = False``) are answered by the
+synchronous view. Responses are not cached.
+"""
+from abc import ABC, abstractmethod
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.views import View
+from rest_framework.response import Response
+
+from .fastpath import afill_missing_stats, event_row_builder
+from .pagination import key_columns
+from .views import EventDetailView, EventListCreateView, ReviewListCreateView
+
+
+class AsyncReadView(ABC, View):
+    """Serve GET for ``drf_view_class`` with the async ORM (see the module docstring)."""
+    drf_view_class = None
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, *args, **kwargs):
+        view = self.drf_view_class()
+        view.args, view.kwargs = args, kwargs
+        view.request = drf_request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        try:
+            queryset = await sync_to_async(self.prepare)(view)
+            if queryset is None:
+                return await sync_to_async(self.drf_view_class.as_view())(request, *args, **kwargs)
+            response = await self.respond(view, queryset)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        response = view.finalize_response(drf_request, response, *args, **kwargs)
+        # JSON rendering does no I/O, so it stays on the event loop
+        return response.render()
+
+    def prepare(self, view):
+        """Authenticate, check permissions and build the ``.values()`` queryset; None to fall back."""
+        view.initial(view.request)
+        fields, expand = view.get_fieldset()
+        if (
+            expand
+            or not getattr(settings, 'EVENTS_FAST_READ_PATH', True)
+            or view.request.accepted_renderer.format != 'json'
+        ):
+            return None
+        return self.get_queryset(view, fields)
+
+    def get_queryset(self, view, fields):
+        return view.row_builder.values(view.filter_queryset(view.get_queryset()), fields, extra=key_columns(view))
+
+    @abstractmethod
+    async def respond(self, view, queryset):
+        """Fetch the rows of ``queryset`` and return the DRF ``Response``."""
+
+
+class AsyncListView(AsyncReadView):
+    fill_stats = False
+
+    async def respond(self, view, queryset):
+        fields, _ = view.get_fieldset()
+        paginator = view.paginator
+        page = None if paginator is None else await paginator.apaginate_queryset(queryset, view.request, view=view)
+        if page is None:
+            rows = [row async for row in queryset]
+            if self.fill_stats:
+                await afill_missing_stats(rows)
+            return Response(view.build_rows(rows, fields))
+        if self.fill_stats:
+            await afill_missing_stats(page)
+        return view.get_paginated_response(view.build_rows(page, fields))
+
+
+class AsyncEventListView(AsyncListView):
+    drf_view_class = EventListCreateView
+    fill_stats = True
+
+
+class AsyncReviewListView(AsyncListView):
+    drf_view_class = ReviewListCreateView
+
+
+class AsyncEventDetailView(AsyncReadView):
+    drf_view_class = EventDetailView
+    row_builder = event_row_builder()
+
+    def get_queryset(self, view, fields):
+        queryset = view.get_queryset().filter(pk=view.kwargs['pk'])
+        return self.row_builder.values(queryset, fields)
+
+    async def respond(self, view, queryset):
+        try:
+            row = await queryset.aget()
+        except queryset.model.DoesNotExist:
+            raise Http404
+        await afill_missing_stats([row])
+        fields, _ = view.get_fieldset()
+        return Response(self.row_builder.build([row], fields)[0])
@@ -0,0 +1,129 @@
+"""
+Set-based bulk operations that bypass per-row model signals.
+
+Because ``bulk_create`` sends no signals, these helpers maintain the
+derived data (stats, cached responses, timelines) themselves.
+"""
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import outbox, stats, timeline
+from .caching import bump_versions, event_scope, events_scope
+from .models import Event, RSVP
+from .waitlist import promote_waitlisted
+
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+ERROR = 'error'
+
+
+def bulk_upsert_rsvps(items, batch_size=500):
+    """
+    Validate and upsert ``(event, user, status)`` items in a few queries.
+
+    ``items`` are dicts already validated for shape. Returns one result per
+    item, in order: ``{'index', 'result', 'errors'?, 'status'?}``; items
+    asking for Going on a full event are stored as Waitlisted and say so in
+    ``status``.
+    """
+    event_ids = {item['event'] for item in items}
+    user_ids = {item['user'] for item in items}
+    organizers = dict(Event.objects.filter(pk__in=event_ids).values_list('pk', 'organizer_id'))
+    known_users = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+
+    # The current statuses decide the stats deltas, so they are read under the
+    # write lock (BEGIN IMMEDIATE on SQLite, row locks elsewhere) and cannot
+    # change before the upsert lands.
+    with transaction.atomic():
+        existing = {
+            (event_id, user_id): status
+            for event_id, user_id, status in RSVP.objects.select_for_update().filter(
+                event_id__in=event_ids, user_id__in=user_ids
+            ).values_list('event_id', 'user_id', 'status').order_by()
+        }
+        results, to_write, transitions = _plan(items, organizers, known_users, existing)
+        if to_write:
+            _write(to_write, transitions, results, batch_size)
+    if to_write:
+        bump_versions(events_scope(), *(event_scope(event_id) for event_id, _, _ in transitions))
+    return results
+
+
+def _plan(items, organizers, known_users, existing):
+    """Per-item results, plus the RSVPs to write and their ``(event_id, old, new)`` transitions."""
+    results = []
+    to_write = []
+    transitions = []
+    seen = set()
+    for index, item in enumerate(items):
+        key = (item['event'], item['user'])
+        errors = {}
+        if item['event'] not in organizers:
+            errors['event'] = ['Event not found.']
+        elif organizers[item['event']] == item['user']:
+            errors['user'] = ['Event organizer cannot RSVP to their own event.']
+        if item['user'] not in known_users:
+            errors['user'] = ['User not found.']
+        if key in seen:
+            errors['non_field_errors'] = ['Duplicate event/user pair in request.']
+        seen.add(key)
+
+        if errors:
+            results.append({'index': index, 'result': ERROR, 'errors': errors})
+            continue
+
+        old_status = existing.get(key)
+        if old_status == item['status']:
+            results.append({'index': index, 'result': UNCHANGED})
+            continue
+
+        results.append({'index': index, 'result': CREATED if old_status is None else UPDATED})
+        to_write.append(RSVP(event_id=item['event'], user_id=item['user'], status=item['status']))
+        transitions.append((item['event'], old_status, item['status']))
+    return results, to_write, transitions
+
+
+def _write(to_write, transitions, results, batch_size):
+    _claim_seats(to_write, transitions, results)
+    stats.record_rsvp_changes(
+        transition for transition in transitions if transition[2] != 'Going'
+    )
+    RSVP.objects.bulk_create(
+        to_write,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['event', 'user'],
+        update_fields=['status'],
+    )
+    outbox.enqueue_many([
+        outbox.build_message('events.tasks.send_rsvp_notification', [event_id, rsvp.user_id, rsvp.status])
+        for rsvp, (event_id, old_status, _) in zip(to_write, transitions)
+        if old_status is None
+    ])
+    timeline.sync_rsvp_entries(
+        (rsvp.user_id, rsvp.event_id, rsvp.status) for rsvp in to_write
+    )
+    # Seats given up in this request go to the existing waitlist
+    for event_id in {event_id for event_id, old_status, _ in transitions if old_status == 'Going'}:
+        promote_waitlisted(event_id)
+
+
+def _claim_seats(rsvps, transitions, results):
+    """
+    Claim seats for the moves to Going, per event in request order, and turn
+    the ones left without a seat into moves to Waitlisted (in place).
+    """
+    claims = defaultdict(list)
+    for position, (event_id, old_status, new_status) in enumerate(transitions):
+        if new_status == 'Going':
+            claims[event_id].append(position)
+    written = [result for result in results if result['result'] in (CREATED, UPDATED)]
+    for event_id, positions in claims.items():
+        granted = stats.claim_seats(event_id, [transitions[position][1] for position in positions])
+        for position in positions[granted:]:
+            transitions[position] = (event_id, transitions[position][1], 'Waitlisted')
+            rsvps[position].status = 'Waitlisted'
+            written[position]['status'] = 'Waitlisted'
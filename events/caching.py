@@ -0,0 +1,172 @@
+"""
+Response caching for the read-heavy event endpoints.
+
+Cached responses are keyed by view, path, normalized query string, auth
+scope and the current value of one or more version counters. Writes bump
+the counters of every scope they affect, which orphans exactly the stale
+entries. Counter values are nanosecond timestamps, so they double as the
+Last-Modified time of aggregates (e.g. RSVP counts) that have no
+``updated_at`` of their own. ETags hash the rendered body, so a client is
+only told 304 when it holds exactly what would be served.
+
+Version counters live in the Django cache, so with more than one process
+the cache must be shared (Redis, Memcached, database or file based).
+``LocMemCache`` keeps bumps in the process that made them and the others
+keep serving stale entries until they expire.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from event_management.routers import primary_reads
+
+VERSION_PREFIX = 'events:version:'
+RESPONSE_PREFIX = 'events:response:'
+
+
+def events_scope():
+    return 'events'
+
+
+def event_scope(event_id):
+    return f'event:{event_id}'
+
+
+def reviews_scope(event_id):
+    return f'reviews:{event_id}'
+
+
+def venue_scope(location):
+    # Locations are free text; hash them into a memcached-safe key
+    return f'venue:{hashlib.md5(location.encode()).hexdigest()}'
+
+
+def get_versions(scopes):
+    """Return {scope: version}, initialising missing counters."""
+    keys = {VERSION_PREFIX + scope: scope for scope in scopes}
+    stored = cache.get_many(keys)
+    versions = {}
+    for key, scope in keys.items():
+        if key not in stored:
+            # A fresh timestamp never matches entries cached under an evicted counter
+            cache.add(key, time.time_ns(), timeout=None)
+            stored[key] = cache.get(key)
+        versions[scope] = stored[key]
+    return versions
+
+
+def _bump(scopes):
+    for scope in scopes:
+        key = VERSION_PREFIX + scope
+        cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), timeout=None)
+
+
+def bump_versions(*scopes):
+    """
+    Invalidate every cached response depending on ``scopes``.
+
+    Bumped immediately and again on commit, so a reader that cached the
+    pre-commit state in between is invalidated too.
+    """
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def _parse_timestamp(value):
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    return value.timestamp() if value else None
+
+
+class CachedResponseMixin:
+    """
+    Cache successful GET responses and answer conditional requests with 304.
+
+    Views define ``get_cache_scopes()`` and list the datetime fields of
+    their payload that contribute to Last-Modified.
+    """
+    last_modified_fields = ('updated_at',)
+
+    def get_cache_scopes(self):
+        raise NotImplementedError
+
+    def get_cache_timeout(self):
+        # Read per request, so override_settings and the deploy check see the same value
+        return getattr(settings, 'EVENTS_RESPONSE_CACHE_TIMEOUT', 300)
+
+    def get_cache_auth_scope(self, request):
+        user = request.user
+        return f'user:{user.pk}' if user.is_authenticated else 'anon'
+
+    def get_response_cache_key(self, request, versions):
+        query = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        )
+        parts = [
+            type(self).__name__,
+            request.path,
+            repr(query),
+            request.accepted_renderer.format,
+            self.get_cache_auth_scope(request),
+            repr(sorted(versions.items())),
+        ]
+        return RESPONSE_PREFIX + hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    def get_last_modified(self, data, versions):
+        """Latest of the payload's timestamps and the scopes' last bump (seconds)."""
+        rows = data.get('results', [data]) if isinstance(data, dict) else data
+        stamps = [version / 1e9 for version in versions.values()]
+        for row in rows:
+            for field in self.last_modified_fields:
+                stamp = _parse_timestamp(row.get(field))
+                if stamp is not None:
+                    stamps.append(stamp)
+        return int(max(stamps))
+
+    def get_etag(self, request, data):
+        """Hash of the JSON body; non-JSON formats (the browsable API) hash the plain JSON rendering."""
+        renderer = request.accepted_renderer
+        if renderer.format != 'json':
+            renderer = JSONRenderer()
+        body = renderer.render(data, renderer.media_type, self.get_renderer_context())
+        return quote_etag(hashlib.md5(body).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        cache_timeout = self.get_cache_timeout()
+        if not cache_timeout:
+            return super().get(request, *args, **kwargs)
+
+        versions = get_versions(self.get_cache_scopes())
+        key = self.get_response_cache_key(request, versions)
+
+        entry = cache.get(key)
+        if entry is None:
+            # A replica may not have the write that bumped the version yet; cached
+            # under the new version, its body would be served until it expires
+            with primary_reads():
+                response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            last_modified = self.get_last_modified(response.data, versions)
+            etag = self.get_etag(request, response.data)
+            cache.set(key, (response.data, last_modified, etag), cache_timeout)
+            response['X-Cache'] = 'MISS'
+        else:
+            data, last_modified, etag = entry
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Returns a bare 304 (carrying the validators) when the client's copy is current
+        return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+
+
+def cache_is_process_local():
+    """Whether the default cache is private to each process, so writes in one are invisible to the others."""
+    return settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS
+
+
+@register(Tags.caches, deploy=True)
+def check_response_cache_is_shared(app_configs, **kwargs):
+    """Response cache versions are bumped in the cache, so every process has to see the same one."""
+    if not getattr(settings, 'EVENTS_RESPONSE_CACHE_TIMEOUT', 300):
+        return []
+    if not cache_is_process_local():
+        return []
+    return [Warning(
+        'EVENTS_RESPONSE_CACHE_TIMEOUT is set but the default cache is local to each process, so '
+        'writes in one process leave the others serving stale responses.',
+        hint='Set CACHE_BACKEND to a shared cache (e.g. Redis) or EVENTS_RESPONSE_CACHE_TIMEOUT=0.',
+        id='events.W001',
+    )]
@@ -0,0 +1,266 @@
+"""
+Read-only fast path for list endpoints.
+
+Instead of instantiating a model and running every serializer field per
+row, list views fetch ``.values()`` rows and turn them into the exact
+dicts the serializer would produce, using one extractor per field
+compiled once from the serializer's own field definitions.
+"""
+import time
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from event_management.metrics import current_request_metrics
+from .models import RSVP, Review
+from .pagination import key_columns
+
+# Fields whose to_representation is the identity for the values the database returns
+_PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.FloatField, serializers.BooleanField,
+)
+
+
+class RowField:
+    """Output field computed from one or more ``.values()`` columns."""
+
+    def __init__(self, columns, function):
+        self.columns = tuple(columns)
+        self.function = function
+
+
+class RowBuilder:
+    """
+    Build serializer-identical dicts from ``.values()`` rows.
+
+    ``row_fields`` supplies replacements for fields that are not plain
+    model columns (``SerializerMethodField`` and the like). The builder is
+    compiled on first use, when the serializer's fields can be bound.
+    Passing ``fields`` builds (and selects the columns of) only those.
+    """
+
+    def __init__(self, serializer_class, row_fields=None):
+        self.serializer_class = serializer_class
+        self.row_fields = row_fields or {}
+        self._compiled = None
+
+    def compile(self):
+        compiled = {}
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if name in self.row_fields:
+                row_field = self.row_fields[name]
+                compiled[name] = (row_field.columns, row_field.function)
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                raise TypeError(f'{self.serializer_class.__name__}.{name} needs a RowField replacement.')
+            column = '__'.join(field.source_attrs)
+            if self._is_iso_datetime(field):
+                compiled[name] = ((column,), _DatetimeExtractor(column, field))
+            else:
+                compiled[name] = ((column,), self._extractor(column, field))
+        self._compiled = compiled
+
+    def _selected(self, fields):
+        if self._compiled is None:
+            self.compile()
+        if fields is None:
+            return self._compiled.items()
+        return [(name, entry) for name, entry in self._compiled.items() if name in fields]
+
+    @staticmethod
+    def _is_iso_datetime(field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        return (
+            isinstance(field, serializers.DateTimeField)
+            and isinstance(output_format, str) and output_format.lower() == ISO_8601
+        )
+
+    @staticmethod
+    def _extractor(column, field):
+        get = itemgetter(column)
+        if isinstance(field, PrimaryKeyRelatedField) or isinstance(field, _PASSTHROUGH_FIELDS):
+            # .values() already yields the pk / str / int / bool the field would return
+            return get
+        to_representation = field.to_representation
+
+        def extract(row):
+            value = get(row)
+            return None if value is None else to_representation(value)
+        return extract
+
+    def columns(self, queryset, fields=None, extra=()):
+        """
+        Columns to select: the fields' sources, ``extra`` (e.g. cursor keys
+        that are not output) and any annotations (e.g. ranks used by cursors).
+        """
+        columns = [column for _, (field_columns, _) in self._selected(fields) for column in field_columns]
+        return list(dict.fromkeys([*columns, *extra, *queryset.query.annotations]))
+
+    def values(self, queryset, fields=None, extra=()):
+        return queryset.values(*self.columns(queryset, fields, extra))
+
+    def build(self, rows, fields=None):
+        current_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+        extractors = [
+            (name, extract.bind(current_timezone) if isinstance(extract, _DatetimeExtractor) else extract)
+            for name, (_, extract) in self._selected(fields)
+        ]
+        return [{name: extract(row) for name, extract in extractors} for row in rows]
+
+
+class _DatetimeExtractor:
+    """
+    ISO 8601 ``DateTimeField`` output with the timezone looked up once per
+    build rather than once per value; anything but an aware datetime goes
+    through the field itself.
+    """
+
+    def __init__(self, column, field):
+        self.column = column
+        self.field = field
+
+    def bind(self, current_timezone):
+        get = itemgetter(self.column)
+        to_representation = self.field.to_representation
+        field_timezone = self.field.timezone if hasattr(self.field, 'timezone') else current_timezone
+        if field_timezone is None:
+            return lambda row: to_representation(get(row))
+
+        def extract(row):
+            value = get(row)
+            if value is None or value.tzinfo is None:
+                return to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return extract
+
+
+STATS_COLUMNS = (
+    'stats__going_count', 'stats__maybe_count', 'stats__not_going_count',
+    'stats__review_count', 'stats__rating_sum',
+)
+
+
+def _rsvp_count(row):
+    return row['stats__going_count'] + row['stats__maybe_count'] + row['stats__not_going_count']
+
+
+def _average_rating(row):
+    if not row['stats__review_count']:
+        return None
+    return round(row['stats__rating_sum'] / row['stats__review_count'], 1)
+
+
+def _missing_stats_queries(rows):
+    """Grouped RSVP and review totals for the rows of events created without a stats row."""
+    rsvp_ids = [row['id'] for row in rows if row.get('stats__going_count', 0) is None]
+    review_ids = [row['id'] for row in rows if row.get('stats__review_count', 0) is None]
+    # Waitlisted RSVPs are not counted, as in EventStats.rsvp_count
+    rsvps = RSVP.objects.filter(event_id__in=rsvp_ids).exclude(status='Waitlisted').order_by().values('event_id').annotate(total=Count('pk'))
+    reviews = Review.objects.filter(event_id__in=review_ids).order_by().values('event_id').annotate(
+        count=Count('pk'), total=Sum('rating')
+    )
+    return (rsvps if rsvp_ids else None), (reviews if review_ids else None)
+
+
+def _apply_missing_stats(rows, rsvp_totals, review_totals):
+    for row in rows:
+        if row.get('stats__going_count', 0) is None:
+            row['stats__going_count'] = rsvp_totals.get(row['id'], 0)
+            row['stats__maybe_count'] = row['stats__not_going_count'] = 0
+        if row.get('stats__review_count', 0) is None:
+            row['stats__review_count'], row['stats__rating_sum'] = review_totals.get(row['id'], (0, 0))
+
+
+def fill_missing_stats(rows):
+    """
+    Fill in the stats columns of rows for events without a stats row, with
+    at most one grouped query each for RSVPs and reviews per page.
+    """
+    rsvps, reviews = _missing_stats_queries(rows)
+    _apply_missing_stats(
+        rows,
+        {} if rsvps is None else {total['event_id']: total['total'] for total in rsvps},
+        {} if reviews is None else {total['event_id']: (total['count'], total['total']) for total in reviews},
+    )
+
+
+async def afill_missing_stats(rows):
+    """``fill_missing_stats`` with the async ORM, for async views."""
+    rsvps, reviews = _missing_stats_queries(rows)
+    _apply_missing_stats(
+        rows,
+        {} if rsvps is None else {total['event_id']: total['total'] async for total in rsvps},
+        {} if reviews is None else {total['event_id']: (total['count'], total['total']) async for total in reviews},
+    )
+
+
+def _distance_km(row):
+    distance = row.get('distance_km')
+    return None if distance is None else round(distance, 2)
+
+
+def event_row_builder():
+    from .serializers import EventSerializer
+    return RowBuilder(EventSerializer, {
+        'rsvp_count': RowField(('id',) + STATS_COLUMNS, _rsvp_count),
+        'average_rating': RowField(('id',) + STATS_COLUMNS, _average_rating),
+        'distance_km': RowField((), _distance_km),
+    })
+
+
+def review_row_builder():
+    from .serializers import ReviewSerializer
+    return RowBuilder(ReviewSerializer)
+
+
+def attendee_row_builder():
+    from .serializers import AttendeeSerializer
+    return RowBuilder(AttendeeSerializer)
+
+
+class FastListMixin:
+    """
+    Serve ``list()`` from ``.values()`` rows through a ``RowBuilder``.
+
+    Disabled with ``EVENTS_FAST_READ_PATH = False``, which falls back to
+    the regular serializer, as do requests with ``?expand=``.
+    """
+    row_builder = None
+
+    def get_fieldset(self):
+        """Overridden by ``SparseFieldsetMixin``."""
+        return None, ()
+
+    def list(self, request, *args, **kwargs):
+        fields, expand = self.get_fieldset()
+        if self.row_builder is None or expand or not getattr(settings, 'EVENTS_FAST_READ_PATH', True):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.row_builder.values(
+            self.filter_queryset(self.get_queryset()), fields, extra=key_columns(self)
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.build_rows(page, fields))
+        return Response(self.build_rows(queryset, fields))
+
+    def build_rows(self, rows, fields=None):
+        rows = list(rows)
+        # Events created without a stats row; a no-op for rows without stats columns
+        fill_missing_stats(rows)
+        metrics = current_request_metrics()
+        start = time.perf_counter()
+        data = self.row_builder.build(rows, fields)
+        if metrics is not None:
+            # Reported as serialization time, like the serializer path
+            metrics.serialize_time += time.perf_counter() - start
+        return data
@@ -0,0 +1,128 @@
+"""
+Sparse fieldsets and expansions for event, RSVP and review payloads.
+
+``?fields=id,title,start_time`` limits each object to the named fields and
+``?expand=organizer`` replaces a foreign key with a nested object. Fields
+left out are never computed, and read querysets are trimmed with
+``only()`` to the columns and joins the remaining fields actually read,
+so e.g. leaving out ``rsvp_count`` and ``average_rating`` also drops the
+``EventStats`` join.
+"""
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from .pagination import key_columns
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_names(value):
+    """Comma-separated names, stripped and de-duplicated in order."""
+    return tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Accept ``fields`` and ``expand`` keyword arguments.
+
+    ``expandable_fields`` maps a field to the serializer that replaces it
+    when expanded. ``field_columns`` lists the model paths read by fields
+    without a model source (method fields); those not listed read nothing
+    beyond the primary key and annotations.
+    """
+    expandable_fields = {}
+    field_columns = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requested_fields = None if fields is None else frozenset(fields)
+        self.expanded_fields = tuple(expand)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.expanded_fields:
+            fields[name] = self.expandable_fields[name](read_only=True)
+        return fields
+
+    @property
+    def _readable_fields(self):
+        for field in super()._readable_fields:
+            if self.requested_fields is None or field.field_name in self.requested_fields:
+                yield field
+
+    def get_columns(self):
+        """``only()`` paths covering every field this serializer outputs."""
+        columns = []
+        for field in self._readable_fields:
+            if field.field_name in self.field_columns:
+                columns.extend(self.field_columns[field.field_name])
+            elif field.source == '*':
+                continue
+            elif isinstance(field, SparseFieldsetSerializerMixin):
+                prefix = '__'.join(field.source_attrs)
+                columns.extend(f'{prefix}__{column}' for column in field.get_columns())
+            else:
+                columns.append('__'.join(field.source_attrs))
+        return columns
+
+
+def trim_queryset(queryset, columns):
+    """Load only ``columns`` (and the pk), joining just the relations they cross."""
+    relations = {column.rsplit('__', 1)[0] for column in columns if '__' in column}
+    return queryset.select_related(None).select_related(*sorted(relations)).only(*columns)
+
+
+class SparseFieldsetMixin:
+    """
+    Read ``?fields=`` and ``?expand=``, reject unknown names with 400, hand
+    them to the serializer and trim querysets of read requests.
+    """
+
+    def get_fieldset(self):
+        """``(fields, expand)``; ``fields`` is None when every field is wanted."""
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = self._parse_fieldset()
+        return self._fieldset
+
+    def _parse_fieldset(self):
+        params = self.request.query_params
+        fields = parse_names(params.get(FIELDS_PARAM, '')) or None
+        expand = parse_names(params.get(EXPAND_PARAM, ''))
+        serializer_class = self.get_serializer_class()
+
+        errors = {}
+        available = serializer_class().fields
+        unknown = [name for name in fields or () if name not in available]
+        if unknown:
+            errors[FIELDS_PARAM] = [f'Unknown field(s): {", ".join(unknown)}.']
+        unexpandable = [name for name in expand if name not in serializer_class.expandable_fields]
+        if unexpandable:
+            errors[EXPAND_PARAM] = [
+                f'Cannot expand: {", ".join(unexpandable)}. '
+                f'Expandable: {", ".join(serializer_class.expandable_fields) or "none"}.'
+            ]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        if fields is not None:
+            # Expanding a field that is not returned would only add a join
+            expand = tuple(name for name in expand if name in fields)
+        return fields, expand
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_fieldset()
+        kwargs.setdefault('fields', fields)
+        kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        fields, expand = self.get_fieldset()
+        if fields is None and not expand:
+            return queryset
+        serializer = self.get_serializer_class()(fields=fields, expand=expand)
+        # Cursor keys are read from the last row of a page even when not returned
+        return trim_queryset(queryset, serializer.get_columns() + key_columns(self))
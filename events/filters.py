@@ -0,0 +1,107 @@
+"""
+Filter sets for event-related endpoints.
+"""
+from django import forms
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_filters import CharFilter, Filter, FilterSet
+
+from . import geo
+from .models import Event
+
+DEFAULT_NEAR_RADIUS_KM = 10
+MAX_NEAR_RADIUS_KM = 500
+
+
+def parse_window(value):
+    """Parse ``start,end`` ISO datetimes into an aware ``(start, end)`` pair."""
+    parts = [part.strip() for part in value.split(',')] if value else []
+    if len(parts) != 2:
+        raise forms.ValidationError('Expected "start,end" as two ISO 8601 datetimes.')
+    window = []
+    for part in parts:
+        try:
+            parsed = parse_datetime(part)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise forms.ValidationError(f'Invalid datetime "{part}".')
+        window.append(timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed)
+    if window[0] > window[1]:
+        raise forms.ValidationError('Window start must not be after its end.')
+    return tuple(window)
+
+
+class TimeWindowField(forms.CharField):
+    def to_python(self, value):
+        value = super().to_python(value)
+        return parse_window(value) if value else None
+
+
+class TimeWindowFilter(Filter):
+    field_class = TimeWindowField
+
+
+class PointField(forms.CharField):
+    """``lat,lon`` in decimal degrees."""
+    
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise forms.ValidationError('Expected "lat,lon" in decimal degrees.')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise forms.ValidationError('Coordinates are out of range.')
+        return latitude, longitude
+
+
+class PointFilter(Filter):
+    field_class = PointField
+
+
+class DistanceFilter(Filter):
+    field_class = forms.FloatField
+
+
+class EventFilter(FilterSet):
+    """Custom filter for events with case-insensitive location search."""
+    location = CharFilter(field_name='location', lookup_expr='icontains')
+    venue = CharFilter(field_name='location')
+    overlaps = TimeWindowFilter(method='filter_overlaps')
+    contains = TimeWindowFilter(method='filter_contains')
+    near = PointFilter(method='filter_near')
+    radius_km = DistanceFilter(method='filter_radius', min_value=0.01, max_value=MAX_NEAR_RADIUS_KM)
+    
+    class Meta:
+        model = Event
+        fields = ['location', 'venue', 'organizer', 'is_public', 'overlaps', 'contains', 'near', 'radius_km']
+    
+    def filter_overlaps(self, queryset, name, value):
+        """Events sharing any instant with the half-open window."""
+        start, end = value
+        return queryset.filter(start_time__lt=end, end_time__gt=start)
+    
+    def filter_contains(self, queryset, name, value):
+        """Events running for the whole window."""
+        start, end = value
+        return queryset.filter(start_time__lte=start, end_time__gte=end)
+    
+    def filter_near(self, queryset, name, value):
+        """
+        Located events within ``radius_km`` of the point, annotated with
+        ``distance_km``: geohash prefixes prune in SQL, haversine refines.
+        """
+        latitude, longitude = value
+        radius = self.form.cleaned_data.get('radius_km') or DEFAULT_NEAR_RADIUS_KM
+        cells = geo.covering_cells(latitude, longitude, radius)
+        queryset = queryset.filter(geo.cells_q(cells)) if cells else queryset.exclude(geohash='')
+        return queryset.annotate(
+            distance_km=geo.distance_km(latitude, longitude)
+        ).filter(distance_km__lte=radius)
+    
+    def filter_radius(self, queryset, name, value):
+        # Read by filter_near; on its own the radius filters nothing
+        return queryset
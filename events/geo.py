@@ -0,0 +1,115 @@
+"""
+Geohash cells and great-circle distance for "events near me" queries.
+
+Each located event stores the geohash of its coordinates. A radius query
+picks the longest geohash prefix whose cell is at least as large as the
+radius, so the circle always fits inside that cell and its eight
+neighbours; those nine prefixes become indexed range predicates, and the
+surviving rows are refined with the haversine distance in SQL.
+"""
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+DECODE = {char: index for index, char in enumerate(BASE32)}
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+PRECISION = 9
+# Sorts after every geohash character, closing a prefix range
+PREFIX_END = '~'
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def decode_bounds(geohash):
+    """Return ``(min_lat, max_lat, min_lon, max_lon)`` of a cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = DECODE[char]
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def neighbors(geohash):
+    """The (up to) eight cells around ``geohash``, wrapping at the antimeridian."""
+    min_lat, max_lat, min_lon, max_lon = decode_bounds(geohash)
+    height, width = max_lat - min_lat, max_lon - min_lon
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    cells = set()
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            latitude = center_lat + d_lat * height
+            if (d_lat, d_lon) == (0, 0) or not -90 < latitude < 90:
+                continue
+            longitude = (center_lon + d_lon * width + 180) % 360 - 180
+            cells.add(encode(latitude, longitude, len(geohash)))
+    return cells
+
+
+def cell_size_km(precision, latitude):
+    """Approximate ``(height, width)`` in km of a cell at ``latitude``."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    height = 180 / 2 ** lat_bits * KM_PER_DEGREE
+    width = 360 / 2 ** lon_bits * KM_PER_DEGREE * math.cos(math.radians(latitude))
+    return height, width
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Geohash prefixes whose cells cover the circle, or None if it is too
+    large (or too close to a pole) for prefix pruning to help.
+    """
+    for precision in range(PRECISION, 0, -1):
+        if min(cell_size_km(precision, latitude)) >= radius_km:
+            cell = encode(latitude, longitude, precision)
+            return {cell} | neighbors(cell)
+    return None
+
+
+def cells_q(cells, field='geohash'):
+    """OR of one indexed range predicate per geohash prefix."""
+    query = Q()
+    for cell in sorted(cells):
+        query |= Q(**{f'{field}__gte': cell, f'{field}__lt': cell + PREFIX_END})
+    return query
+
+
+def distance_km(latitude, longitude, lat_field='latitude', lon_field='longitude'):
+    """Haversine distance from a point to each row's coordinates, in km."""
+    half_d_lat = Radians(F(lat_field) - Value(latitude)) / 2
+    half_d_lon = Radians(F(lon_field) - Value(longitude)) / 2
+    a = (
+        Power(Sin(half_d_lat), 2)
+        + Value(math.cos(math.radians(latitude))) * Cos(Radians(F(lat_field))) * Power(Sin(half_d_lon), 2)
+    )
+    # Rounding can push `a` a hair above 1, outside the domain of asin
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
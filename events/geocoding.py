@@ -0,0 +1,75 @@
+"""
+Pluggable geocoding of free-text event locations.
+
+``EVENTS_GEOCODER`` names the backend class; ``LocalFileGeocoder`` reads
+a static gazetteer and is what tests and offline deployments use. A
+geocoder returns ``(latitude, longitude)`` or None when it cannot place
+the location; events then simply stay out of "near me" results.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+class BaseGeocoder:
+    def geocode(self, location):
+        raise NotImplementedError
+
+
+class NullGeocoder(BaseGeocoder):
+    """Never resolves anything; coordinates must be supplied explicitly."""
+
+    def geocode(self, location):
+        return None
+
+
+class LocalFileGeocoder(BaseGeocoder):
+    """
+    Look locations up in a JSON object (``{"name": [lat, lon]}``) or a CSV
+    file with ``location,latitude,longitude`` columns. Matching ignores
+    case and surrounding whitespace.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, 'EVENTS_GEOCODER_FILE', '')
+        self._places = None
+
+    @staticmethod
+    def normalize(location):
+        return ' '.join(location.split()).casefold()
+
+    def load(self):
+        if not self.path:
+            return {}
+        with open(self.path, newline='', encoding='utf-8') as fp:
+            if self.path.endswith('.json'):
+                rows = ((name, lat, lon) for name, (lat, lon) in json.load(fp).items())
+            else:
+                rows = ((row['location'], row['latitude'], row['longitude']) for row in csv.DictReader(fp))
+            return {self.normalize(name): (float(lat), float(lon)) for name, lat, lon in rows}
+
+    def geocode(self, location):
+        if self._places is None:
+            self._places = self.load()
+        return self._places.get(self.normalize(location or ''))
+
+
+_geocoder = None
+
+
+def get_geocoder():
+    global _geocoder
+    if _geocoder is None:
+        _geocoder = import_string(getattr(settings, 'EVENTS_GEOCODER', 'events.geocoding.NullGeocoder'))()
+    return _geocoder
+
+
+@receiver(setting_changed)
+def reset_geocoder(setting, **kwargs):
+    global _geocoder
+    if setting in ('EVENTS_GEOCODER', 'EVENTS_GEOCODER_FILE'):
+        _geocoder = None
@@ -0,0 +1,132 @@
+"""
+Time-range queries over event schedules.
+
+``IntervalIndex`` keeps half-open ``[start, end)`` intervals sorted by
+start together with a running maximum of their end times, so "does
+anything overlap this window" takes two binary searches. ``venue_index``
+keeps one index per venue in process memory, loaded from the covering
+``(location, start_time, end_time)`` index and reloaded whenever the
+venue's cache version is bumped by a write; it serves schedule reads
+such as free slots. Booking checks use ``venue_conflict``, which only
+reads the rows around the requested window.
+"""
+import bisect
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from .caching import get_versions, venue_scope
+from .models import Event
+
+VENUE_INDEX_CACHE_SIZE = 256
+
+_venue_indexes = OrderedDict()
+_venue_indexes_lock = threading.Lock()
+
+
+class IntervalIndex:
+    """Static index over ``(key, start, end)`` triples."""
+
+    def __init__(self, intervals=()):
+        items = sorted(intervals, key=lambda item: (item[1], item[2]))
+        self.keys = [key for key, _, _ in items]
+        self.starts = [start for _, start, _ in items]
+        self.ends = [end for _, _, end in items]
+        # max_ends[i] is the latest end among the first i + 1 intervals; it never decreases
+        self.max_ends = list(itertools.accumulate(self.ends, max))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def overlapping(self, start, end):
+        """Yield ``(key, start, end)`` of every interval overlapping ``[start, end)``, by start."""
+        # Only intervals starting before `end` can overlap...
+        stop = bisect.bisect_left(self.starts, end)
+        # ...and none before the first prefix whose latest end passes `start`
+        first = bisect.bisect_right(self.max_ends, start, hi=stop)
+        for i in range(first, stop):
+            if self.ends[i] > start:
+                yield self.keys[i], self.starts[i], self.ends[i]
+
+    def containing(self, start, end):
+        """Yield every interval that fully contains ``[start, end]``."""
+        stop = bisect.bisect_right(self.starts, start)
+        first = bisect.bisect_left(self.max_ends, end, hi=stop)
+        for i in range(first, stop):
+            if self.ends[i] >= end:
+                yield self.keys[i], self.starts[i], self.ends[i]
+
+    def first_conflict(self, start, end, exclude=None):
+        """
+        Key of one interval overlapping ``[start, end)``, or None.
+
+        The first candidate left by the binary searches always overlaps,
+        so this is O(log n) unless ``exclude`` has to be skipped.
+        """
+        for key, _, _ in self.overlapping(start, end):
+            if key != exclude:
+                return key
+        return None
+
+    def free_slots(self, start, end, min_duration=timedelta(0)):
+        """Gaps of at least ``min_duration`` inside ``[start, end)`` not covered by any interval."""
+        slots = []
+        cursor = start
+        for _, busy_start, busy_end in self.overlapping(start, end):
+            if busy_start > cursor and busy_start - cursor >= min_duration:
+                slots.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if end > cursor and end - cursor >= min_duration:
+            slots.append((cursor, end))
+        return slots
+
+
+def venue_conflict(location, start, end, exclude=None):
+    """
+    Id of an event at ``location`` overlapping ``[start, end)``, or None.
+
+    Two probes of ``event_location_span_idx``, each O(log n): an event
+    starting inside the window, or the latest one starting before it still
+    running at ``start``. The second is enough because, with conflicts
+    prevented, a venue's bookings never overlap each other, so the latest
+    to start also ends last.
+    """
+    at_venue = Event.objects.filter(location=location).exclude(pk=exclude).order_by()
+    inside = at_venue.filter(start_time__gte=start, start_time__lt=end).order_by('start_time')
+    conflict = inside.values_list('pk', flat=True).first()
+    if conflict is not None:
+        return conflict
+    running = at_venue.filter(start_time__lt=start).order_by('-start_time').values_list('pk', 'end_time').first()
+    if running is not None and running[1] > start:
+        return running[0]
+    return None
+
+
+def load_venue_index(location):
+    rows = Event.objects.filter(location=location).order_by().values_list('id', 'start_time', 'end_time')
+    return IntervalIndex(rows)
+
+
+def venue_index(location):
+    """Return the schedule index of one venue, reloading it when the venue changed."""
+    scope = venue_scope(location)
+    version = get_versions([scope])[scope]
+    with _venue_indexes_lock:
+        entry = _venue_indexes.get(location)
+        if entry is not None and entry[0] == version:
+            _venue_indexes.move_to_end(location)
+            return entry[1]
+
+    index = load_venue_index(location)
+    with _venue_indexes_lock:
+        _venue_indexes[location] = (version, index)
+        _venue_indexes.move_to_end(location)
+        while len(_venue_indexes) > VENUE_INDEX_CACHE_SIZE:
+            _venue_indexes.popitem(last=False)
+    return index
+
+
+def clear_venue_indexes():
+    with _venue_indexes_lock:
+        _venue_indexes.clear()
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.filters import EventFilter
+from events.models import Event
+from events.transfer import FORMATS, export_rows, serialize_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream events as NDJSON or CSV. Filters mirror the /api/events/ query parameters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Destination file (default: stdout).')
+        parser.add_argument('--format', dest='output_format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--location', help='Case-insensitive location substring.')
+        parser.add_argument('--is-public', choices=['true', 'false'])
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        data = {'location': options['location'], 'is_public': options['is_public']}
+        filterset = EventFilter({key: value for key, value in data.items() if value is not None}, queryset=Event.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors)
+
+        rows = export_rows(filterset.qs, chunk_size=options['chunk_size'])
+        fp = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else self.stdout
+        try:
+            for chunk in serialize_rows(rows, options['output_format']):
+                fp.write(chunk)
+        finally:
+            if options['output']:
+                fp.close()
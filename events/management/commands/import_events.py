@@ -0,0 +1,40 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.transfer import FORMATS, import_events, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Import events from NDJSON or CSV, validating and inserting in chunked transactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='input_format', choices=FORMATS,
+                            help='Input format (default: from the file extension).')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['input_format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if input_format == 'jsonl':
+            input_format = 'ndjson'
+        if input_format not in FORMATS:
+            raise CommandError('Cannot infer the input format; pass --format.')
+
+        started = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as fp:
+            report = import_events(read_rows(fp, input_format), batch_size=options['batch_size'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+
+        for line_number, errors in report.errors:
+            self.stderr.write(f'Line {line_number}: {errors}')
+        if options['dry_run']:
+            summary = f'Validated {report.valid} event(s)'
+        else:
+            summary = f'Imported {report.created} event(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{summary} in {elapsed:.2f}s; {len(report.errors)} row(s) rejected.'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.stats import rebuild_stats, verify_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or verify the denormalized EventStats rows from the RSVP and Review tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Only report drifted rows, do not write.')
+        parser.add_argument('--event', type=int, action='append', dest='event_ids', help='Limit to event id (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        event_ids = options['event_ids']
+        batch_size = options['batch_size']
+
+        if options['verify']:
+            mismatches = verify_stats(event_ids, batch_size=batch_size)
+            for event_id, diff in sorted(mismatches.items()):
+                details = ', '.join(f'{field}: stored={stored} expected={expected}' for field, (stored, expected) in diff.items())
+                self.stdout.write(f'Event {event_id}: {details}')
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} event(s) have stale stats.')
+            self.stdout.write(self.style.SUCCESS('Event stats are consistent.'))
+            return
+
+        processed = rebuild_stats(event_ids, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {processed} event(s).'))
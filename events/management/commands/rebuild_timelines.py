@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.timeline import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized "my events" timelines from the Event and RSVP tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='Limit to user id (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_timelines(options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} timeline entries in {time.perf_counter() - started:.2f}s.'
+        ))
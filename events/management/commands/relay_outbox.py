@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from events.outbox import purge_dispatched, relay
+
+
+class Command(BaseCommand):
+    help = 'Drain the task outbox to Celery in batches (use --loop to run as a long-lived relay).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting when drained.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--purge-days', type=int, default=7, help='Delete messages dispatched this many days ago.')
+
+    def handle(self, *args, **options):
+        total_dispatched = total_failed = 0
+        try:
+            while True:
+                dispatched, failed = relay(batch_size=options['batch_size'])
+                total_dispatched += dispatched
+                total_failed += failed
+                if dispatched + failed < options['batch_size']:
+                    # Drained (or only backing-off messages remain)
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        purged = purge_dispatched(timedelta(days=options['purge_days']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Dispatched {total_dispatched} message(s), {total_failed} failed, purged {purged}.'
+        ))
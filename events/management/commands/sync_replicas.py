@@ -0,0 +1,46 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database onto each read replica with the online backup API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', nargs='+', metavar='PATH', help='Replica files (default: DATABASE_REPLICAS).')
+        parser.add_argument('--loop', action='store_true', help='Keep refreshing the replicas.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between refreshes with --loop.')
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('sync_replicas copies SQLite files; use the database\'s own replication elsewhere.')
+        targets = options['to'] or [settings.DATABASES[alias]['NAME'] for alias in settings.DATABASE_REPLICAS]
+        if not targets:
+            raise CommandError('No replicas configured; set DATABASE_REPLICA_NAMES or pass --to.')
+
+        try:
+            while True:
+                started = time.perf_counter()
+                for target in targets:
+                    self.copy(primary, str(target))
+                self.stdout.write(self.style.SUCCESS(
+                    f'Synced {len(targets)} replica(s) in {time.perf_counter() - started:.2f}s.'
+                ))
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def copy(self, primary, target):
+        primary.ensure_connection()
+        # Writes into the live file, so replica connections see the new pages without reconnecting
+        destination = sqlite3.connect(target)
+        try:
+            primary.connection.backup(destination)
+        finally:
+            destination.close()
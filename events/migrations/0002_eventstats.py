@@ -0,0 +1,52 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_event_stats(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventStats = apps.get_model('events', 'EventStats')
+    RSVP = apps.get_model('events', 'RSVP')
+    Review = apps.get_model('events', 'Review')
+    status_fields = {'Going': 'going_count', 'Maybe': 'maybe_count', 'Not Going': 'not_going_count'}
+
+    stats = {event_id: EventStats(event_id=event_id) for event_id in Event.objects.values_list('pk', flat=True)}
+    for row in RSVP.objects.order_by().values('event_id', 'status').annotate(total=models.Count('pk')):
+        field = status_fields.get(row['status'])
+        if field:
+            setattr(stats[row['event_id']], field, row['total'])
+    for row in Review.objects.order_by().values('event_id', 'rating').annotate(total=models.Count('pk')):
+        row_stats = stats[row['event_id']]
+        row_stats.review_count += row['total']
+        row_stats.rating_sum += row['rating'] * row['total']
+        setattr(row_stats, f"rating_{row['rating']}", row['total'])
+    EventStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventStats',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='events.event')),
+                ('going_count', models.PositiveIntegerField(default=0)),
+                ('maybe_count', models.PositiveIntegerField(default=0)),
+                ('not_going_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'event stats',
+            },
+        ),
+        migrations.RunPython(populate_event_stats, migrations.RunPython.noop),
+    ]
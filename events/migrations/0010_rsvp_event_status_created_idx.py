@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='rsvp',
+            name='rsvp_event_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(fields=['event', 'status', 'created_at'], name='rsvp_event_status_created_idx'),
+        ),
+    ]
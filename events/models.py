@@ -1,7 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+from . import geo
+
+class EventQuerySet(models.QuerySet):
+    def with_aggregates(self):
+        """Join the organizer and precomputed stats so serializers avoid per-row queries."""
+        return self.select_related('organizer', 'stats')
 
 class Event(models.Model):
     title = models.CharField(max_length=255)
@@ -11,22 +19,61 @@ class Event(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     is_public = models.BooleanField(default=True)  # Added this
+    # Seats for "Going" RSVPs (null: unlimited); further RSVPs join the waitlist
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Geohash of the coordinates ('' when unknown); "near me" queries prune by prefix
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)  # Added this
     
+    objects = EventQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-start_time']
+        indexes = [
+            # Keyset pagination scans (start_time, id) / (created_at, id) ranges
+            models.Index(fields=['start_time', 'id'], name='event_start_time_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='event_created_at_id_idx'),
+            # Partial index for the public feed: matches the bare `WHERE is_public` predicate
+            models.Index(fields=['start_time', 'id'], condition=models.Q(is_public=True), name='event_public_start_idx'),
+            # Covers venue schedules: equality on location, range on start, end read from the index
+            models.Index(fields=['location', 'start_time', 'end_time'], name='event_location_span_idx'),
+            models.Index(fields=['geohash'], name='event_geohash_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # A move to another venue must invalidate the old venue's schedule too
+        instance._original_location = instance.__dict__.get('location')
+        instance._original_capacity = instance.__dict__.get('capacity')
+        # Timeline entries copy the start time and follow the organizer
+        instance._original_start_time = instance.__dict__.get('start_time')
+        instance._original_organizer_id = instance.__dict__.get('organizer_id')
+        return instance
+    
     def clean(self):
         if self.start_time and self.end_time:
             if self.end_time <= self.start_time:
                 raise ValidationError({'end_time': 'End time must be after start time.'})
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValidationError({'latitude': 'Latitude and longitude must be set together.'})
+        if self.latitude is not None and not -90 <= self.latitude <= 90:
+            raise ValidationError({'latitude': 'Latitude must be between -90 and 90.'})
+        if self.longitude is not None and not -180 <= self.longitude <= 180:
+            raise ValidationError({'longitude': 'Longitude must be between -180 and 180.'})
+        self.geohash = geo.encode(self.latitude, self.longitude) if self.latitude is not None else ''
     
     def save(self, *args, **kwargs):
         self.clean()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
         super().save(*args, **kwargs)
 
 class RSVP(models.Model):
@@ -34,6 +81,7 @@ class RSVP(models.Model):
         ('Going', 'Going'),
         ('Maybe', 'Maybe'),
         ('Not Going', 'Not Going'),
+        ('Waitlisted', 'Waitlisted'),
     ]
     
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='rsvps')
@@ -44,17 +92,29 @@ class RSVP(models.Model):
     class Meta:
         unique_together = ['event', 'user']
         ordering = ['-created_at']
+        indexes = [
+            # Attendee lists and waitlist promotion read one status of one event in signup order
+            models.Index(fields=['event', 'status', 'created_at'], name='rsvp_event_status_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.event.title} - {self.status}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so stats can apply the transition on save
+        instance._original_status = instance.__dict__.get('status')
+        return instance
+    
     def clean(self):
         if self.event.organizer == self.user:
             raise ValidationError({'user': 'Event organizer cannot RSVP to their own event.'})
     
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 class Review(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='reviews')
@@ -66,6 +126,116 @@ class Review(models.Model):
     class Meta:
         unique_together = ['event', 'user']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event', 'created_at', 'id'], name='review_event_created_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.event.title} - {self.rating} stars"
+
+class EventStats(models.Model):
+    """Denormalized RSVP and rating aggregates, maintained incrementally with F() updates."""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    going_count = models.PositiveIntegerField(default=0)
+    maybe_count = models.PositiveIntegerField(default=0)
+    not_going_count = models.PositiveIntegerField(default=0)
+    waitlisted_count = models.PositiveIntegerField(default=0)
+    # Copy of Event.capacity, so claiming a seat is one conditional UPDATE of this row
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = 'event stats'
+    
+    def __str__(self):
+        return f"Stats for {self.event_id}"
+    
+    @property
+    def rsvp_count(self):
+        return self.going_count + self.maybe_count + self.not_going_count
+    
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 1)
+
+
+class TimelineEntry(models.Model):
+    """An event on a user's "my events" timeline (see ``events.timeline``)."""
+    REASON_CHOICES = [
+        ('Organizer', 'Organizer'),
+        ('Going', 'Going'),
+        ('Maybe', 'Maybe'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='timeline_entries')
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    # Copy of Event.start_time, so a page is one range scan of the user's entries
+    start_time = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['user', 'event']
+        indexes = [
+            models.Index(fields=['user', 'start_time', 'id'], name='timeline_user_start_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_id} on {self.user_id}'s timeline ({self.reason})"
+
+
+class PendingNotification(models.Model):
+    """Organizer notification buffered until the next digest flush."""
+    KIND_CHOICES = [
+        ('rsvp', 'RSVP'),
+        ('review', 'Review'),
+    ]
+    
+    organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pending_notifications')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='pending_notification_due_idx'),
+            models.Index(fields=['organizer', 'created_at'], name='pending_notification_org_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} notification for {self.organizer_id}"
+
+
+class OutboxMessage(models.Model):
+    """Celery task dispatch recorded in the same transaction as the write that caused it."""
+    task_name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    dedupe_key = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'],
+                condition=models.Q(dispatched_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.user.username} - {self.event.title} - {self.rating} stars"
\ No newline at end of file
+        return f"{self.task_name} ({self.dedupe_key})"
@@ -0,0 +1,131 @@
+"""
+Transactional outbox for Celery task dispatch.
+
+Request handlers call ``enqueue`` inside the transaction that writes the
+RSVP/Review, so the job is committed atomically with the data and the
+request never waits on the broker. A separate relay process drains the
+table in batches, publishing over one producer connection outside any
+transaction, with retries and exponential backoff. Task ids are derived
+from the dedupe key, so a message re-published after a relay crash
+carries the same id. Async views use ``aenqueue``, which only writes the
+row, so they never block the event loop on a broker round trip.
+"""
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+MAX_ATTEMPTS = 10
+MAX_BACKOFF = timedelta(minutes=10)
+# How long a relay owns the batch it is publishing
+LEASE = timedelta(minutes=5)
+TASK_ID_NAMESPACE = uuid.UUID('6f1d8f0e-3f55-4a8e-9a4f-1b8f0f1f6c2a')
+
+
+def build_message(task_name, args=(), kwargs=None, dedupe_key=None):
+    return OutboxMessage(
+        task_name=task_name,
+        args=list(args),
+        kwargs=kwargs or {},
+        dedupe_key=dedupe_key or uuid.uuid4().hex,
+    )
+
+
+def enqueue(task_name, args=(), kwargs=None, dedupe_key=None):
+    """Record a task for dispatch; a message with an existing ``dedupe_key`` is dropped."""
+    enqueue_many([build_message(task_name, args, kwargs, dedupe_key)])
+
+
+def enqueue_many(messages):
+    OutboxMessage.objects.bulk_create(messages, ignore_conflicts=True)
+
+
+async def aenqueue(task_name, args=(), kwargs=None, dedupe_key=None):
+    """``enqueue`` for async views; like it, never talks to the broker."""
+    await aenqueue_many([build_message(task_name, args, kwargs, dedupe_key)])
+
+
+async def aenqueue_many(messages):
+    await OutboxMessage.objects.abulk_create(messages, ignore_conflicts=True)
+
+
+def task_id_for(message):
+    return str(uuid.uuid5(TASK_ID_NAMESPACE, message.dedupe_key))
+
+
+def _celery_app():
+    from event_management.celery import app
+    from . import tasks  # noqa: F401  (registers the shared tasks on the app)
+    return app
+
+
+def _backoff(attempts):
+    return min(timedelta(seconds=2 ** attempts), MAX_BACKOFF)
+
+
+def _claim(batch_size, max_attempts, lease, now):
+    """Lease a batch of due messages to this relay; the write lock is held only for these two queries."""
+    with transaction.atomic():
+        pending = OutboxMessage.objects.filter(
+            dispatched_at__isnull=True, available_at__lte=now, attempts__lt=max_attempts
+        ).order_by('available_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        messages = list(pending[:batch_size])
+        OutboxMessage.objects.filter(pk__in=[message.pk for message in messages]).update(available_at=now + lease)
+    return messages
+
+
+def relay(batch_size=100, max_attempts=MAX_ATTEMPTS, lease=LEASE):
+    """
+    Publish one batch of due messages. Returns ``(dispatched, failed)``.
+
+    The batch is leased in a short transaction (its ``available_at`` moves
+    ``lease`` into the future, so other relays skip it) and published with
+    no transaction open: on SQLite the write lock would otherwise be held
+    for every broker round trip, stalling all writes while the broker is
+    slow. Outcomes are recorded in a second short transaction. A relay that
+    dies mid-batch leaves its messages to be re-published, under the same
+    task ids, once the lease runs out.
+    """
+    app = _celery_app()
+    now = timezone.now()
+    messages = _claim(batch_size, max_attempts, lease, now)
+    if not messages:
+        return 0, 0
+
+    dispatched, failed = [], []
+    # Eager mode runs tasks in-process; there is no broker to hold a producer for
+    producer_context = nullcontext() if app.conf.task_always_eager else app.producer_or_acquire()
+    with producer_context as producer:
+        for message in messages:
+            try:
+                app.tasks[message.task_name].apply_async(
+                    args=message.args,
+                    kwargs=message.kwargs,
+                    task_id=task_id_for(message),
+                    producer=producer,
+                )
+            except Exception as exc:
+                message.attempts += 1
+                message.available_at = timezone.now() + _backoff(message.attempts)
+                message.last_error = f'{type(exc).__name__}: {exc}'
+                failed.append(message)
+            else:
+                dispatched.append(message.pk)
+
+    with transaction.atomic():
+        OutboxMessage.objects.filter(pk__in=dispatched).update(dispatched_at=timezone.now())
+        OutboxMessage.objects.bulk_update(failed, ['attempts', 'available_at', 'last_error'])
+    return len(dispatched), len(failed)
+
+
+def purge_dispatched(older_than=timedelta(days=7)):
+    """Delete delivered messages; they only need to live long enough to dedupe."""
+    cutoff = timezone.now() - older_than
+    deleted, _ = OutboxMessage.objects.filter(dispatched_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,167 @@
+"""
+Keyset (cursor) pagination for the high-volume list endpoints.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Opaque-cursor pagination keyed on ``(ordering field, id)``.
+
+    Unlike DRF's ``CursorPagination`` the cursor stores the full key of the
+    boundary row, so every page is a single indexed range scan with no
+    ``COUNT(*)`` and no ``OFFSET``, regardless of how deep the client pages.
+    The ordering field honours the view's ``OrderingFilter``.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    tiebreak_field = 'id'
+    # Relevance annotations that take over the default ordering when present
+    rank_annotations = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` fetching the page with the async ORM."""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([row async for row in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        """The page's rows plus one (to detect a next page), or None when paging is off."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.key_field = self.ordering[0].lstrip('-')
+        self.descending = self.ordering[0].startswith('-')
+        self.cursor = self.decode_cursor(request)
+
+        self.reverse = bool(self.cursor and self.cursor.reverse)
+        queryset = queryset.order_by(*self._order_by(self.reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self._after(self._decode_position(self.cursor.position), self.reverse))
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.cursor is not None, has_more
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering_param = getattr(OrderingFilter, 'ordering_param', 'ordering')
+        if not request.query_params.get(ordering_param):
+            for annotation in self.rank_annotations:
+                if annotation in queryset.query.annotations:
+                    return (annotation,)
+        return super().get_ordering(request, queryset, view)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self._encode_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self._encode_position(self.page[0])))
+
+    def _order_by(self, reverse):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        fields = [prefix + self.key_field]
+        if self.key_field != self.tiebreak_field:
+            fields.append(prefix + self.tiebreak_field)
+        return fields
+
+    def _after(self, position, reverse):
+        """Filter selecting the rows strictly after ``position`` in scan order."""
+        value, pk = position
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        if self.key_field == self.tiebreak_field:
+            return Q(**{f'{self.tiebreak_field}__{lookup}': pk})
+        return (
+            Q(**{f'{self.key_field}__{lookup}': value})
+            | Q(**{self.key_field: value, f'{self.tiebreak_field}__{lookup}': pk})
+        )
+
+    @staticmethod
+    def _get_value(item, field):
+        if isinstance(item, dict):
+            return item[field]
+        return getattr(item, field)
+
+    def _encode_position(self, item):
+        value = self._get_value(item, self.key_field)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = str(value)
+        return json.dumps({
+            'o': self.ordering[0],
+            'v': value,
+            'id': self._get_value(item, self.tiebreak_field),
+        }, separators=(',', ':'))
+
+    def _decode_position(self, position):
+        try:
+            data = json.loads(position)
+            if data['o'] != self.ordering[0]:
+                raise ValueError('Cursor was issued for a different ordering.')
+            return data['v'], data['id']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+def key_columns(view):
+    """Columns a keyset paginator may read from the rows of ``view``, output or not."""
+    pagination = getattr(view, 'pagination_class', None)
+    if not (isinstance(pagination, type) and issubclass(pagination, KeysetCursorPagination)):
+        return []
+    ordering = pagination.ordering
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    return [
+        pagination.tiebreak_field,
+        *(field.lstrip('-') for field in ordering),
+        *getattr(view, 'ordering_fields', ()),
+    ]
+
+
+class EventCursorPagination(KeysetCursorPagination):
+    ordering = '-start_time'
+    rank_annotations = ('search_rank', 'distance_km')
+
+
+class ReviewCursorPagination(KeysetCursorPagination):
+    ordering = '-created_at'
+
+
+class AttendeeCursorPagination(KeysetCursorPagination):
+    # Signup order, the order the (event, status, created_at) index is read in
+    ordering = 'created_at'
+    max_page_size = 1000
+
+
+class TimelineCursorPagination(KeysetCursorPagination):
+    ordering = 'start_time'
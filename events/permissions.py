@@ -10,3 +10,10 @@ class IsOrganizerOrReadOnly(permissions.BasePermission):
         
         # Write permissions only for organizer
         return obj.organizer == request.user
+
+
+class IsEventOrganizer(permissions.BasePermission):
+    """Only the event's organizer (or staff) may access it."""
+    
+    def has_object_permission(self, request, view, obj):
+        return request.user.is_staff or obj.organizer_id == request.user.pk
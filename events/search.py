@@ -0,0 +1,217 @@
+"""
+Pluggable full-text search backends for events.
+
+The active backend is chosen by the ``EVENTS_SEARCH_BACKEND`` setting (a
+dotted path) or, when unset, by the database vendor. Backends keep their
+index in sync incrementally from the Event signal handlers and annotate
+matching querysets with ``search_rank`` (lower is more relevant).
+"""
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import SearchFilter
+
+from .models import Event
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query or '')
+
+
+class BaseSearchBackend:
+    """Interface shared by all search backends."""
+
+    def setup(self, using):
+        """Create the index structures, if the backend needs any."""
+
+    def index(self, events):
+        """Add or refresh the given events in the index."""
+
+    def remove(self, event_ids):
+        """Drop the given event ids from the index."""
+
+    def clear(self):
+        """Remove every entry from the index."""
+
+    def search(self, queryset, query):
+        """
+        Return ``queryset`` restricted to matches and annotated with
+        ``search_rank``, or ``None`` to fall back to ``SearchFilter``.
+        """
+        return None
+
+    def rebuild(self, batch_size=1000):
+        """Re-index every event. Returns the number of indexed events."""
+        self.clear()
+        total = 0
+        batch = []
+        for event in Event.objects.select_related('organizer').order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(event)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self.index(batch)
+            total += len(batch)
+        return total
+
+    @staticmethod
+    def _document(event):
+        return event.title, event.description, event.organizer.username
+
+    @staticmethod
+    def _connection():
+        return connections[router.db_for_write(Event)]
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """No index: defer to DRF's ``SearchFilter`` (``LIKE`` over ``search_fields``)."""
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """SQLite FTS5 index with bm25 ranking and prefix matching."""
+    table = 'events_event_fts'
+    # Column weights for bm25(): title, description, organizer
+    weights = (10.0, 1.0, 5.0)
+
+    def setup(self, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                "title, description, organizer, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+
+    def index(self, events):
+        rows = [(event.pk, *self._document(event)) for event in events]
+        with self._connection().cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, description, organizer) VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, event_ids):
+        with self._connection().cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(pk,) for pk in event_ids])
+
+    def clear(self):
+        with self._connection().cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def match_expression(self, query):
+        # Quote every token so FTS5 operators in user input are inert, then prefix-match it
+        return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokenize(query))
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset
+        table = Event._meta.db_table
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [expression])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT bm25({self.table}, {weights}) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s AND {self.table}.rowid = "{table}"."id"',
+                [expression],
+                output_field=FloatField(),
+            )
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Weighted ``tsvector`` side table with a GIN index and ``ts_rank`` ordering."""
+    table = 'events_event_search'
+    config = 'simple'
+
+    def setup(self, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                f'event_id bigint PRIMARY KEY REFERENCES {Event._meta.db_table} (id) ON DELETE CASCADE, '
+                'document tsvector NOT NULL)'
+            )
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_document_idx ON {self.table} USING GIN (document)')
+
+    def index(self, events):
+        rows = [(event.pk, *self._document(event)) for event in events]
+        with self._connection().cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (event_id, document) VALUES (%s, "
+                f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'C') || "
+                f"setweight(to_tsvector('{self.config}', %s), 'B')) "
+                "ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+    def remove(self, event_ids):
+        with self._connection().cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE event_id = ANY(%s)', [list(event_ids)])
+
+    def clear(self):
+        with self._connection().cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.table}')
+
+    def match_expression(self, query):
+        return ' & '.join(f'{token}:*' for token in tokenize(query))
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset
+        table = Event._meta.db_table
+        tsquery = f"to_tsquery('{self.config}', %s)"
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT event_id FROM {self.table} WHERE document @@ {tsquery}', [expression])
+        ).annotate(
+            # Negated so that, as with bm25, ascending order is most relevant first
+            search_rank=RawSQL(
+                f'SELECT -ts_rank(document, {tsquery}) FROM {self.table} WHERE event_id = "{table}"."id"',
+                [expression],
+                output_field=FloatField(),
+            )
+        )
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'EVENTS_SEARCH_BACKEND', None)
+        if path:
+            backend_class = import_string(path)
+        else:
+            vendor = connections[router.db_for_write(Event)].vendor
+            backend_class = VENDOR_BACKENDS.get(vendor, LikeSearchBackend)
+        _backend = backend_class()
+    return _backend
+
+
+class EventSearchFilter(SearchFilter):
+    """``SearchFilter`` that routes ``?search=`` through the configured index."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        results = get_search_backend().search(queryset, query)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
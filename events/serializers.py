@@ -1,47 +1,138 @@
 """
 Serializers for event-related models.
 """
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Avg
 from rest_framework import serializers
-from .models import Event, RSVP, Review
+from event_management.metrics import InstrumentedSerializerMixin
+from .fieldsets import SparseFieldsetSerializerMixin
+from .geocoding import get_geocoder
+from .intervals import venue_conflict
+from .models import Event, EventStats, RSVP, Review, TimelineEntry
 
 
-class EventSerializer(serializers.ModelSerializer):
+class UserSummarySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Nested user for ``?expand=``."""
+    
+    class Meta:
+        model = User
+        fields = ['id', 'username']
+
+
+class EventSummarySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Nested event for ``?expand=``."""
+    
+    class Meta:
+        model = Event
+        fields = ['id', 'title', 'location', 'start_time', 'end_time']
+
+
+class EventSerializer(InstrumentedSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for Event model."""
     organizer_name = serializers.CharField(source='organizer.username', read_only=True)
     rsvp_count = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
+    latitude = serializers.FloatField(min_value=-90, max_value=90, required=False, allow_null=True)
+    longitude = serializers.FloatField(min_value=-180, max_value=180, required=False, allow_null=True)
+    distance_km = serializers.SerializerMethodField()
+    expandable_fields = {'organizer': UserSummarySerializer}
+    field_columns = {
+        'rsvp_count': ('stats__going_count', 'stats__maybe_count', 'stats__not_going_count'),
+        'average_rating': ('stats__review_count', 'stats__rating_sum'),
+    }
     
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'description', 'organizer', 'organizer_name',
-            'location', 'start_time', 'end_time', 'is_public', 'created_at',
-            'updated_at', 'rsvp_count', 'average_rating'
+            'location', 'latitude', 'longitude', 'start_time', 'end_time', 'is_public', 'capacity', 'created_at',
+            'updated_at', 'rsvp_count', 'average_rating', 'distance_km'
         ]
         read_only_fields = ['id', 'organizer', 'created_at', 'updated_at']
     
-    def get_rsvp_count(self, obj):
-        """Get total RSVPs for event."""
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        self._validate_coordinates(attrs)
+        self._validate_venue_conflicts(attrs)
+        return attrs
+    
+    def _validate_coordinates(self, attrs):
+        """Require coordinates in pairs; geocode the location when none are given."""
+        if (attrs.get('latitude') is None) != (attrs.get('longitude') is None):
+            raise serializers.ValidationError({'latitude': 'Latitude and longitude must be set together.'})
+        moved = 'location' in attrs and (self.instance is None or attrs['location'] != self.instance.location)
+        if 'latitude' not in attrs and moved:
+            # Stale coordinates of the old location are dropped when the new one is unknown
+            attrs['latitude'], attrs['longitude'] = get_geocoder().geocode(attrs['location']) or (None, None)
+    
+    def _validate_venue_conflicts(self, attrs):
+        """Reject bookings that overlap another event at the same venue (opt-in, see the setting)."""
+        if not getattr(settings, 'EVENTS_PREVENT_VENUE_CONFLICTS', False):
+            return
+        location = attrs.get('location', getattr(self.instance, 'location', None))
+        start_time = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if not (location and start_time and end_time) or end_time <= start_time:
+            return
+        exclude = self.instance.pk if self.instance is not None else None
+        conflict = venue_conflict(location, start_time, end_time, exclude=exclude)
+        if conflict is not None:
+            raise serializers.ValidationError({
+                'location': f'This venue is already booked by event {conflict} during the requested time.'
+            })
+    
+    def save(self, **kwargs):
+        # Checked again under the write lock (BEGIN IMMEDIATE on SQLite), so two
+        # concurrent bookings cannot both pass validation and then both insert
+        with transaction.atomic():
+            self._validate_venue_conflicts({**self.validated_data, **kwargs})
+            return super().save(**kwargs)
+    
+    def _get_stats(self, obj):
         try:
-            return obj.rsvps.count()
-        except:
+            return obj.stats
+        except EventStats.DoesNotExist:
+            return None
+    
+    def get_distance_km(self, obj):
+        """Distance from the ``?near=`` point, when the list was filtered by one."""
+        distance = getattr(obj, 'distance_km', None)
+        return None if distance is None else round(distance, 2)
+    
+    def get_rsvp_count(self, obj):
+        """Get total RSVPs for event from the precomputed stats."""
+        stats = self._get_stats(obj)
+        if stats is not None:
+            return stats.rsvp_count
+        if obj.pk is None:
             return 0
+        # Waitlisted RSVPs hold no seat and are not counted, as in EventStats.rsvp_count
+        return obj.rsvps.exclude(status='Waitlisted').count()
     
     def get_average_rating(self, obj):
-        """Get average rating for event."""
-        try:
-            reviews = obj.reviews.all()
-            if not reviews.exists():
-                return None
-            return round(sum(r.rating for r in reviews) / reviews.count(), 1)
-        except:
+        """Get average rating for event from the precomputed stats."""
+        stats = self._get_stats(obj)
+        if stats is not None:
+            return stats.average_rating
+        if obj.pk is None:
             return None
+        average = obj.reviews.aggregate(average=Avg('rating'))['average']
+        if average is None:
+            return None
+        return round(average, 1)
+
+
+# Waitlisted is only ever assigned by the seat claim, never requested
+WRITABLE_RSVP_STATUSES = ['Going', 'Maybe', 'Not Going']
 
 
-class RSVPSerializer(serializers.ModelSerializer):
+class RSVPSerializer(InstrumentedSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for RSVP model."""
     user_name = serializers.CharField(source='user.username', read_only=True)
     event_title = serializers.CharField(source='event.title', read_only=True)
+    expandable_fields = {'event': EventSummarySerializer, 'user': UserSummarySerializer}
     
     class Meta:
         model = RSVP
@@ -49,12 +140,49 @@ class RSVPSerializer(serializers.ModelSerializer):
             'id', 'event', 'user', 'user_name', 'event_title', 'status', 'created_at'
         ]
         read_only_fields = ['id', 'user', 'event', 'created_at']
+    
+    def validate_status(self, value):
+        if value not in WRITABLE_RSVP_STATUSES:
+            raise serializers.ValidationError(f'Status must be one of: {", ".join(WRITABLE_RSVP_STATUSES)}.')
+        return value
+
+
+class AttendeeSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    """One row of an event's attendee list."""
+    user_name = serializers.CharField(source='user.username', read_only=True)
+    
+    class Meta:
+        model = RSVP
+        fields = ['id', 'user', 'user_name', 'status', 'created_at']
+
+
+class TimelineEntrySerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    """An event on the current user's timeline and why it is there."""
+    event = EventSerializer(read_only=True)
+    
+    class Meta:
+        model = TimelineEntry
+        fields = ['id', 'reason', 'start_time', 'event']
+
+
+class FreeSlotSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    """A gap in a venue's schedule."""
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+
+class BulkRSVPItemSerializer(serializers.Serializer):
+    """Shape validation for one item of a bulk RSVP request."""
+    event = serializers.IntegerField(min_value=1)
+    user = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=WRITABLE_RSVP_STATUSES)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(InstrumentedSerializerMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for Review model."""
     user_name = serializers.CharField(source='user.username', read_only=True)
     event_title = serializers.CharField(source='event.title', read_only=True)
+    expandable_fields = {'event': EventSummarySerializer, 'user': UserSummarySerializer}
     
     class Meta:
         model = Review
@@ -0,0 +1,114 @@
+"""
+Signal handlers that keep derived event data in sync with writes.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import stats, timeline
+from .caching import bump_versions, event_scope, events_scope, reviews_scope, venue_scope
+from .models import Event, EventStats, RSVP, Review
+from .search import get_search_backend
+from .waitlist import promote_waitlisted
+
+
+def setup_search_index(sender, using, **kwargs):
+    """post_migrate hook creating the search backend's index structures."""
+    get_search_backend().setup(using)
+
+
+@receiver(post_save, sender=Event)
+def create_event_stats(sender, instance, created, **kwargs):
+    old_capacity = getattr(instance, '_original_capacity', instance.capacity)
+    if created:
+        EventStats.objects.create(event=instance, capacity=instance.capacity)
+    elif instance.capacity != old_capacity:
+        EventStats.objects.filter(event_id=instance.pk).update(capacity=instance.capacity)
+        if instance.capacity is None or (old_capacity is not None and instance.capacity > old_capacity):
+            promote_waitlisted(instance.pk)
+    instance._original_capacity = instance.capacity
+
+
+@receiver(post_save, sender=Event)
+def update_timelines_on_event_save(sender, instance, created, **kwargs):
+    if created:
+        timeline.add_organizer_entries([instance])
+    else:
+        timeline.sync_event_entries(
+            instance,
+            getattr(instance, '_original_organizer_id', instance.organizer_id),
+            getattr(instance, '_original_start_time', instance.start_time),
+        )
+    instance._original_organizer_id = instance.organizer_id
+    instance._original_start_time = instance.start_time
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, **kwargs):
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(pre_save, sender=RSVP)
+def update_stats_on_rsvp_save(sender, instance, **kwargs):
+    # Before the write (inside RSVP.save()'s transaction), so a Going RSVP
+    # that finds the event full is stored as Waitlisted
+    old_status = None if instance._state.adding else getattr(instance, '_original_status', None)
+    instance.status = stats.record_rsvp_change(instance.event_id, old_status, instance.status)
+    if old_status == 'Going' and instance.status != 'Going':
+        promote_waitlisted(instance.event_id)
+
+
+@receiver(post_save, sender=RSVP)
+def remember_rsvp_status(sender, instance, **kwargs):
+    instance._original_status = instance.status
+
+
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def update_timeline_on_rsvp_change(sender, instance, **kwargs):
+    # post_delete sends no `created`; a deleted RSVP leaves the timeline
+    deleted = 'created' not in kwargs
+    timeline.sync_rsvp_entries([(instance.user_id, instance.event_id, None if deleted else instance.status)])
+
+
+@receiver(post_delete, sender=RSVP)
+def update_stats_on_rsvp_delete(sender, instance, **kwargs):
+    old_status = getattr(instance, '_original_status', instance.status)
+    stats.record_rsvp_change(instance.event_id, old_status, None)
+    if old_status == 'Going':
+        promote_waitlisted(instance.event_id)
+
+
+@receiver(post_save, sender=Review)
+def update_stats_on_review_save(sender, instance, created, **kwargs):
+    if created:
+        stats.record_review_added(instance.event_id, instance.rating)
+
+
+@receiver(post_delete, sender=Review)
+def update_stats_on_review_delete(sender, instance, **kwargs):
+    stats.record_review_removed(instance.event_id, instance.rating)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_responses(sender, instance, **kwargs):
+    locations = {instance.location, getattr(instance, '_original_location', instance.location)}
+    bump_versions(events_scope(), event_scope(instance.pk), *(venue_scope(location) for location in locations))
+    instance._original_location = instance.location
+
+
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def invalidate_rsvp_responses(sender, instance, **kwargs):
+    bump_versions(events_scope(), event_scope(instance.event_id))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_responses(sender, instance, **kwargs):
+    bump_versions(events_scope(), event_scope(instance.event_id), reviews_scope(instance.event_id))
@@ -0,0 +1,233 @@
+"""
+Incremental maintenance of the denormalized EventStats table.
+
+Every helper issues a single UPDATE with F() expressions so concurrent
+writers never lose increments. Seats of capacity-limited events are
+claimed the same way: ``going_count`` only grows through an UPDATE whose
+WHERE clause requires a free seat, so the check and the increment cannot
+be interleaved by another writer.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, Q
+
+from .models import Event, EventStats, RSVP, Review
+
+STATUS_FIELDS = {
+    'Going': 'going_count',
+    'Maybe': 'maybe_count',
+    'Not Going': 'not_going_count',
+    'Waitlisted': 'waitlisted_count',
+}
+
+COUNTER_FIELDS = [
+    'going_count', 'maybe_count', 'not_going_count', 'waitlisted_count',
+    'review_count', 'rating_sum',
+    'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5',
+]
+
+
+def _rating_field(rating):
+    return f'rating_{rating}'
+
+
+SEAT_AVAILABLE = Q(capacity__isnull=True) | Q(going_count__lt=F('capacity'))
+
+
+def _updates(deltas):
+    return {field: F(field) + delta for field, delta in deltas.items() if delta}
+
+
+def ensure_stats_row(event_id):
+    capacity = Event.objects.filter(pk=event_id).values_list('capacity', flat=True).first()
+    EventStats.objects.get_or_create(event_id=event_id, defaults={'capacity': capacity})
+
+
+def apply_deltas(event_id, deltas):
+    """Add the given per-field deltas to the stats row of an event."""
+    updates = _updates(deltas)
+    if not updates:
+        return
+    if EventStats.objects.filter(event_id=event_id).update(**updates):
+        return
+    if any(delta < 0 for delta in deltas.values()):
+        # Nothing to decrement: the row (or the event) is already gone
+        return
+    ensure_stats_row(event_id)
+    EventStats.objects.filter(event_id=event_id).update(**updates)
+
+
+def claim_seat(event_id, old_status=None):
+    """
+    Move one RSVP from ``old_status`` to Going if the event has a free seat,
+    in a single conditional UPDATE. Returns whether a seat was claimed.
+    """
+    updates = _updates(rsvp_deltas(old_status, 'Going'))
+    return bool(EventStats.objects.filter(SEAT_AVAILABLE, event_id=event_id).update(**updates))
+
+
+def rsvp_deltas(old_status, new_status):
+    """Counter deltas for an RSVP moving from one status to another."""
+    deltas = defaultdict(int)
+    if old_status in STATUS_FIELDS:
+        deltas[STATUS_FIELDS[old_status]] -= 1
+    if new_status in STATUS_FIELDS:
+        deltas[STATUS_FIELDS[new_status]] += 1
+    return deltas
+
+
+def review_deltas(rating, sign=1):
+    """Counter deltas for adding (sign=1) or removing (sign=-1) a review."""
+    return {
+        'review_count': sign,
+        'rating_sum': sign * rating,
+        _rating_field(rating): sign,
+    }
+
+
+def record_rsvp_change(event_id, old_status, new_status):
+    """
+    Count an RSVP moving between statuses and return the status it ends up
+    with: a move to Going that finds no free seat is counted as Waitlisted.
+    """
+    if old_status == new_status:
+        return new_status
+    if new_status != 'Going':
+        apply_deltas(event_id, rsvp_deltas(old_status, new_status))
+        return new_status
+    if claim_seat(event_id, old_status):
+        return new_status
+    if old_status == 'Waitlisted':
+        return old_status
+    if not EventStats.objects.filter(event_id=event_id).update(**_updates(rsvp_deltas(old_status, 'Waitlisted'))):
+        # No stats row to claim from yet, rather than a full event
+        ensure_stats_row(event_id)
+        return record_rsvp_change(event_id, old_status, new_status)
+    return 'Waitlisted'
+
+
+def claim_seats(event_id, old_statuses):
+    """
+    Claim seats for several RSVPs moving to Going, given their old statuses
+    in priority order. Returns how many of them, from the start, got one:
+    all in one UPDATE when enough seats are free, else seat by seat until
+    the event is full.
+    """
+    deltas = defaultdict(int)
+    for old_status in old_statuses:
+        for field, delta in rsvp_deltas(old_status, 'Going').items():
+            deltas[field] += delta
+    enough = Q(capacity__isnull=True) | Q(going_count__lte=F('capacity') - len(old_statuses))
+    if EventStats.objects.filter(enough, event_id=event_id).update(**_updates(deltas)):
+        return len(old_statuses)
+    for claimed, old_status in enumerate(old_statuses):
+        if not claim_seat(event_id, old_status):
+            if claimed == 0 and not EventStats.objects.filter(event_id=event_id).exists():
+                ensure_stats_row(event_id)
+                return claim_seats(event_id, old_statuses)
+            return claimed
+    return len(old_statuses)
+
+
+def record_rsvp_changes(transitions):
+    """Apply many ``(event_id, old_status, new_status)`` transitions, one UPDATE per event."""
+    per_event = defaultdict(lambda: defaultdict(int))
+    for event_id, old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        for field, delta in rsvp_deltas(old_status, new_status).items():
+            per_event[event_id][field] += delta
+    for event_id, deltas in per_event.items():
+        apply_deltas(event_id, deltas)
+
+
+def record_review_added(event_id, rating):
+    apply_deltas(event_id, review_deltas(rating))
+
+
+def record_review_removed(event_id, rating):
+    apply_deltas(event_id, review_deltas(rating, sign=-1))
+
+
+def compute_stats(event_ids=None):
+    """Aggregate stats from the source tables, keyed by event id."""
+    rsvps = RSVP.objects.order_by()
+    reviews = Review.objects.order_by()
+    if event_ids is not None:
+        rsvps = rsvps.filter(event_id__in=event_ids)
+        reviews = reviews.filter(event_id__in=event_ids)
+
+    stats = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for row in rsvps.values('event_id', 'status').annotate(total=Count('pk')):
+        field = STATUS_FIELDS.get(row['status'])
+        if field:
+            stats[row['event_id']][field] += row['total']
+    for row in reviews.values('event_id', 'rating').annotate(total=Count('pk')):
+        counters = stats[row['event_id']]
+        counters['review_count'] += row['total']
+        counters['rating_sum'] += row['rating'] * row['total']
+        counters[_rating_field(row['rating'])] += row['total']
+    return stats
+
+
+def _event_id_batches(event_ids, batch_size):
+    if event_ids is None:
+        event_ids = Event.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+    batch = []
+    for event_id in event_ids:
+        batch.append(event_id)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def status_totals(event_id):
+    """``{status: RSVP count}`` for one event, from its stats row or, without one, the RSVP table."""
+    row = EventStats.objects.filter(event_id=event_id).values(*STATUS_FIELDS.values()).first()
+    if row is not None:
+        return {status: row[field] for status, field in STATUS_FIELDS.items()}
+    counts = dict(
+        RSVP.objects.filter(event_id=event_id).order_by().values_list('status').annotate(total=Count('pk'))
+    )
+    return {status: counts.get(status, 0) for status in STATUS_FIELDS}
+
+
+def verify_stats(event_ids=None, batch_size=500):
+    """Return {event_id: {field: (stored, expected)}} for rows that drifted."""
+    mismatches = {}
+    for batch in _event_id_batches(event_ids, batch_size):
+        expected = compute_stats(batch)
+        stored = {row.event_id: row for row in EventStats.objects.filter(event_id__in=batch)}
+        for event_id in batch:
+            row = stored.get(event_id)
+            counters = expected.get(event_id, dict.fromkeys(COUNTER_FIELDS, 0))
+            diff = {
+                field: (getattr(row, field) if row else None, value)
+                for field, value in counters.items()
+                if row is None or getattr(row, field) != value
+            }
+            if diff:
+                mismatches[event_id] = diff
+    return mismatches
+
+
+def rebuild_stats(event_ids=None, batch_size=500):
+    """Recompute stats rows from the source tables. Returns the number of events processed."""
+    processed = 0
+    for batch in _event_id_batches(event_ids, batch_size):
+        expected = compute_stats(batch)
+        capacities = dict(Event.objects.filter(pk__in=batch).values_list('pk', 'capacity'))
+        existing = set(EventStats.objects.filter(event_id__in=batch).values_list('event_id', flat=True))
+        rows = [
+            EventStats(
+                event_id=event_id, capacity=capacities.get(event_id),
+                **expected.get(event_id, dict.fromkeys(COUNTER_FIELDS, 0)),
+            )
+            for event_id in batch
+        ]
+        EventStats.objects.bulk_create([row for row in rows if row.event_id not in existing])
+        EventStats.objects.bulk_update([row for row in rows if row.event_id in existing], [*COUNTER_FIELDS, 'capacity'])
+        processed += len(batch)
+    return processed
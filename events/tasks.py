@@ -1,25 +1,54 @@
+from datetime import timedelta
+
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mass_mail
 from django.conf import settings
-from .models import Event
+from django.utils import timezone
+from .models import Event, PendingNotification
 from django.contrib.auth.models import User
 
+
+def _digest_window():
+    """Seconds notifications are buffered per organizer; 0 sends immediately."""
+    return getattr(settings, 'EVENT_NOTIFICATION_DIGEST_WINDOW', 0)
+
+
+def _notify(event_id, user_id, kind, subject, message, detail):
+    """
+    Send one organizer notification, or buffer it for the next digest.
+    Returns True when the notification was buffered.
+    """
+    event = Event.objects.select_related('organizer').get(id=event_id)
+    username = User.objects.values_list('username', flat=True).get(id=user_id)
+    message = message.format(username=username, title=event.title, detail=detail)
+    
+    if _digest_window():
+        PendingNotification.objects.create(
+            organizer_id=event.organizer_id, event_id=event.id, kind=kind, message=message
+        )
+        return True
+    
+    EmailMessage(
+        subject=subject.format(title=event.title),
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[event.organizer.email],
+        connection=get_connection(fail_silently=False),
+    ).send()
+    return False
+
+
 @shared_task
 def send_rsvp_notification(event_id, user_id, rsvp_status):
     try:
-        event = Event.objects.get(id=event_id)
-        user = User.objects.get(id=user_id)
-        
-        subject = f'New RSVP for your event: {event.title}'
-        message = f'{user.username} has RSVP\'d to your event "{event.title}" with status: {rsvp_status}.'
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[event.organizer.email],
-            fail_silently=False,
+        queued = _notify(
+            event_id, user_id, 'rsvp',
+            subject='New RSVP for your event: {title}',
+            message='{username} has RSVP\'d to your event "{title}" with status: {detail}.',
+            detail=rsvp_status,
         )
+        if queued:
+            return f'Notification queued for event {event_id}'
         return f'Notification sent for event {event_id}'
     except Exception as e:
         return f'Error: {str(e)}'
@@ -27,19 +56,77 @@ def send_rsvp_notification(event_id, user_id, rsvp_status):
 @shared_task
 def send_review_notification(event_id, user_id, rating):
     try:
-        event = Event.objects.get(id=event_id)
-        user = User.objects.get(id=user_id)
-        
-        subject = f'New review for your event: {event.title}'
-        message = f'{user.username} has reviewed your event "{event.title}" with {rating}/5 stars.'
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[event.organizer.email],
-            fail_silently=False,
+        queued = _notify(
+            event_id, user_id, 'review',
+            subject='New review for your event: {title}',
+            message='{username} has reviewed your event "{title}" with {detail}/5 stars.',
+            detail=rating,
         )
+        if queued:
+            return f'Review notification queued for event {event_id}'
         return f'Review notification sent for event {event_id}'
     except Exception as e:
-        return f'Error: {str(e)}'
\ No newline at end of file
+        return f'Error: {str(e)}'
+
+
+@shared_task
+def send_waitlist_promotion(event_id, user_id):
+    """Tell an attendee their waitlisted RSVP got a seat (sent directly, never digested)."""
+    try:
+        event = Event.objects.only('title', 'start_time').get(id=event_id)
+        email = User.objects.values_list('email', flat=True).get(id=user_id)
+        if not email:
+            return f'No email for user {user_id}'
+        EmailMessage(
+            subject=f'You have a seat at {event.title}',
+            body=f'A seat opened up at "{event.title}" ({event.start_time:%Y-%m-%d %H:%M %Z}) '
+                 f'and your RSVP moved from the waitlist to Going.',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+            connection=get_connection(fail_silently=False),
+        ).send()
+        return f'Promotion sent for event {event_id}'
+    except Exception as e:
+        return f'Error: {str(e)}'
+
+
+def _digest_message(organizer, notifications):
+    lines = [f'You have {len(notifications)} new notification(s) for your events:', '']
+    lines.extend(f'- {notification.message}' for notification in notifications)
+    subject = f'{len(notifications)} new notification(s) for your events'
+    return subject, '\n'.join(lines), settings.DEFAULT_FROM_EMAIL, [organizer.email]
+
+
+@shared_task
+def flush_notification_digests(batch_size=200):
+    """
+    Send one digest per organizer whose oldest buffered notification has
+    waited a full window, all over a single mail connection.
+    """
+    cutoff = timezone.now() - timedelta(seconds=_digest_window())
+    due = (
+        PendingNotification.objects.filter(created_at__lte=cutoff)
+        .order_by().values_list('organizer_id', flat=True).distinct()
+    )
+    organizer_ids = list(due)
+    if not organizer_ids:
+        return 'No digests due'
+    
+    connection = get_connection(fail_silently=False)
+    sent = 0
+    for start in range(0, len(organizer_ids), batch_size):
+        chunk = organizer_ids[start:start + batch_size]
+        pending = PendingNotification.objects.filter(organizer_id__in=chunk).select_related('organizer')
+        by_organizer = {}
+        for notification in pending:
+            by_organizer.setdefault(notification.organizer_id, []).append(notification)
+        
+        datatuple = [
+            _digest_message(notifications[0].organizer, notifications)
+            for notifications in by_organizer.values()
+        ]
+        sent += send_mass_mail(datatuple, fail_silently=False, connection=connection)
+        PendingNotification.objects.filter(
+            pk__in=[n.pk for notifications in by_organizer.values() for n in notifications]
+        ).delete()
+    return f'Sent {sent} digest(s)'
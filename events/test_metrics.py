@@ -0,0 +1,85 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from event_management import metrics
+from events.models import Event
+
+
+@pytest.fixture
+def api_client():
+    metrics.reset()
+    yield APIClient()
+    metrics.reset()
+
+
+@pytest.fixture
+def event():
+    return Event.objects.create(
+        title='Test',
+        description='Test',
+        organizer=User.objects.create_user(username='organizer', password='testpass123'),
+        location='Test',
+        start_time=timezone.now() + timedelta(days=1),
+        end_time=timezone.now() + timedelta(days=1, hours=2)
+    )
+
+
+def sample(text, name, **labels):
+    wanted = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    for line in text.splitlines():
+        if line.startswith(f'{name}{{{wanted}}} ') or line.startswith(f'{name}{{{wanted},'):
+            if name.endswith('_bucket') and 'le="+Inf"' not in line:
+                continue
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def test_routes_are_recorded(self, api_client, event):
+        api_client.get('/api/events/')
+        api_client.get('/api/events/')
+        api_client.get(f'/api/events/{event.id}/')
+        response = api_client.get('/metrics')
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        text = response.content.decode()
+        labels = {'route': 'event-list-create', 'method': 'GET', 'status': '200'}
+        assert sample(text, 'http_request_duration_seconds_count', **labels) == 2
+        assert sample(text, 'http_request_db_queries_sum', **labels) >= 1
+        assert sample(text, 'http_request_serialize_duration_seconds_sum', **labels) > 0
+        assert sample(text, 'http_response_size_bytes_sum', **labels) > 0
+        assert sample(text, 'http_request_duration_seconds_count', route='event-detail', method='GET', status='200') == 1
+        # The scrape itself is not recorded
+        assert 'route="metrics"' not in text
+    
+    def test_metrics_token(self, api_client, settings):
+        settings.METRICS_TOKEN = 's3cret'
+        assert api_client.get('/metrics').status_code == 403
+        assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code == 200
+    
+    def test_nplusone_detector_logs_repeated_shapes(self, settings, caplog):
+        from django.test import RequestFactory
+        from event_management.middleware import MetricsMiddleware
+        settings.METRICS_NPLUSONE_THRESHOLD = 3
+        users = [User.objects.create_user(username=f'user{i}') for i in range(4)]
+        
+        def view(request):
+            from django.http import HttpResponse
+            for user in users:
+                User.objects.get(pk=user.pk)
+            return HttpResponse('ok')
+        
+        with caplog.at_level(logging.WARNING, logger='event_management.metrics'):
+            MetricsMiddleware(view)(RequestFactory().get('/'))
+        assert len(caplog.records) == 1
+        assert '4 x SELECT' in caplog.records[0].getMessage()
+    
+    def test_sql_shape_collapses_literals_and_in_lists(self):
+        assert metrics.sql_shape("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21") == (
+            'SELECT * FROM t WHERE id IN (?...) AND name = ? LIMIT ?'
+        )
@@ -0,0 +1,226 @@
+"""
+Query-plan regression suite.
+
+Seeds a few thousand rows, captures the SQL each endpoint issues and runs
+EXPLAIN QUERY PLAN on it. Any unbounded scan of one of the large tables
+fails the test. ``?location=`` is deliberately not covered: ``icontains``
+compiles to ``LIKE '%term%'``, which no B-tree index can serve.
+"""
+import importlib
+import re
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event, RSVP, Review
+from events.search import get_search_backend
+from events.stats import rebuild_stats
+from user.serializers import UserRegistrationSerializer
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN parsing is SQLite specific'),
+]
+
+LARGE_TABLES = {'events_event', 'events_rsvp', 'events_review', 'events_eventstats', 'auth_user'}
+SCAN_RE = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?$')
+LIMIT_RE = re.compile(r'\bLIMIT \d+\s*$')
+
+USERS = 400
+EVENTS = 3000
+RSVPS_PER_EVENT = 4
+REVIEWS_PER_EVENT = 2
+
+
+def explain(queries):
+    """Return (sql, plan details) for every SELECT/UPDATE/DELETE captured."""
+    plans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+    return plans
+
+
+def full_scans(plans):
+    """
+    Return (table, sql) pairs for every scan of a large table.
+
+    Walking an index in ORDER BY order is only accepted for LIMIT-bounded
+    statements that need no temp B-tree, i.e. scans that stop after a page.
+    """
+    scans = []
+    for sql, details in plans:
+        bounded = LIMIT_RE.search(sql) and not any('TEMP B-TREE' in detail for detail in details)
+        for detail in details:
+            match = SCAN_RE.match(detail)
+            if not match or match.group(1) not in LARGE_TABLES:
+                continue
+            if match.group(2) is None or not bounded:
+                scans.append((match.group(1), sql))
+    return scans
+
+
+@pytest.fixture
+def seeded():
+    # The auth_user email index is raw SQL, which --nomigrations skips
+    email_index = importlib.import_module('user.migrations.0002_auth_user_email_index')
+    with connection.cursor() as cursor:
+        for operation in email_index.Migration.operations:
+            cursor.execute(operation.sql)
+
+    users = User.objects.bulk_create([
+        User(username=f'user{i}', email=f'user{i}@example.com', password='!') for i in range(USERS)
+    ])
+    start = timezone.now()
+    events = [
+        Event(
+            title=f'Event {i}',
+            description=f'Description for event {i}',
+            organizer=users[i % USERS],
+            location=f'Venue {i % 50}',
+            # Spread over roughly 1.5 x 1.5 degrees around Mumbai
+            latitude=18.5 + (i * 37 % 1500) / 1000,
+            longitude=72.5 + (i * 91 % 1500) / 1000,
+            start_time=start + timedelta(hours=i),
+            end_time=start + timedelta(hours=i + 2),
+            is_public=i % 3 != 0,
+        )
+        for i in range(EVENTS)
+    ]
+    for event in events:
+        event.clean()  # fills in the geohash, as save() would
+    events = Event.objects.bulk_create(events)
+    RSVP.objects.bulk_create([
+        RSVP(event=event, user=users[(i + offset + 1) % USERS], status=RSVP.STATUS_CHOICES[offset % 3][0])
+        for i, event in enumerate(events)
+        for offset in range(RSVPS_PER_EVENT)
+    ])
+    Review.objects.bulk_create([
+        Review(event=event, user=users[(i + offset + 1) % USERS], rating=offset % 5 + 1, comment='Fine')
+        for i, event in enumerate(events)
+        for offset in range(REVIEWS_PER_EVENT)
+    ])
+    rebuild_stats()
+    get_search_backend().rebuild()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {'users': users, 'events': events}
+
+
+def assert_indexed(callable_, index=None):
+    with CaptureQueriesContext(connection) as context:
+        result = callable_()
+    assert context.captured_queries, 'expected the endpoint to hit the database'
+    plans = explain(context.captured_queries)
+    assert full_scans(plans) == []
+    if index:
+        assert any(index in detail for _, details in plans for detail in details)
+    return result
+
+
+@pytest.mark.parametrize('url, index', [
+    ('/api/events/', 'event_start_time_id_idx'),
+    ('/api/events/?is_public=true', 'event_public_start_idx'),
+    ('/api/events/?ordering=created_at', 'event_created_at_id_idx'),
+    ('/api/events/?search=event', None),
+    ('/api/events/?venue=Venue%207', 'event_location_span_idx'),
+])
+def test_event_list_is_indexed(seeded, url, index):
+    client = APIClient()
+    response = assert_indexed(lambda: client.get(url), index=index)
+    assert response.status_code == 200
+    # Deep pages must stay on the index as well
+    assert_indexed(lambda: client.get(response.data['next']))
+
+
+def test_event_detail_is_indexed(seeded):
+    event = seeded['events'][EVENTS // 2]
+    response = assert_indexed(lambda: APIClient().get(f'/api/events/{event.id}/'))
+    assert response.status_code == 200
+
+
+def test_review_list_is_indexed(seeded):
+    event = seeded['events'][EVENTS // 2]
+    response = assert_indexed(
+        lambda: APIClient().get(f'/api/events/{event.id}/reviews/'), index='review_event_created_id_idx'
+    )
+    assert len(response.data['results']) == REVIEWS_PER_EVENT
+
+
+def test_rsvp_update_is_indexed(seeded):
+    rsvp = RSVP.objects.filter(status='Maybe').first()
+    response = assert_indexed(
+        lambda: APIClient().patch(f'/api/events/{rsvp.event_id}/rsvp/{rsvp.user_id}/', {'status': 'Going'})
+    )
+    assert response.status_code == 200
+
+
+def test_overlap_filter_is_indexed(seeded):
+    events = seeded['events']
+    window = f'{events[100].start_time.isoformat()},{events[300].start_time.isoformat()}'
+    client = APIClient()
+    response = assert_indexed(lambda: client.get('/api/events/', {'overlaps': window}), index='event_start_time_id_idx')
+    assert response.data['next']
+    assert_indexed(lambda: client.get(response.data['next']))
+
+
+def test_near_filter_is_indexed(seeded):
+    client = APIClient()
+    response = assert_indexed(
+        lambda: client.get('/api/events/', {'near': '19.0760,72.8777', 'radius_km': 5}), index='event_geohash_idx'
+    )
+    assert response.data['next']
+    assert_indexed(lambda: client.get(response.data['next']), index='event_geohash_idx')
+
+
+def test_venue_schedule_load_is_indexed(seeded):
+    from events.intervals import load_venue_index
+    index = assert_indexed(lambda: load_venue_index('Venue 7'), index='event_location_span_idx')
+    assert len(index) == EVENTS // 50
+
+
+def test_venue_conflict_probe_is_indexed(seeded):
+    from events.intervals import venue_conflict
+    event = Event.objects.filter(location='Venue 7').order_by('start_time')[5]
+    found = assert_indexed(
+        lambda: venue_conflict('Venue 7', event.start_time, event.end_time, exclude=event.pk), index='event_location_span_idx'
+    )
+    assert found is None
+
+
+def test_registration_email_check_is_indexed(seeded):
+    serializer = UserRegistrationSerializer()
+    assert_indexed(lambda: serializer.validate_email('nobody@example.com'), index='user_auth_user_email_idx')
+
+
+def test_attendee_list_is_indexed(seeded):
+    event = seeded['events'][EVENTS // 2]
+    client = APIClient()
+    client.force_authenticate(user=event.organizer)
+    url = f'/api/events/{event.id}/attendees/'
+    response = assert_indexed(
+        lambda: client.get(url, {'status': 'Going', 'page_size': 1}), index='rsvp_event_status_created_idx'
+    )
+    assert response.data['next']
+    assert_indexed(lambda: client.get(response.data['next']), index='rsvp_event_status_created_idx')
+    assert_indexed(lambda: b''.join(client.get(url, {'status': 'Going', 'output': 'csv'}).streaming_content))
+
+
+def test_timeline_is_indexed(seeded):
+    from events.timeline import rebuild_timelines
+    # The seed bulk-creates events and RSVPs, which sends no signals
+    rebuild_timelines()
+    client = APIClient()
+    client.force_authenticate(user=seeded['events'][0].organizer)
+    response = assert_indexed(lambda: client.get('/api/me/timeline/', {'page_size': 1}), index='timeline_user_start_idx')
+    assert response.data['next']
+    assert_indexed(lambda: client.get(response.data['next']), index='timeline_user_start_idx')
@@ -1,4 +1,5 @@
 import pytest
+import time
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from django.utils import timezone
@@ -76,3 +77,1604 @@ class TestPermissions:
         api_client.force_authenticate(user=other)
         response = api_client.patch(f'/api/events/{event.id}/update/', {'title': 'Hacked'})
         assert response.status_code == 403
+
+@pytest.mark.django_db
+class TestEventQueries:
+    def test_list_query_count_is_constant(self, api_client, create_user, django_assert_max_num_queries, settings):
+        from events.models import RSVP, Review
+        organizer = create_user(username='organizer')
+        for i in range(5):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                description='Test',
+                organizer=organizer,
+                location='Test',
+                start_time=timezone.now() + timedelta(days=i + 1),
+                end_time=timezone.now() + timedelta(days=i + 1, hours=2)
+            )
+            for j in range(3):
+                attendee = create_user(username=f'attendee{i}_{j}')
+                RSVP.objects.create(event=event, user=attendee, status='Going')
+                Review.objects.create(event=event, user=attendee, rating=j + 3, comment='Nice')
+        
+        with django_assert_max_num_queries(2):
+            response = api_client.get('/api/events/')
+        assert response.status_code == 200
+        row = response.data['results'][0]
+        assert row['rsvp_count'] == 3
+        assert row['average_rating'] == 4.0
+        assert row['organizer_name'] == 'organizer'
+        
+        # Events without a stats row are filled with one grouped query per page, not one per row
+        from events.models import EventStats
+        EventStats.objects.all().delete()
+        settings.EVENTS_RESPONSE_CACHE_TIMEOUT = 0
+        with django_assert_max_num_queries(4):
+            response = api_client.get('/api/events/')
+        assert [row['rsvp_count'] for row in response.data['results']] == [3] * 5
+        assert [row['average_rating'] for row in response.data['results']] == [4.0] * 5
+
+@pytest.mark.django_db
+class TestEventStats:
+    def test_stats_follow_rsvp_and_review_writes(self, api_client, create_user):
+        from django.core.management import call_command
+        from events.models import EventStats, RSVP, Review
+        from events.stats import verify_stats
+        organizer = create_user(username='organizer')
+        attendee = create_user(username='attendee')
+        event = Event.objects.create(
+            title='Test',
+            description='Test',
+            organizer=organizer,
+            location='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+        rsvp = RSVP.objects.create(event=event, user=attendee, status='Going')
+        review = Review.objects.create(event=event, user=attendee, rating=4, comment='Good')
+        
+        response = api_client.patch(f'/api/events/{event.id}/rsvp/{attendee.id}/', {'status': 'Maybe'})
+        assert response.status_code == 200
+        stats = EventStats.objects.get(event=event)
+        assert (stats.going_count, stats.maybe_count) == (0, 1)
+        assert (stats.review_count, stats.rating_sum, stats.rating_4) == (1, 4, 1)
+        
+        review.delete()
+        RSVP.objects.get(pk=rsvp.pk).delete()
+        assert verify_stats() == {}
+        
+        EventStats.objects.filter(event=event).update(going_count=7)
+        assert event.id in verify_stats()
+        call_command('rebuild_event_stats')
+        assert verify_stats() == {}
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    def _create_events(self, organizer, count):
+        start = timezone.now() + timedelta(days=1)
+        return [
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Test',
+                organizer=organizer,
+                location='Test',
+                # Pairs of identical start times exercise the id tiebreak
+                start_time=start + timedelta(hours=i // 2),
+                end_time=start + timedelta(hours=i // 2 + 1)
+            )
+            for i in range(7)
+        ]
+    
+    def test_walks_pages_forwards_and_backwards(self, api_client, create_user):
+        events = self._create_events(create_user(username='organizer'), 7)
+        expected = [e.id for e in sorted(events, key=lambda e: (e.start_time, e.id), reverse=True)]
+        
+        seen, pages = [], []
+        url = '/api/events/?page_size=3'
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == 200
+            assert 'count' not in response.data
+            pages.append(response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        assert seen == expected
+        
+        response = api_client.get(pages[-1]['previous'])
+        assert [row['id'] for row in response.data['results']] == expected[3:6]
+    
+    def test_honours_ordering_param(self, api_client, create_user):
+        events = self._create_events(create_user(username='organizer'), 7)
+        response = api_client.get('/api/events/?ordering=created_at&page_size=4')
+        second = api_client.get(response.data['next'])
+        ids = [row['id'] for row in response.data['results'] + second.data['results']]
+        assert ids == [e.id for e in events]
+    
+    def test_rejects_tampered_cursor(self, api_client):
+        response = api_client.get('/api/events/?cursor=bm90LWEtY3Vyc29y')
+        assert response.status_code == 404
+
+@pytest.mark.django_db
+class TestEventSearch:
+    def _create_event(self, organizer, title, description='Test'):
+        return Event.objects.create(
+            title=title,
+            description=description,
+            organizer=organizer,
+            location='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+    
+    def test_prefix_search_ranks_title_matches_first(self, api_client, create_user):
+        organizer = create_user(username='organizer')
+        in_description = self._create_event(organizer, 'Meetup', description='A talk about Django internals')
+        in_title = self._create_event(organizer, 'Django Conference')
+        self._create_event(organizer, 'Flask Night')
+        
+        response = api_client.get('/api/events/?search=djan')
+        assert [row['id'] for row in response.data['results']] == [in_title.id, in_description.id]
+        
+        first_page = api_client.get('/api/events/?search=djan&page_size=1')
+        second_page = api_client.get(first_page.data['next'])
+        assert [row['id'] for row in second_page.data['results']] == [in_description.id]
+        assert second_page.data['next'] is None
+    
+    def test_index_follows_updates_and_deletes(self, api_client, create_user):
+        from django.core.management import call_command
+        event = self._create_event(create_user(username='organizer'), 'Django Conference')
+        
+        event.title = 'Python Summit'
+        event.save()
+        assert api_client.get('/api/events/?search=django').data['results'] == []
+        assert len(api_client.get('/api/events/?search=summit').data['results']) == 1
+        
+        call_command('reindex_event_search')
+        assert len(api_client.get('/api/events/?search=organizer').data['results']) == 1
+        
+        event.delete()
+        assert api_client.get('/api/events/?search=summit').data['results'] == []
+
+@pytest.mark.django_db
+class TestResponseCache:
+    def _create_event(self, organizer):
+        return Event.objects.create(
+            title='Cached',
+            description='Test',
+            organizer=organizer,
+            location='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+    
+    def test_hit_304_and_write_through_invalidation(self, api_client, create_user, django_assert_num_queries):
+        from events.models import RSVP
+        event = self._create_event(create_user(username='organizer'))
+        
+        first = api_client.get('/api/events/')
+        assert first['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            second = api_client.get('/api/events/')
+        assert second['X-Cache'] == 'HIT'
+        assert second['ETag'] == first['ETag']
+        
+        not_modified = api_client.get('/api/events/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert not_modified.status_code == 304
+        
+        RSVP.objects.create(event=event, user=create_user(username='attendee'), status='Going')
+        refreshed = api_client.get('/api/events/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert refreshed.status_code == 200
+        assert refreshed['X-Cache'] == 'MISS'
+        assert refreshed.data['results'][0]['rsvp_count'] == 1
+        assert refreshed['ETag'] != first['ETag']
+    
+    def test_etag_follows_the_body_not_the_version(self, api_client, create_user):
+        from events.caching import bump_versions, events_scope
+        self._create_event(create_user(username='organizer'))
+        first = api_client.get('/api/events/')
+        # A version bump without a content change (e.g. a write elsewhere) keeps the client's copy valid
+        bump_versions(events_scope())
+        again = api_client.get('/api/events/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert again.status_code == 304
+    
+    def test_timeout_setting_is_read_per_request(self, api_client, create_user, settings):
+        self._create_event(create_user(username='organizer'))
+        settings.EVENTS_RESPONSE_CACHE_TIMEOUT = 0
+        assert 'X-Cache' not in api_client.get('/api/events/')
+        settings.EVENTS_RESPONSE_CACHE_TIMEOUT = 60
+        assert api_client.get('/api/events/')['X-Cache'] == 'MISS'
+    
+    def test_deploy_check_warns_about_process_local_caches(self, settings):
+        from events.checks import check_response_cache_is_shared
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        assert [warning.id for warning in check_response_cache_is_shared(None)] == ['events.W001']
+        settings.EVENTS_RESPONSE_CACHE_TIMEOUT = 0
+        assert check_response_cache_is_shared(None) == []
+    
+    def test_scopes_are_per_event(self, api_client, create_user):
+        organizer = create_user(username='organizer')
+        event, other = self._create_event(organizer), self._create_event(organizer)
+        api_client.get(f'/api/events/{event.id}/')
+        
+        other.title = 'Renamed'
+        other.save()
+        assert api_client.get(f'/api/events/{event.id}/')['X-Cache'] == 'HIT'
+        
+        event.title = 'Renamed'
+        event.save()
+        response = api_client.get(f'/api/events/{event.id}/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['title'] == 'Renamed'
+    
+    def test_file_based_backend(self, api_client, create_user, settings, tmp_path):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+        self._create_event(create_user(username='organizer'))
+        assert api_client.get('/api/events/')['X-Cache'] == 'MISS'
+        assert api_client.get('/api/events/')['X-Cache'] == 'HIT'
+
+@pytest.mark.django_db
+class TestBulkRSVP:
+    def test_bulk_upsert_reports_per_item_results(self, api_client, create_user, django_assert_max_num_queries):
+        from events.models import EventStats, RSVP
+        from events.stats import verify_stats
+        organizer = create_user(username='organizer')
+        attendees = [create_user(username=f'attendee{i}') for i in range(3)]
+        event = Event.objects.create(
+            title='Test',
+            description='Test',
+            organizer=organizer,
+            location='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+        RSVP.objects.create(event=event, user=attendees[0], status='Maybe')
+        admin = User.objects.create_user(username='admin', password='x', is_staff=True)
+        api_client.force_authenticate(user=admin)
+        
+        payload = {'rsvps': [
+            {'event': event.id, 'user': attendees[0].id, 'status': 'Going'},
+            {'event': event.id, 'user': attendees[1].id, 'status': 'Going'},
+            {'event': event.id, 'user': attendees[1].id, 'status': 'Maybe'},
+            {'event': event.id, 'user': organizer.id, 'status': 'Going'},
+            {'event': 999999, 'user': attendees[2].id, 'status': 'Going'},
+            {'event': event.id, 'user': attendees[2].id, 'status': 'Bogus'},
+        ]}
+        with django_assert_max_num_queries(12):
+            response = api_client.post('/api/events/rsvps/bulk/', payload, format='json')
+        assert response.status_code == 200
+        assert [r['result'] for r in response.data['results']] == [
+            'updated', 'created', 'error', 'error', 'error', 'error'
+        ]
+        assert response.data['summary'] == {'updated': 1, 'created': 1, 'error': 4}
+        assert EventStats.objects.get(event=event).going_count == 2
+        assert verify_stats() == {}
+    
+    def test_requires_staff(self, api_client):
+        response = api_client.post('/api/events/rsvps/bulk/', [], format='json')
+        assert response.status_code in (401, 403)
+
+@pytest.mark.django_db
+class TestEventTransfer:
+    def test_streaming_export_applies_filters(self, api_client, create_user):
+        import csv
+        import io
+        import json
+        organizer = create_user(username='organizer')
+        for i, location in enumerate(['Mumbai', 'Pune', 'Navi Mumbai']):
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Test',
+                organizer=organizer,
+                location=location,
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2)
+            )
+        api_client.force_authenticate(user=User.objects.create_user(username='staff', is_staff=True))
+        
+        response = api_client.get('/api/events/export/?location=mumbai')
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert [row['location'] for row in rows] == ['Mumbai', 'Navi Mumbai']
+        assert rows[0]['organizer_name'] == 'organizer'
+        
+        response = api_client.get('/api/events/export/?output=csv', HTTP_ACCEPT='text/csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert len(rows) == 3
+    
+    def test_import_round_trip(self, api_client, create_user, tmp_path):
+        from django.core.management import call_command
+        from events.stats import verify_stats
+        organizer = create_user(username='organizer')
+        Event.objects.create(
+            title='Django Conference',
+            description='Test',
+            organizer=organizer,
+            location='Mumbai',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+        path = tmp_path / 'events.csv'
+        call_command('export_events', '--format', 'csv', '--output', str(path))
+        with open(path, 'a') as fp:
+            fp.write('99,Broken,x,,organizer,Pune,2030-01-02T10:00:00,2030-01-02T09:00:00,true,,\n')
+        
+        call_command('import_events', str(path), '--batch-size', '1')
+        assert Event.objects.filter(title='Django Conference').count() == 2
+        assert not Event.objects.filter(title='Broken').exists()
+        assert verify_stats() == {}
+        assert len(api_client.get('/api/events/?search=django').data['results']) == 2
+
+@pytest.mark.django_db
+class TestNotificationDigests:
+    def test_digest_coalesces_per_organizer_over_one_connection(self, create_user, settings):
+        from unittest import mock
+        from django.core import mail
+        from events import tasks
+        from events.models import PendingNotification
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        settings.EVENT_NOTIFICATION_DIGEST_WINDOW = 300
+        organizers = [create_user(username=f'organizer{i}') for i in range(2)]
+        attendee = create_user(username='attendee')
+        events = [
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Test',
+                organizer=organizers[i % 2],
+                location='Test',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2)
+            )
+            for i in range(4)
+        ]
+        for event in events:
+            tasks.send_rsvp_notification(event.id, attendee.id, 'Going')
+            tasks.send_review_notification(event.id, attendee.id, 5)
+        assert mail.outbox == []
+        assert PendingNotification.objects.count() == 8
+        
+        # Nothing is due until the window has elapsed
+        assert tasks.flush_notification_digests() == 'No digests due'
+        PendingNotification.objects.update(created_at=timezone.now() - timedelta(minutes=10))
+        
+        with mock.patch('events.tasks.get_connection', wraps=tasks.get_connection) as get_connection:
+            assert tasks.flush_notification_digests() == 'Sent 2 digest(s)'
+        assert get_connection.call_count == 1
+        assert len(mail.outbox) == 2
+        assert sorted(m.to[0] for m in mail.outbox) == ['organizer0@test.com', 'organizer1@test.com']
+        assert all(len(m.body.splitlines()) == 2 + 4 for m in mail.outbox)
+        assert PendingNotification.objects.count() == 0
+    
+    def test_immediate_mode_sends_one_email(self, create_user, settings):
+        from django.core import mail
+        from events.tasks import send_rsvp_notification
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        settings.EVENT_NOTIFICATION_DIGEST_WINDOW = 0
+        event = Event.objects.create(
+            title='Test',
+            description='Test',
+            organizer=create_user(username='organizer'),
+            location='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+        assert send_rsvp_notification(event.id, create_user(username='attendee').id, 'Maybe').startswith('Notification sent')
+        assert len(mail.outbox) == 1
+        assert 'attendee has RSVP\'d to your event "Test" with status: Maybe.' == mail.outbox[0].body
+
+@pytest.mark.django_db
+class TestOutbox:
+    @pytest.fixture
+    def eager_celery(self, settings):
+        from event_management.celery import app
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        settings.EVENT_NOTIFICATION_DIGEST_WINDOW = 0
+        previous = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        yield app
+        app.conf.task_always_eager = previous
+    
+    def test_rsvp_is_enqueued_and_relayed(self, api_client, create_user, eager_celery):
+        from unittest import mock
+        from django.core import mail
+        from events.models import OutboxMessage
+        from events.outbox import relay
+        # The RSVP view acts as the first user, so it must not be the organizer
+        create_user(username='attendee')
+        event = Event.objects.create(
+            title='Test',
+            description='Test',
+            organizer=create_user(username='organizer'),
+            location='Test',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+        with mock.patch('celery.app.task.Task.apply_async') as apply_async:
+            response = api_client.post(f'/api/events/{event.id}/rsvp/', {'status': 'Going'})
+        assert response.status_code == 201
+        apply_async.assert_not_called()
+        message = OutboxMessage.objects.get()
+        assert message.task_name == 'events.tasks.send_rsvp_notification'
+        assert message.dispatched_at is None
+        
+        assert relay() == (1, 0)
+        assert len(mail.outbox) == 1
+        message.refresh_from_db()
+        assert message.dispatched_at is not None
+        assert relay() == (0, 0)
+    
+    def test_failed_publish_backs_off_and_dedupes(self, eager_celery):
+        from events.models import OutboxMessage
+        from events.outbox import enqueue, relay
+        enqueue('events.tasks.does_not_exist', [1], dedupe_key='broken')
+        enqueue('events.tasks.does_not_exist', [1], dedupe_key='broken')
+        assert OutboxMessage.objects.count() == 1
+        
+        assert relay() == (0, 1)
+        message = OutboxMessage.objects.get()
+        assert message.attempts == 1
+        assert message.available_at > timezone.now()
+        assert message.last_error.startswith('NotRegistered')
+        # Not due again until the backoff has elapsed
+        assert relay() == (0, 0)
+    
+    def test_publishes_outside_the_claiming_transaction(self, eager_celery):
+        from unittest import mock
+        from django.db import connection
+        from events.models import OutboxMessage
+        from events.outbox import enqueue, relay
+        enqueue('events.tasks.send_rsvp_notification', [0, 0, 'Going'], dedupe_key='leased')
+        depth = len(connection.savepoint_ids)
+        seen = []
+        
+        def publish(*args, **kwargs):
+            message = OutboxMessage.objects.get()
+            seen.append((len(connection.savepoint_ids), message.available_at > timezone.now()))
+            # Leased, so a second relay running meanwhile finds nothing due
+            assert relay() == (0, 0)
+        
+        with mock.patch('celery.app.task.Task.apply_async', side_effect=publish):
+            assert relay() == (1, 0)
+        assert seen == [(depth, True)]
+        assert OutboxMessage.objects.get().dispatched_at is not None
+
+@pytest.mark.django_db
+class TestSchedules:
+    def make_event(self, organizer, location, start_hour, end_hour, title='Test'):
+        base = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+        return Event.objects.create(
+            title=title,
+            description='Test',
+            organizer=organizer,
+            location=location,
+            start_time=base + timedelta(hours=start_hour),
+            end_time=base + timedelta(hours=end_hour)
+        )
+    
+    def test_interval_index_queries(self):
+        from events.intervals import IntervalIndex
+        index = IntervalIndex([(1, 0, 10), (2, 2, 3), (3, 5, 7), (4, 12, 15), (5, 20, 21)])
+        assert [key for key, _, _ in index.overlapping(3, 6)] == [1, 3]
+        assert [key for key, _, _ in index.overlapping(10, 12)] == []
+        assert [key for key, _, _ in index.containing(2, 3)] == [1, 2]
+        assert index.first_conflict(11, 13) == 4
+        assert index.first_conflict(12, 15, exclude=4) is None
+        assert index.free_slots(-5, 25, min_duration=3) == [(-5, 0), (15, 20), (21, 25)]
+    
+    def test_overlap_and_contains_filters(self, api_client, create_user):
+        organizer = create_user(username='organizer')
+        early = self.make_event(organizer, 'Hall A', 0, 2, title='Early')
+        late = self.make_event(organizer, 'Hall B', 3, 6, title='Late')
+        window = f'{early.start_time.isoformat()},{late.start_time.isoformat()}'
+        response = api_client.get('/api/events/', {'overlaps': window})
+        assert [event['title'] for event in response.data['results']] == ['Early']
+        
+        inner = f'{(late.start_time + timedelta(hours=1)).isoformat()},{late.end_time.isoformat()}'
+        response = api_client.get('/api/events/', {'contains': inner})
+        assert [event['title'] for event in response.data['results']] == ['Late']
+        
+        assert api_client.get('/api/events/', {'overlaps': 'tomorrow'}).status_code == 400
+    
+    def test_venue_double_booking_is_rejected(self, api_client, create_user, settings):
+        settings.EVENTS_PREVENT_VENUE_CONFLICTS = True
+        organizer = create_user(username='organizer')
+        booked = self.make_event(organizer, 'Hall A', 2, 4)
+        data = {
+            'title': 'Clash',
+            'description': 'Test',
+            'location': 'Hall A',
+            'start_time': (booked.start_time + timedelta(hours=1)).isoformat(),
+            'end_time': (booked.end_time + timedelta(hours=1)).isoformat(),
+        }
+        response = api_client.post('/api/events/', data)
+        assert response.status_code == 400
+        assert str(booked.id) in response.data['location'][0]
+        
+        # Back-to-back bookings and moves of the event itself are fine
+        data['start_time'] = booked.end_time.isoformat()
+        assert api_client.post('/api/events/', data).status_code == 201
+        response = api_client.patch(
+            f'/api/events/{booked.id}/update/', {'end_time': (booked.end_time - timedelta(hours=1)).isoformat()}
+        )
+        assert response.status_code == 200
+        
+        # Events starting inside the window conflict too
+        data['start_time'] = (booked.start_time - timedelta(hours=1)).isoformat()
+        data['end_time'] = (booked.start_time + timedelta(minutes=30)).isoformat()
+        assert api_client.post('/api/events/', data).status_code == 400
+        
+        booked.delete()
+        data['start_time'] = (booked.start_time + timedelta(hours=1)).isoformat()
+        data['end_time'] = (booked.start_time + timedelta(hours=2)).isoformat()
+        assert api_client.post('/api/events/', data).status_code == 201
+    
+    def test_venue_conflicts_are_opt_in_and_rechecked_on_save(self, create_user, settings):
+        from rest_framework.exceptions import ValidationError
+        from events.serializers import EventSerializer
+        organizer = create_user(username='organizer')
+        online = self.make_event(organizer, 'Online', 2, 4)
+        data = {
+            'title': 'Webinar', 'description': 'Test', 'location': 'Online',
+            'start_time': online.start_time.isoformat(), 'end_time': online.end_time.isoformat(),
+        }
+        serializer = EventSerializer(data=data)
+        assert serializer.is_valid(), serializer.errors
+        serializer.save(organizer=organizer)
+        
+        settings.EVENTS_PREVENT_VENUE_CONFLICTS = True
+        data['location'] = 'Hall C'
+        serializer = EventSerializer(data=data)
+        assert serializer.is_valid(), serializer.errors
+        # Booked by a concurrent request between validation and save
+        self.make_event(organizer, 'Hall C', 2, 4)
+        with pytest.raises(ValidationError):
+            serializer.save(organizer=organizer)
+        assert Event.objects.filter(location='Hall C').count() == 1
+    
+    def test_free_slots(self, api_client, create_user):
+        organizer = create_user(username='organizer')
+        first = self.make_event(organizer, 'Hall A', 1, 2)
+        self.make_event(organizer, 'Hall A', 3, 5)
+        self.make_event(organizer, 'Hall B', 0, 8)
+        window = f'{(first.start_time - timedelta(hours=1)).isoformat()},{(first.start_time + timedelta(hours=6)).isoformat()}'
+        response = api_client.get('/api/events/free-slots/', {'venue': 'Hall A', 'window': window, 'min_duration': 60})
+        assert response.status_code == 200
+        assert len(response.data['slots']) == 3
+        assert response.data['slots'][1]['start'] == api_client.get(f'/api/events/{first.id}/').data['end_time']
+
+@pytest.mark.django_db
+class TestNearbyEvents:
+    def make_event(self, organizer, title, latitude=None, longitude=None, location='Test'):
+        return Event.objects.create(
+            title=title,
+            description='Test',
+            organizer=organizer,
+            location=location,
+            latitude=latitude,
+            longitude=longitude,
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2)
+        )
+    
+    def test_geohash_cells_cover_the_radius(self):
+        from events import geo
+        assert geo.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+        assert geo.neighbors('u4pruyd') == {
+            'u4pruy3', 'u4pruy6', 'u4pruy7', 'u4pruy9', 'u4pruyc', 'u4pruye', 'u4pruyf', 'u4pruyg'
+        }
+        # A point just across a cell boundary is still covered
+        cells = geo.covering_cells(19.0760, 72.8777, 5)
+        assert any(geo.encode(19.0760, 72.8777 + 0.04)[:len(cell)] == cell for cell in cells)
+        assert geo.covering_cells(0, 0, 20000) is None
+    
+    def test_near_filter_orders_by_distance(self, api_client, create_user):
+        organizer = create_user(username='organizer')
+        self.make_event(organizer, 'Bandra', 19.0596, 72.8295)
+        self.make_event(organizer, 'Colaba', 18.9067, 72.8147)
+        self.make_event(organizer, 'Pune', 18.5204, 73.8567)
+        self.make_event(organizer, 'Unplaced')
+        response = api_client.get('/api/events/', {'near': '19.0760,72.8777', 'radius_km': 25, 'page_size': 1})
+        assert response.status_code == 200
+        assert [event['title'] for event in response.data['results']] == ['Bandra']
+        assert 5 < response.data['results'][0]['distance_km'] < 6
+        response = api_client.get(response.data['next'])
+        assert [event['title'] for event in response.data['results']] == ['Colaba']
+        assert response.data['next'] is None
+        
+        assert api_client.get('/api/events/', {'near': '91,0'}).status_code == 400
+        assert api_client.get('/api/events/', {'near': '19,72', 'radius_km': 10000}).status_code == 400
+    
+    def test_location_is_geocoded_from_local_file(self, api_client, create_user, settings, tmp_path):
+        import json
+        gazetteer = tmp_path / 'places.json'
+        gazetteer.write_text(json.dumps({'Gateway of India': [18.9220, 72.8347]}))
+        settings.EVENTS_GEOCODER = 'events.geocoding.LocalFileGeocoder'
+        settings.EVENTS_GEOCODER_FILE = str(gazetteer)
+        create_user(username='organizer')
+        data = {
+            'title': 'Meetup',
+            'description': 'Test',
+            'location': ' gateway of  india ',
+            'start_time': (timezone.now() + timedelta(days=1)).isoformat(),
+            'end_time': (timezone.now() + timedelta(days=1, hours=2)).isoformat(),
+        }
+        response = api_client.post('/api/events/', data)
+        assert response.status_code == 201
+        assert (response.data['latitude'], response.data['longitude']) == (18.9220, 72.8347)
+        assert Event.objects.get(pk=response.data['id']).geohash.startswith('te7g9')
+        
+        # Moving to an unknown place drops the stale coordinates
+        response = api_client.patch(f'/api/events/{response.data["id"]}/update/', {'location': 'Somewhere else'})
+        assert response.data['latitude'] is None
+        assert Event.objects.get(pk=response.data['id']).geohash == ''
+
+@pytest.mark.django_db
+class TestFastReadPath:
+    def reference_and_fast(self, api_client, settings, url):
+        from django.core.cache import cache
+        from rest_framework.renderers import JSONRenderer
+        settings.EVENTS_FAST_READ_PATH = False
+        reference = api_client.get(url)
+        cache.clear()
+        settings.EVENTS_FAST_READ_PATH = True
+        fast = api_client.get(url)
+        cache.clear()
+        assert reference.status_code == fast.status_code == 200
+        return JSONRenderer().render(reference.data), fast.content
+    
+    def test_lists_are_byte_identical_to_the_serializer_path(self, api_client, create_user, settings):
+        from events.models import EventStats, RSVP, Review
+        organizer = create_user(username='organizer')
+        attendee = create_user(username='attendée')
+        events = [
+            Event.objects.create(
+                title=f'Fête {i} \u2028 "quoted" \\ 😀',
+                description='Line one\nLine two\t\x01',
+                organizer=organizer,
+                location=f'Hall {i}',
+                latitude=(19.07 + i / 1000, 0.00001, None)[i % 3],
+                longitude=(72.87, 0.0, None)[i % 3],
+                start_time=timezone.now() + timedelta(days=i, microseconds=i),
+                end_time=timezone.now() + timedelta(days=i, hours=2),
+                is_public=i % 2 == 0,
+            )
+            for i in range(6)
+        ]
+        RSVP.objects.create(event=events[0], user=attendee, status='Going')
+        Review.objects.create(event=events[0], user=attendee, rating=4, comment='Très bien \u2029')
+        Review.objects.create(event=events[1], user=organizer, rating=5, comment='Great')
+        # Events imported before stats existed fall back to live counts
+        EventStats.objects.filter(event=events[1]).delete()
+        
+        for url in [
+            '/api/events/',
+            '/api/events/?page_size=2',
+            '/api/events/?is_public=false&ordering=created_at',
+            '/api/events/?search=fete',
+            '/api/events/?near=19.07,72.87&radius_km=50',
+            '/api/events/?fields=id,title,start_time&page_size=2',
+            '/api/events/?fields=rsvp_count,average_rating,organizer_name',
+            f'/api/events/{events[0].id}/reviews/',
+            f'/api/events/{events[0].id}/reviews/?fields=rating,user_name',
+        ]:
+            reference, fast = self.reference_and_fast(api_client, settings, url)
+            assert fast == reference, url
+    
+    def test_renderer_falls_back_for_exponent_floats(self):
+        import json
+        from event_management.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+        data = {'latitude': 0.00001, 'big': 1e16, 'text': 'line\u2028separator', 'ok': [1.5, None, True]}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+        assert json.loads(FastJSONRenderer().render(data)) == data
+    
+    def test_renderer_rejects_non_finite_floats_like_the_stdlib(self):
+        from event_management.renderers import FastJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+        for value in (float('nan'), float('inf'), float('-inf')):
+            data = {'results': [{'average_rating': value, 'latitude': None}]}
+            with pytest.raises(ValueError):
+                JSONRenderer().render(data)
+            with pytest.raises(ValueError):
+                FastJSONRenderer().render(data)
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def _create_event(self, organizer):
+        return Event.objects.create(
+            title='Sparse',
+            description='A long description',
+            organizer=organizer,
+            location='Hall',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+    
+    def test_fields_trim_payload_and_sql(self, api_client, create_user, settings):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        event = self._create_event(create_user(username='organizer'))
+        
+        for fast_path in (True, False):
+            settings.EVENTS_FAST_READ_PATH = fast_path
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.get('/api/events/?fields=id,title,start_time&page_size=1')
+            assert response.status_code == 200
+            assert response.data['results'] == [
+                {'id': event.id, 'title': 'Sparse', 'start_time': response.data['results'][0]['start_time']}
+            ]
+            sql = ' '.join(query['sql'] for query in queries.captured_queries)
+            assert 'events_eventstats' not in sql
+            assert 'description' not in sql
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f'/api/events/{event.id}/?fields=id,rsvp_count')
+        assert response.data == {'id': event.id, 'rsvp_count': 0}
+        assert len(queries) == 1
+        assert 'events_eventstats' in queries[0]['sql'] and 'auth_user' not in queries[0]['sql']
+    
+    def test_expand_nests_related_objects(self, api_client, create_user, django_assert_num_queries):
+        from events.models import Review
+        organizer = create_user(username='organizer')
+        attendee = create_user(username='attendee')
+        event = self._create_event(organizer)
+        Review.objects.create(event=event, user=attendee, rating=5, comment='Great')
+        
+        response = api_client.get(f'/api/events/{event.id}/?fields=id,organizer&expand=organizer')
+        assert response.data == {'id': event.id, 'organizer': {'id': organizer.id, 'username': 'organizer'}}
+        
+        with django_assert_num_queries(1):
+            response = api_client.get(f'/api/events/{event.id}/reviews/?fields=rating,user,event&expand=user,event')
+        review = response.data['results'][0]
+        assert review['user'] == {'id': attendee.id, 'username': 'attendee'}
+        assert review['event']['title'] == 'Sparse'
+        assert set(review) == {'rating', 'user', 'event'}
+        
+        # Pages still link to each other when the cursor key is not returned
+        self._create_event(organizer)
+        response = api_client.get('/api/events/?fields=title&expand=organizer&page_size=1')
+        assert api_client.get(response.data['next']).data['results'][0]['title'] == 'Sparse'
+    
+    def test_rsvp_responses_honour_fields(self, api_client, create_user):
+        # The RSVP endpoints act as the first user
+        attendee = create_user(username='attendee')
+        event = self._create_event(create_user(username='organizer'))
+        response = api_client.post(f'/api/events/{event.id}/rsvp/?fields=status&expand=event', {'status': 'Going'})
+        assert response.status_code == 201
+        assert response.data == {'status': 'Going'}
+        response = api_client.patch(f'/api/events/{event.id}/rsvp/{attendee.id}/?expand=user', {'status': 'Maybe'})
+        assert response.data['user'] == {'id': attendee.id, 'username': 'attendee'}
+    
+    def test_unknown_names_are_rejected(self, api_client):
+        response = api_client.get('/api/events/?fields=id,secret&expand=reviews')
+        assert response.status_code == 400
+        assert set(response.data) == {'fields', 'expand'}
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def _token(self, api_client, username):
+        response = api_client.post('/api/token/', {'username': username, 'password': 'testpass123'})
+        return f'Bearer {response.data["access"]}'
+    
+    def _user_queries(self, api_client, url, token):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, HTTP_AUTHORIZATION=token)
+        return response, [q['sql'] for q in queries.captured_queries if 'FROM "auth_user"' in q['sql']]
+    
+    def test_session_and_basic_authentication_still_work(self, api_client, create_user):
+        import base64
+        create_user(username='alice')
+        basic = 'Basic ' + base64.b64encode(b'alice:testpass123').decode()
+        assert api_client.get('/api/me/timeline/', HTTP_AUTHORIZATION=basic).status_code == 200
+        assert api_client.get('/api/me/timeline/', HTTP_AUTHORIZATION=self._token(api_client, 'alice')).status_code == 200
+        assert api_client.login(username='alice', password='testpass123')
+        assert api_client.get('/api/me/timeline/').status_code == 200
+    
+    def test_users_are_cached_until_saved(self, api_client, create_user):
+        user = create_user()
+        event = Event.objects.create(
+            title='Cached', description='Test', organizer=user, location='Hall',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=1, hours=1),
+        )
+        token = self._token(api_client, 'testuser')
+        url = f'/api/events/{event.id}/'
+        
+        response, queries = self._user_queries(api_client, url, token)
+        assert response.status_code == 200 and len(queries) == 1
+        response, queries = self._user_queries(api_client, url, token)
+        assert response.status_code == 200 and queries == []
+        
+        user.is_active = False
+        user.save()
+        response, queries = self._user_queries(api_client, url, token)
+        assert response.status_code == 401
+    
+    def test_list_views_authenticate_from_claims(self, api_client, create_user, settings):
+        create_user()
+        token = self._token(api_client, 'testuser')
+        response, queries = self._user_queries(api_client, '/api/events/', token)
+        assert response.status_code == 200 and queries == []
+        
+        settings.JWT_ALLOW_TOKEN_USER = False
+        response, queries = self._user_queries(api_client, '/api/events/', token)
+        assert response.status_code == 200 and len(queries) == 1
+    
+    def test_last_login_is_written_in_batches(self, api_client, create_user, settings):
+        from user import logins
+        settings.LAST_LOGIN_FLUSH_INTERVAL = 3600
+        user = create_user()
+        self._token(api_client, 'testuser')
+        self._token(api_client, 'testuser')
+        user.refresh_from_db()
+        assert user.last_login is None
+        assert logins.pending_count() == 1
+        
+        assert logins.flush() == 1
+        user.refresh_from_db()
+        assert user.last_login is not None
+    
+    def test_user_cache_is_a_bounded_lru_with_ttl(self, monkeypatch):
+        from user.authentication import UserCache
+        cache = UserCache(maxsize=2, ttl=30)
+        for user_id in (1, 2):
+            cache.set(user_id, User(pk=user_id, username=f'u{user_id}'))
+        assert cache.get(1).username == 'u1'
+        cache.set(3, User(pk=3, username='u3'))
+        assert cache.get(2) is None and cache.get(1) is not None
+        
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now + 31)
+        assert cache.get(1) is None and len(cache) == 1
+
+@pytest.mark.django_db
+class TestTokenBlacklist:
+    def _refresh_token(self, api_client):
+        response = api_client.post('/api/token/', {'username': 'testuser', 'password': 'testpass123'})
+        return response.data['refresh']
+    
+    def test_rotated_tokens_are_rejected_without_a_lookup_for_fresh_ones(self, api_client, create_user, settings, tmp_path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from user.blacklist import blacklist_filter
+        # The filter is only trusted with a cache shared between processes
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path),
+        }}
+        blacklist_filter.reset()
+        create_user()
+        blacklist_filter.sync()
+        old, fresh = self._refresh_token(api_client), self._refresh_token(api_client)
+        
+        assert api_client.post('/api/token/refresh/', {'refresh': old}).status_code == 200
+        response = api_client.post('/api/token/refresh/', {'refresh': old})
+        assert response.status_code == 401
+        
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.post('/api/token/refresh/', {'refresh': fresh}).status_code == 200
+        # The only lookups are the ones blacklisting the rotated token
+        assert not any('INNER JOIN "token_blacklist_outstandingtoken"' in q['sql'] for q in queries.captured_queries)
+    
+    def test_filter_catches_up_with_other_processes(self, create_user, django_capture_on_commit_callbacks):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from user.blacklist import BlacklistFilter
+        other_process = BlacklistFilter()
+        other_process.sync()
+        assert not other_process.might_contain('jti-1')
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            token = OutstandingToken.objects.create(jti='jti-1', token='t', expires_at=timezone.now() + timedelta(days=1))
+            BlacklistedToken.objects.create(token=token)
+        assert other_process.might_contain('jti-1')
+    
+    def test_process_local_cache_fails_closed(self, create_user, monkeypatch):
+        from rest_framework_simplejwt.exceptions import TokenError
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from user import blacklist
+        from user.checks import check_blacklist_cache_is_shared
+        user = create_user()
+        token = blacklist.FilteredRefreshToken.for_user(user)
+        # A worker whose filter synced before another process revoked the token; with a
+        # per-process cache it never sees the version bump
+        stale = blacklist.BlacklistFilter()
+        stale.sync()
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        assert not stale.might_contain(token['jti'])
+        monkeypatch.setattr(blacklist, 'blacklist_filter', stale)
+        
+        with pytest.raises(TokenError):
+            blacklist.FilteredRefreshToken(str(token))
+        assert [warning.id for warning in check_blacklist_cache_is_shared(None)] == ['user.W001']
+    
+    def test_catch_up_sees_ids_committed_out_of_order(self, create_user, django_capture_on_commit_callbacks):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from user.blacklist import BlacklistFilter
+        expires_at = timezone.now() + timedelta(days=1)
+        tokens = [
+            OutstandingToken.objects.create(jti=f'jti-{i}', token='t', expires_at=expires_at) for i in range(2)
+        ]
+        other_process = BlacklistFilter()
+        other_process.sync()
+        with django_capture_on_commit_callbacks(execute=True):
+            BlacklistedToken.objects.create(pk=50, token=tokens[0])
+        assert other_process.might_contain('jti-0')
+        
+        # A concurrent transaction that drew a lower id commits afterwards
+        with django_capture_on_commit_callbacks(execute=True):
+            BlacklistedToken.objects.create(pk=10, token=tokens[1])
+        assert other_process.might_contain('jti-1')
+        assert other_process._bloom.count == 2
+    
+    def test_bloom_filter_has_no_false_negatives(self):
+        from user.blacklist import BloomFilter
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f'member-{i}')
+        assert all(f'member-{i}' in bloom for i in range(2000))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
+    
+    def test_prune_deletes_only_expired_tokens_in_chunks(self, create_user):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from user.tasks import prune_token_blacklist
+        user = create_user()
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                user=user, jti=f'expired-{i}', token='t', expires_at=timezone.now() - timedelta(hours=1)
+            )
+            BlacklistedToken.objects.create(token=token)
+        OutstandingToken.objects.create(user=user, jti='live', token='t', expires_at=timezone.now() + timedelta(days=1))
+        
+        assert prune_token_blacklist(chunk_size=2) == 'Pruned 5 expired token(s)'
+        assert list(OutstandingToken.objects.values_list('jti', flat=True)) == ['live']
+        assert not BlacklistedToken.objects.exists()
+
+
+@pytest.mark.django_db
+class TestThrottling:
+    def test_parse_rate(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from event_management.throttling import parse_rate
+        assert parse_rate('30/min') == (30, 0.5)
+        assert parse_rate('60/hour burst 5') == (5, 60 / 3600)
+        for rate in ('30', '30/fortnight', '0/min', '30/min burst x'):
+            with pytest.raises(ImproperlyConfigured):
+                parse_rate(rate)
+    
+    def test_bucket_admits_exactly_its_burst_under_concurrent_load(self):
+        import threading
+        from event_management.throttling import TokenBucket
+        bucket = TokenBucket(capacity=10, rate=0.001)
+        start, results = threading.Barrier(40), []
+        
+        def hit():
+            start.wait()
+            results.append(bucket.consume('throttle:test:burst', now=1000.0)[0])
+        
+        threads = [threading.Thread(target=hit) for _ in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 10
+        # The bucket refills at its rate, one token every 1000 seconds
+        assert bucket.consume('throttle:test:burst', now=1500.0) == (False, pytest.approx(500.0))
+        assert bucket.consume('throttle:test:burst', now=2000.0) == (True, 0.0)
+    
+    def test_bucket_locks_are_a_fixed_striped_pool(self):
+        from event_management.throttling import LOCK_STRIPES, TokenBucket
+        lock = TokenBucket._lock_for('throttle:test:striped')
+        for i in range(3 * LOCK_STRIPES):
+            TokenBucket._lock_for(f'throttle:test:{i}')
+        # However many client keys come through, a key keeps its lock and the pool does not grow
+        assert TokenBucket._lock_for('throttle:test:striped') is lock
+        assert len(TokenBucket._locks) == LOCK_STRIPES
+    
+    def test_registration_burst_gets_429_with_retry_after(self, api_client, settings):
+        settings.THROTTLE_RATES = {**settings.THROTTLE_RATES, 'register': '3/hour'}
+        statuses = []
+        for i in range(4):
+            response = api_client.post('/api/register/', {
+                'username': f'burst{i}', 'email': f'burst{i}@test.com',
+                'password': 'TestPass123!', 'password2': 'TestPass123!',
+            })
+            statuses.append(response.status_code)
+        assert statuses == [201, 201, 201, 429]
+        # One token every 1200 seconds, less the time the three registrations took
+        assert 1100 < int(response['Retry-After']) <= 1200
+        assert User.objects.count() == 3
+    
+    def test_rsvp_buckets_are_per_user_and_skip_reads(self, api_client, create_user, settings):
+        settings.THROTTLE_RATES = {**settings.THROTTLE_RATES, 'rsvp': '2/min'}
+        organizer = create_user()
+        event = Event.objects.create(
+            title='Busy', description='d', organizer=organizer, location='L',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=2),
+        )
+        api_client.force_authenticate(user=organizer)
+        url = f'/api/events/{event.id}/rsvp/'
+        assert [api_client.post(url, {'status': 'Going'}).status_code for _ in range(3)][-1] == 429
+        
+        other = User.objects.create_user(username='other', password='testpass123')
+        api_client.force_authenticate(user=other)
+        assert api_client.post(url, {'status': 'Going'}).status_code == 201
+        assert api_client.get(f'/api/events/{event.id}/').status_code == 200
+    
+    def test_throttling_can_be_disabled(self, api_client, settings):
+        settings.THROTTLE_ENABLED = False
+        settings.THROTTLE_RATES = {**settings.THROTTLE_RATES, 'token': '1/hour'}
+        for _ in range(3):
+            assert api_client.post('/api/token/', {'username': 'nobody', 'password': 'x'}).status_code == 401
+    
+    def test_concurrency_limit_sheds_load_with_503(self, settings):
+        import threading
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from event_management.middleware import ConcurrencyLimitMiddleware
+        settings.MAX_CONCURRENT_REQUESTS = 3
+        settings.MAX_CONCURRENT_WRITES = 1
+        settings.CONCURRENCY_QUEUE_TIMEOUT = 0.05
+        entered, release = threading.Semaphore(0), threading.Event()
+        
+        def slow_view(request):
+            entered.release()
+            release.wait(5)
+            return HttpResponse('ok')
+        
+        middleware = ConcurrencyLimitMiddleware(slow_view)
+        factory = RequestFactory()
+        responses = {}
+        
+        def call(name, request):
+            responses[name] = middleware(request)
+        
+        busy = [
+            threading.Thread(target=call, args=('write', factory.post('/api/events/'))),
+            threading.Thread(target=call, args=('read', factory.get('/api/events/'))),
+        ]
+        for thread in busy:
+            thread.start()
+            assert entered.acquire(timeout=5)
+        
+        # A second write waits out the queue timeout; a read still fits in the request limit
+        call('second_write', factory.post('/api/events/'))
+        reader = threading.Thread(target=call, args=('second_read', factory.get('/api/events/')))
+        reader.start()
+        assert entered.acquire(timeout=5)
+        call('third_read', factory.get('/api/events/'))
+        call('metrics', factory.get('/metrics'))
+        release.set()
+        for thread in [*busy, reader]:
+            thread.join()
+        
+        assert responses['second_write'].status_code == 503
+        assert responses['second_write']['Retry-After'] == '1'
+        assert responses['third_read'].status_code == 503
+        assert responses['metrics'].status_code == 200
+        assert all(responses[name].status_code == 200 for name in ('write', 'read', 'second_read'))
+        # Slots are released once the responses are out
+        assert middleware(factory.post('/api/events/')).status_code == 200
+
+
+@pytest.mark.django_db
+class TestDatabaseLayer:
+    def test_connections_apply_configured_pragmas(self):
+        from django.db import connection
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for name in ('busy_timeout', 'synchronous', 'temp_store', 'foreign_keys'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        assert pragmas == {'busy_timeout': 5000, 'synchronous': 1, 'temp_store': 2, 'foreign_keys': 1}
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_transactions_take_the_write_lock_up_front(self):
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                User.objects.exists()
+        assert queries.captured_queries[0]['sql'] == 'BEGIN IMMEDIATE'
+    
+    # Outside the test case's transaction, which would pin every read to the primary
+    @pytest.mark.django_db(transaction=True)
+    def test_router_sends_get_reads_of_routed_models_to_replicas(self, settings):
+        from django.db import router, transaction
+        from events.models import RSVP, Review
+        from event_management.routers import replica_reads
+        settings.DATABASE_REPLICAS = ['replica1']
+        assert router.db_for_read(Event) == 'default'
+        with replica_reads():
+            assert router.db_for_read(Event) == 'replica1'
+            assert router.db_for_read(Review) == 'replica1'
+            assert router.db_for_read(RSVP) == 'default'
+            assert router.db_for_write(Event) == 'default'
+            with transaction.atomic():
+                # Read-your-writes inside a transaction
+                assert router.db_for_read(Event) == 'default'
+        assert not router.allow_migrate('replica1', 'events')
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_middleware_enables_replica_reads_for_safe_requests_only(self, settings):
+        from django.db import router
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from event_management.middleware import ReplicaRoutingMiddleware
+        settings.DATABASE_REPLICAS = ['replica1']
+        middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse(router.db_for_read(Event)))
+        factory = RequestFactory()
+        assert middleware(factory.get('/api/events/')).content == b'replica1'
+        response = middleware(factory.post('/api/events/'))
+        assert response.content == b'default'
+        
+        # The writer reads its own writes from the primary until the replicas catch up
+        assert response.cookies['primary_pin']['max-age'] == settings.REPLICA_PIN_SECONDS
+        pinned = factory.get('/api/events/')
+        pinned.COOKIES['primary_pin'] = '1'
+        assert middleware(pinned).content == b'default'
+    
+    def test_response_cache_is_filled_from_the_primary(self, settings, monkeypatch):
+        from django.db import router
+        from django.test import RequestFactory
+        from rest_framework import generics
+        from rest_framework.response import Response
+        from event_management.middleware import ReplicaRoutingMiddleware
+        from events.views import EventListCreateView
+        settings.DATABASE_REPLICAS = ['replica1']
+        seen = []
+        
+        def get(view, request, *args, **kwargs):
+            seen.append(router.db_for_read(Event))
+            return Response({'results': []})
+        
+        monkeypatch.setattr(generics.ListCreateAPIView, 'get', get)
+        view = ReplicaRoutingMiddleware(EventListCreateView.as_view())
+        assert view(RequestFactory().get('/api/events/')).status_code == 200
+        assert seen == ['default']
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_sync_replicas_copies_the_primary(self, create_user, tmp_path):
+        import sqlite3
+        from django.core.management import call_command
+        Event.objects.create(
+            title='Replicated', description='d', organizer=create_user(), location='L',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=2),
+        )
+        replica = tmp_path / 'replica.sqlite3'
+        call_command('sync_replicas', to=[str(replica)], stdout=open(tmp_path / 'out.txt', 'w'))
+        with sqlite3.connect(replica) as conn:
+            assert conn.execute('SELECT title FROM events_event').fetchall() == [('Replicated',)]
+
+
+@pytest.mark.django_db
+class TestEventCapacity:
+    def _event(self, organizer, capacity):
+        return Event.objects.create(
+            title='Launch', description='d', organizer=organizer, location='Hall', capacity=capacity,
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=2),
+        )
+    
+    def _attendees(self, count):
+        return [User.objects.create_user(username=f'attendee{i}', password='testpass123') for i in range(count)]
+    
+    def test_full_event_waitlists_and_promotes_when_a_seat_frees(self, api_client, create_user):
+        from events.models import EventStats, OutboxMessage, RSVP
+        event = self._event(create_user(username='organizer'), capacity=2)
+        first, second, third = self._attendees(3)
+        statuses = []
+        for user in (first, second, third):
+            api_client.force_authenticate(user=user)
+            response = api_client.post(f'/api/events/{event.id}/rsvp/', {'status': 'Going'})
+            assert response.status_code == 201
+            statuses.append(response.data['status'])
+        assert statuses == ['Going', 'Going', 'Waitlisted']
+        
+        api_client.force_authenticate(user=third)
+        assert api_client.post(f'/api/events/{event.id}/rsvp/', {'status': 'Going'}).status_code == 400
+        
+        response = api_client.patch(f'/api/events/{event.id}/rsvp/{first.id}/', {'status': 'Not Going'})
+        assert response.data['status'] == 'Not Going'
+        assert RSVP.objects.get(event=event, user=third).status == 'Going'
+        stats = EventStats.objects.get(event=event)
+        assert (stats.going_count, stats.waitlisted_count, stats.not_going_count) == (2, 0, 1)
+        assert OutboxMessage.objects.filter(task_name='events.tasks.send_waitlist_promotion', args=[event.id, third.id]).exists()
+        
+        # Coming back after giving up the seat means joining the waitlist
+        response = api_client.patch(f'/api/events/{event.id}/rsvp/{first.id}/', {'status': 'Going'})
+        assert response.data['status'] == 'Waitlisted'
+    
+    def test_deleting_a_going_rsvp_and_raising_capacity_promote_in_order(self, create_user):
+        from events.models import EventStats, RSVP
+        from events.stats import verify_stats
+        event = self._event(create_user(username='organizer'), capacity=1)
+        users = self._attendees(4)
+        rsvps = [RSVP.objects.create(event=event, user=user, status='Going') for user in users]
+        assert [rsvp.status for rsvp in rsvps] == ['Going', 'Waitlisted', 'Waitlisted', 'Waitlisted']
+        
+        rsvps[0].delete()
+        assert RSVP.objects.get(pk=rsvps[1].pk).status == 'Going'
+        
+        event.capacity = 3
+        event.save()
+        going = RSVP.objects.filter(event=event, status='Going').values_list('user_id', flat=True)
+        assert sorted(going) == [user.id for user in users[1:]]
+        assert EventStats.objects.get(event=event).capacity == 3
+        assert verify_stats([event.id]) == {}
+    
+    def test_rsvp_count_leaves_out_the_waitlist_with_or_without_stats(self, api_client, create_user, settings):
+        from events.models import EventStats, RSVP
+        settings.EVENTS_RESPONSE_CACHE_TIMEOUT = 0
+        event = self._event(create_user(username='organizer'), capacity=1)
+        for user in self._attendees(3):
+            RSVP.objects.create(event=event, user=user, status='Going')
+        counts = []
+        for _ in range(2):
+            for fast_path in (True, False):
+                settings.EVENTS_FAST_READ_PATH = fast_path
+                counts.append(api_client.get('/api/events/').data['results'][0]['rsvp_count'])
+                counts.append(api_client.get(f'/api/events/{event.id}/').data['rsvp_count'])
+            EventStats.objects.all().delete()
+        assert counts == [1] * 8
+    
+    def test_promotion_skips_a_candidate_cancelled_meanwhile(self, create_user, monkeypatch):
+        from events import stats
+        from events.models import EventStats, RSVP
+        from events.waitlist import promote_waitlisted
+        event = self._event(create_user(username='organizer'), capacity=1)
+        users = self._attendees(3)
+        rsvps = [RSVP.objects.create(event=event, user=user, status='Going') for user in users]
+        RSVP.objects.filter(pk=rsvps[0].pk).update(status='Not Going')
+        stats.apply_deltas(event.id, stats.rsvp_deltas('Going', 'Not Going'))
+        claim_seat = stats.claim_seat
+        
+        def cancel_first_then_claim(event_id, old_status=None):
+            # The picked candidate cancels between the pick and the promotion
+            if RSVP.objects.filter(pk=rsvps[1].pk, status='Waitlisted').update(status='Not Going'):
+                stats.apply_deltas(event_id, stats.rsvp_deltas('Waitlisted', 'Not Going'))
+            return claim_seat(event_id, old_status)
+        
+        monkeypatch.setattr(stats, 'claim_seat', cancel_first_then_claim)
+        assert promote_waitlisted(event.id) == [users[2].id]
+        assert RSVP.objects.get(pk=rsvps[2].pk).status == 'Going'
+        counts = EventStats.objects.get(event=event)
+        assert (counts.going_count, counts.waitlisted_count, counts.not_going_count) == (1, 0, 2)
+    
+    def test_waitlisted_cannot_be_requested(self, api_client, create_user):
+        event = self._event(create_user(username='organizer'), capacity=1)
+        user, = self._attendees(1)
+        api_client.force_authenticate(user=user)
+        response = api_client.post(f'/api/events/{event.id}/rsvp/', {'status': 'Waitlisted'})
+        assert response.status_code == 400
+        assert 'status' in response.data
+        
+        api_client.force_authenticate(user=User.objects.create_user(username='staff', is_staff=True))
+        response = api_client.post(
+            '/api/events/rsvps/bulk/', [{'event': event.id, 'user': user.id, 'status': 'Waitlisted'}], format='json'
+        )
+        assert response.data['results'][0]['result'] == 'error'
+        assert 'status' in response.data['results'][0]['errors']
+    
+    def test_unlimited_events_claim_seats_in_one_update(self, create_user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from events.models import RSVP
+        event = self._event(create_user(username='organizer'), capacity=None)
+        user, = self._attendees(1)
+        with CaptureQueriesContext(connection) as queries:
+            RSVP.objects.create(event=event, user=user, status='Going')
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        assert len(updates) == 1
+        assert '"capacity" IS NULL OR' in updates[0]
+    
+    def test_bulk_rsvps_respect_capacity(self, api_client, create_user):
+        from events.models import EventStats
+        admin = User.objects.create_superuser(username='admin', password='testpass123')
+        event = self._event(create_user(username='organizer'), capacity=2)
+        users = self._attendees(3)
+        api_client.force_authenticate(user=admin)
+        payload = [{'event': event.id, 'user': user.id, 'status': 'Going'} for user in users]
+        response = api_client.post('/api/events/rsvps/bulk/', payload, format='json')
+        assert response.status_code == 200
+        assert [result.get('status') for result in response.data['results']] == [None, None, 'Waitlisted']
+        
+        payload = [{'event': event.id, 'user': users[0].id, 'status': 'Maybe'}]
+        api_client.post('/api/events/rsvps/bulk/', payload, format='json')
+        stats = EventStats.objects.get(event=event)
+        assert (stats.going_count, stats.waitlisted_count, stats.maybe_count) == (2, 0, 1)
+
+@pytest.mark.django_db
+class TestAsyncReadViews:
+    def get(self, url):
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncClient
+        
+        async def get():
+            return await AsyncClient().get(url)
+        return async_to_sync(get)()
+    
+    def test_async_views_match_the_sync_views(self, api_client, create_user):
+        from django.core.cache import cache
+        from events.models import EventStats, RSVP, Review
+        organizer = create_user(username='organizer')
+        attendee = create_user(username='attendee')
+        events = [
+            Event.objects.create(
+                title=f'Event {i}', description='d', organizer=organizer, location=f'Hall {i}',
+                start_time=timezone.now() + timedelta(days=i), end_time=timezone.now() + timedelta(days=i, hours=2),
+                is_public=i % 2 == 0,
+            )
+            for i in range(5)
+        ]
+        RSVP.objects.create(event=events[0], user=attendee, status='Going')
+        Review.objects.create(event=events[0], user=attendee, rating=4, comment='Good')
+        Review.objects.create(event=events[1], user=organizer, rating=5, comment='Great')
+        # Live counts through the async ORM for events without a stats row
+        EventStats.objects.filter(event=events[1]).delete()
+        
+        first_page = api_client.get('/api/events/?page_size=2').json()
+        for path in [
+            'events/',
+            'events/?page_size=2',
+            first_page['next'].split('/api/', 1)[1],
+            'events/?is_public=false&ordering=created_at',
+            'events/?search=event',
+            'events/?fields=id,rsvp_count,average_rating',
+            f'events/{events[0].id}/',
+            f'events/{events[1].id}/?fields=title,average_rating',
+            f'events/{events[0].id}/reviews/',
+            f'events/{events[0].id}/?expand=organizer',
+        ]:
+            expected = api_client.get(f'/api/{path}')
+            cache.clear()
+            response = self.get(f'/api/async/{path}')
+            assert response.status_code == expected.status_code == 200, path
+            # Page links point back at the async endpoint
+            assert response.content.replace(b'/api/async/', b'/api/') == expected.content, path
+    
+    def test_errors_match_the_sync_views(self, api_client):
+        for path in ['events/999/', 'events/?fields=nope', 'events/?organizer=999']:
+            expected = api_client.get(f'/api/{path}')
+            response = self.get(f'/api/async/{path}')
+            assert response.status_code == expected.status_code != 200, path
+            assert response.json() == expected.json(), path
+    
+    def test_queries_of_async_requests_are_recorded(self, create_user):
+        from event_management import metrics
+        metrics.reset()
+        organizer = create_user(username='organizer')
+        event = Event.objects.create(
+            title='Event', description='d', organizer=organizer, location='Hall',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=2),
+        )
+        assert self.get(f'/api/async/events/{event.id}/').status_code == 200
+        series = metrics.DB_QUERIES._series[('async-event-detail', 'GET', '200')]
+        # One observation, of one query
+        assert series[-1] == 1 and sum(series[:-1]) == 1
+    
+    def test_concurrency_limit_sheds_async_requests(self, settings):
+        import asyncio
+        from asgiref.sync import async_to_sync
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from event_management.middleware import ConcurrencyLimitMiddleware
+        settings.MAX_CONCURRENT_REQUESTS = 1
+        settings.CONCURRENCY_QUEUE_TIMEOUT = 0.05
+        
+        async def slow_view(request):
+            await asyncio.sleep(0.2)
+            return HttpResponse('ok')
+        
+        middleware = ConcurrencyLimitMiddleware(slow_view)
+        assert asyncio.iscoroutinefunction(middleware)
+        
+        async def two_requests():
+            request = RequestFactory().get('/api/async/events/')
+            return await asyncio.gather(middleware(request), middleware(request))
+        
+        statuses = sorted(response.status_code for response in async_to_sync(two_requests)())
+        assert statuses == [200, 503]
+    
+    def test_aenqueue_writes_the_outbox_row(self):
+        from asgiref.sync import async_to_sync
+        from events.models import OutboxMessage
+        from events.outbox import aenqueue
+        async_to_sync(aenqueue)('events.tasks.send_rsvp_notification', [1, 2], dedupe_key='async')
+        async_to_sync(aenqueue)('events.tasks.send_rsvp_notification', [1, 2], dedupe_key='async')
+        assert list(OutboxMessage.objects.values_list('task_name', 'args')) == [
+            ('events.tasks.send_rsvp_notification', [1, 2])
+        ]
+
+@pytest.mark.django_db
+class TestEventAttendees:
+    def _event_with_rsvps(self, create_user):
+        from events.models import RSVP
+        organizer = create_user(username='organizer')
+        event = Event.objects.create(
+            title='Launch', description='d', organizer=organizer, location='Hall', capacity=3,
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=2),
+        )
+        users = [User.objects.create_user(username=f'attendee{i}', password='testpass123') for i in range(6)]
+        for user, rsvp_status in zip(users, ['Going', 'Maybe', 'Going', 'Going', 'Going', 'Not Going']):
+            RSVP.objects.create(event=event, user=user, status=rsvp_status)
+        return organizer, event, users
+    
+    def test_organizer_pages_one_status_with_totals(self, api_client, create_user):
+        organizer, event, users = self._event_with_rsvps(create_user)
+        api_client.force_authenticate(user=organizer)
+        url = f'/api/events/{event.id}/attendees/'
+        
+        response = api_client.get(url, {'status': 'Going', 'page_size': 2})
+        assert response.status_code == 200
+        assert response.data['totals'] == {'Going': 3, 'Maybe': 1, 'Not Going': 1, 'Waitlisted': 1}
+        names = [row['user_name'] for row in response.data['results']]
+        names += [row['user_name'] for row in api_client.get(response.data['next']).data['results']]
+        assert names == ['attendee0', 'attendee2', 'attendee3']
+        assert set(response.data['results'][0]) == {'id', 'user', 'user_name', 'status', 'created_at'}
+        
+        waitlisted = api_client.get(url, {'status': 'Waitlisted'}).data['results']
+        assert [(row['user'], row['status']) for row in waitlisted] == [(users[4].id, 'Waitlisted')]
+        assert len(api_client.get(url).data['results']) == 6
+        assert api_client.get(url, {'status': 'Coming'}).status_code == 400
+    
+    def test_csv_streams_every_row_in_signup_order(self, api_client, create_user):
+        import csv
+        import io
+        organizer, event, users = self._event_with_rsvps(create_user)
+        api_client.force_authenticate(user=organizer)
+        response = api_client.get(f'/api/events/{event.id}/attendees/', {'status': 'Going', 'output': 'csv'}, HTTP_ACCEPT='text/csv')
+        assert response.status_code == 200 and response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert [row['user_name'] for row in rows] == ['attendee0', 'attendee2', 'attendee3']
+        assert rows[0]['user'] == str(users[0].id) and rows[0]['status'] == 'Going'
+    
+    def test_only_the_organizer_or_staff_may_list(self, api_client, create_user):
+        organizer, event, users = self._event_with_rsvps(create_user)
+        url = f'/api/events/{event.id}/attendees/'
+        assert api_client.get(url).status_code == 401
+        api_client.force_authenticate(user=users[0])
+        assert api_client.get(url).status_code == 403
+        assert api_client.get(url, {'output': 'csv'}).status_code == 403
+        assert api_client.get('/api/events/999/attendees/').status_code == 404
+        api_client.force_authenticate(user=User.objects.create_user(username='staff', is_staff=True))
+        assert api_client.get(url).status_code == 200
+
+@pytest.mark.django_db
+class TestProvisionUsers:
+    def test_creates_users_and_exactly_one_profile_each(self, tmp_path, settings, create_user):
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+        from user.models import UserProfile
+        settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+        create_user(username='existing')
+        rows = [
+            {'username': 'ana', 'email': 'ana@partner.com', 'password': 'Tr1cky-Pass!', 'full_name': 'Ana Lopez', 'location': 'Pune'},
+            {'username': 'ben', 'email': 'ben@partner.com', 'first_name': 'Ben'},
+            {'username': 'ana', 'email': 'ana2@partner.com'},
+            {'username': 'cy', 'email': 'ana@partner.com'},
+            {'username': 'dee', 'email': 'existing@test.com'},
+            {'username': 'bad name!', 'email': 'not-an-email'},
+            {'username': 'eve', 'email': 'eve@partner.com', 'password': 'password'},
+        ]
+        path = tmp_path / 'users.ndjson'
+        path.write_text(''.join(json.dumps(row) + '\n' for row in rows) + '{broken\n')
+        
+        out, err = StringIO(), StringIO()
+        call_command('provision_users', str(path), workers=2, batch_size=2, stdout=out, stderr=err)
+        assert 'Provisioned 2 user(s)' in out.getvalue() and 'rows/s' in out.getvalue()
+        assert '6 row(s) rejected' in out.getvalue()
+        rejected = [line.split(':')[0] for line in err.getvalue().splitlines()]
+        assert rejected == ['Line 3', 'Line 4', 'Line 5', 'Line 6', 'Line 7', 'Line 8']
+        
+        ana = User.objects.get(username='ana')
+        assert ana.check_password('Tr1cky-Pass!')
+        assert (ana.profile.full_name, ana.profile.location) == ('Ana Lopez', 'Pune')
+        ben = User.objects.get(username='ben')
+        assert ben.first_name == 'Ben' and not ben.has_usable_password()
+        assert UserProfile.objects.filter(user__in=[ana, ben]).count() == 2
+        
+        # Rerunning the file creates nothing
+        call_command('provision_users', str(path), workers=1, stdout=StringIO(), stderr=StringIO())
+        assert User.objects.count() == 3
+    
+    def test_csv_and_dry_run(self, tmp_path):
+        from io import StringIO
+        from django.core.management import call_command
+        path = tmp_path / 'users.csv'
+        path.write_text('username,email,password,full_name\nzed,zed@partner.com,Tr1cky-Pass!,Zed\n')
+        out = StringIO()
+        call_command('provision_users', str(path), dry_run=True, stdout=out)
+        assert 'Validated 1 user(s)' in out.getvalue()
+        assert not User.objects.filter(username='zed').exists()
+
+@pytest.mark.django_db
+class TestTimeline:
+    def _event(self, organizer, days, **kwargs):
+        return Event.objects.create(
+            title=f'Day {days}', description='d', organizer=organizer, location=f'Hall {days}',
+            start_time=timezone.now() + timedelta(days=days), end_time=timezone.now() + timedelta(days=days, hours=2),
+            **kwargs,
+        )
+    
+    def _timeline(self, api_client, user, **params):
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/me/timeline/', params)
+        assert response.status_code == 200
+        return [(entry['event']['id'], entry['reason']) for entry in response.data['results']]
+    
+    def test_entries_follow_rsvp_and_event_writes(self, api_client, create_user):
+        from events.models import RSVP
+        alice, bob = create_user(username='alice'), create_user(username='bob')
+        later, sooner, other = self._event(alice, 5), self._event(alice, 2), self._event(bob, 3)
+        rsvp = RSVP.objects.create(event=other, user=alice, status='Maybe')
+        RSVP.objects.create(event=sooner, user=bob, status='Going')
+        assert self._timeline(api_client, alice) == [(sooner.id, 'Organizer'), (other.id, 'Maybe'), (later.id, 'Organizer')]
+        assert self._timeline(api_client, bob) == [(sooner.id, 'Going'), (other.id, 'Organizer')]
+        
+        # Moving an event reorders every timeline it is on
+        sooner.start_time = timezone.now() + timedelta(days=10)
+        sooner.end_time = sooner.start_time + timedelta(hours=1)
+        sooner.save()
+        assert self._timeline(api_client, bob) == [(other.id, 'Organizer'), (sooner.id, 'Going')]
+        
+        rsvp.status = 'Not Going'
+        rsvp.save()
+        assert (other.id, 'Maybe') not in self._timeline(api_client, alice)
+        RSVP.objects.filter(event=sooner, user=bob).delete()
+        assert self._timeline(api_client, bob) == [(other.id, 'Organizer')]
+        
+        other.organizer = alice
+        other.save()
+        assert self._timeline(api_client, bob) == []
+        assert (other.id, 'Organizer') in self._timeline(api_client, alice)
+        
+        api_client.force_authenticate(user=None)
+        assert api_client.get('/api/me/timeline/').status_code == 401
+    
+    def test_bulk_writes_and_promotions_update_timelines(self, api_client, create_user):
+        from events.models import RSVP
+        organizer = create_user(username='organizer')
+        event = self._event(organizer, 1, capacity=1)
+        first, second = create_user(username='first'), create_user(username='second')
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        api_client.force_authenticate(user=staff)
+        response = api_client.post('/api/events/rsvps/bulk/', [
+            {'event': event.id, 'user': first.id, 'status': 'Going'},
+            {'event': event.id, 'user': second.id, 'status': 'Going'},
+        ], format='json')
+        assert response.status_code == 200
+        assert self._timeline(api_client, first) == [(event.id, 'Going')]
+        # Waitlisted RSVPs are not on the timeline until promoted
+        assert self._timeline(api_client, second) == []
+        
+        RSVP.objects.get(event=event, user=first).delete()
+        assert self._timeline(api_client, second) == [(event.id, 'Going')]
+        assert self._timeline(api_client, first) == []
+    
+    def test_pages_by_start_time_and_rebuilds(self, api_client, create_user):
+        from django.core.management import call_command
+        from events.models import TimelineEntry
+        from io import StringIO
+        user = create_user(username='busy')
+        events = [self._event(user, days) for days in (4, -1, 2, 3, 1)]
+        ordered = sorted(events, key=lambda event: event.start_time)
+        
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/me/timeline/', {'page_size': 2})
+        ids = [entry['event']['id'] for entry in response.data['results']]
+        while response.data['next']:
+            response = api_client.get(response.data['next'])
+            ids += [entry['event']['id'] for entry in response.data['results']]
+        assert ids == [event.id for event in ordered]
+        assert [event_id for event_id, _ in self._timeline(api_client, user, upcoming='true')] == ids[1:]
+        
+        expected = set(TimelineEntry.objects.values_list('user_id', 'event_id', 'reason', 'start_time'))
+        TimelineEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_timelines', stdout=out)
+        assert 'Wrote 5 timeline entries' in out.getvalue()
+        assert set(TimelineEntry.objects.values_list('user_id', 'event_id', 'reason', 'start_time')) == expected
@@ -0,0 +1,126 @@
+"""
+Materialized per-user timelines ("my events").
+
+A user's timeline holds one ``TimelineEntry`` per event they organize or
+RSVP'd Going or Maybe to, carrying a copy of the event's ``start_time``,
+so ``/api/me/timeline/`` is a keyset range scan of the user's own rows
+instead of a union of ``organized_events`` and ``rsvps`` sorted as a
+whole. Signals keep the entries in step with single-row writes. The bulk
+paths that skip signals (bulk RSVPs, waitlist promotion, event imports)
+call the helpers here themselves. Migration 0011 fills the table for
+existing data and ``rebuild_timelines`` recomputes it from the source
+tables at any time.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import Event, RSVP, TimelineEntry
+
+ORGANIZER = 'Organizer'
+RSVP_REASONS = ('Going', 'Maybe')
+
+
+def _upsert(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, update_conflicts=True, unique_fields=['user', 'event'], update_fields=['reason', 'start_time'],
+    )
+
+
+def sync_rsvp_entries(rsvps):
+    """
+    Bring the entries of ``(user_id, event_id, status)`` RSVPs up to date;
+    ``status`` is None for deleted RSVPs. Organizers keep their entry
+    whatever their RSVP says.
+    """
+    rsvps = list(rsvps)
+    if not rsvps:
+        return
+    events = {
+        pk: (organizer_id, start_time)
+        for pk, organizer_id, start_time in Event.objects.filter(
+            pk__in={event_id for _, event_id, _ in rsvps}
+        ).values_list('pk', 'organizer_id', 'start_time')
+    }
+    upserts, removals = [], set()
+    for user_id, event_id, status in rsvps:
+        if event_id not in events:
+            continue
+        organizer_id, start_time = events[event_id]
+        if user_id == organizer_id:
+            continue
+        if status in RSVP_REASONS:
+            upserts.append(TimelineEntry(user_id=user_id, event_id=event_id, reason=status, start_time=start_time))
+        else:
+            removals.add((user_id, event_id))
+    if upserts:
+        _upsert(upserts)
+    if removals:
+        stale = TimelineEntry.objects.filter(
+            user_id__in={user_id for user_id, _ in removals}, event_id__in={event_id for _, event_id in removals},
+        ).values_list('pk', 'user_id', 'event_id')
+        TimelineEntry.objects.filter(pk__in=[pk for pk, user_id, event_id in stale if (user_id, event_id) in removals]).delete()
+
+
+def add_organizer_entries(events):
+    """Entries for the organizers of newly created ``events``."""
+    _upsert([
+        TimelineEntry(user_id=event.organizer_id, event_id=event.pk, reason=ORGANIZER, start_time=event.start_time)
+        for event in events
+    ])
+
+
+def sync_event_entries(event, old_organizer_id, old_start_time):
+    """Follow an event's move to another time or organizer."""
+    if event.start_time != old_start_time:
+        TimelineEntry.objects.filter(event_id=event.pk).update(start_time=event.start_time)
+    if event.organizer_id != old_organizer_id:
+        add_organizer_entries([event])
+        # The former organizer keeps the event only through an RSVP of their own
+        status = RSVP.objects.filter(event_id=event.pk, user_id=old_organizer_id).values_list('status', flat=True).first()
+        sync_rsvp_entries([(old_organizer_id, event.pk, status)])
+
+
+def _write_rows(entry_model, rows, batch_size):
+    written, batch = 0, []
+    for user_id, event_id, reason, start_time in rows:
+        batch.append(entry_model(user_id=user_id, event_id=event_id, reason=reason, start_time=start_time))
+        if len(batch) >= batch_size:
+            written += len(entry_model.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        written += len(entry_model.objects.bulk_create(batch))
+    return written
+
+
+def build_timelines(event_model, rsvp_model, entry_model, user_ids=None, batch_size=2000):
+    """
+    Replace timeline entries with ones computed from events and RSVPs.
+
+    Takes the model classes so that migrations can pass their historical
+    models; the caller provides the transaction.
+    """
+    entries = entry_model.objects.all()
+    organized = event_model.objects.all()
+    # An organizer's own RSVP never adds a second entry
+    rsvps = rsvp_model.objects.filter(status__in=RSVP_REASONS).exclude(event__organizer_id=F('user_id'))
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+        organized = organized.filter(organizer_id__in=user_ids)
+        rsvps = rsvps.filter(user_id__in=user_ids)
+
+    entries.delete()
+    rows = organized.order_by('pk').values_list('organizer_id', 'pk', 'start_time')
+    written = _write_rows(
+        entry_model,
+        ((user_id, event_id, ORGANIZER, start_time) for user_id, event_id, start_time in rows.iterator(chunk_size=batch_size)),
+        batch_size,
+    )
+    rows = rsvps.order_by('pk').values_list('user_id', 'event_id', 'status', 'event__start_time')
+    written += _write_rows(entry_model, rows.iterator(chunk_size=batch_size), batch_size)
+    return written
+
+
+def rebuild_timelines(user_ids=None, batch_size=2000):
+    """Recompute timeline entries from events and RSVPs. Returns the number of entries written."""
+    with transaction.atomic():
+        return build_timelines(Event, RSVP, TimelineEntry, user_ids, batch_size)
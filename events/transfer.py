@@ -0,0 +1,224 @@
+"""
+Bulk export and import of events.
+
+Exports stream rows straight from a server-side iterator, so memory stays
+constant no matter how many events match. Imports validate and write in
+fixed-size batches, each inside its own transaction.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .caching import bump_versions, events_scope, venue_scope
+from .models import Event, EventStats
+from .search import get_search_backend
+from .timeline import add_organizer_entries
+
+EXPORT_FIELDS = [
+    'id', 'title', 'description', 'organizer', 'organizer_name', 'location', 'latitude', 'longitude',
+    'start_time', 'end_time', 'is_public', 'capacity', 'created_at', 'updated_at',
+]
+_EXPORT_COLUMNS = [
+    'id', 'title', 'description', 'organizer_id', 'organizer__username', 'location', 'latitude', 'longitude',
+    'start_time', 'end_time', 'is_public', 'capacity', 'created_at', 'updated_at',
+]
+DATETIME_FIELDS = {'start_time', 'end_time', 'created_at', 'updated_at'}
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def export_rows(queryset, chunk_size=2000):
+    """Yield one plain dict per event, reading ``chunk_size`` rows at a time."""
+    rows = queryset.order_by('pk').values_list(*_EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+    for values in rows:
+        row = dict(zip(EXPORT_FIELDS, values))
+        for name in DATETIME_FIELDS:
+            row[name] = row[name].isoformat()
+        yield row
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def csv_lines(rows, fieldnames=EXPORT_FIELDS):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def serialize_rows(rows, output_format):
+    return ndjson_lines(rows) if output_format == 'ndjson' else csv_lines(rows)
+
+
+def read_rows(fp, input_format):
+    """Yield ``(line_number, row_dict)`` from an NDJSON or CSV stream."""
+    if input_format == 'ndjson':
+        for line_number, line in enumerate(fp, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as exc:
+                yield line_number, exc
+    else:
+        # Line 1 is the header
+        for line_number, row in enumerate(csv.DictReader(fp), start=2):
+            yield line_number, row
+
+
+@dataclass
+class ImportReport:
+    valid: int = 0
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if value in (None, ''):
+        return True
+    normalized = str(value).strip().lower()
+    if normalized in ('1', 'true', 'yes', 't', 'y'):
+        return True
+    if normalized in ('0', 'false', 'no', 'f', 'n'):
+        return False
+    raise ValidationError({'is_public': f'Invalid boolean "{value}".'})
+
+
+def _parse_datetime(name, value):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValidationError({name: f'Invalid datetime "{value}".'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_float(name, value):
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: f'Invalid number "{value}".'})
+
+
+def _parse_capacity(value):
+    if value in (None, ''):
+        return None
+    try:
+        capacity = int(value)
+    except (TypeError, ValueError):
+        capacity = -1
+    if capacity < 0:
+        raise ValidationError({'capacity': f'Invalid capacity "{value}".'})
+    return capacity
+
+
+def _resolve_organizers(rows):
+    """Load every organizer referenced by a batch, by id or username, in two queries."""
+    ids, usernames = set(), set()
+    for row in rows:
+        organizer = row.get('organizer')
+        if organizer not in (None, ''):
+            try:
+                ids.add(int(organizer))
+            except (TypeError, ValueError):
+                pass
+        elif row.get('organizer_name'):
+            usernames.add(row['organizer_name'])
+    users = list(User.objects.filter(pk__in=ids).only('pk', 'username'))
+    users += list(User.objects.filter(username__in=usernames).only('pk', 'username'))
+    return {user.pk: user for user in users}, {user.username: user for user in users}
+
+
+def _build_event(row, by_id, by_username):
+    organizer = row.get('organizer')
+    if organizer not in (None, ''):
+        try:
+            user = by_id.get(int(organizer))
+        except (TypeError, ValueError):
+            user = None
+    else:
+        user = by_username.get(row.get('organizer_name'))
+    if user is None:
+        raise ValidationError({'organizer': 'Organizer not found.'})
+
+    missing = [name for name in ('title', 'location', 'start_time', 'end_time') if not row.get(name)]
+    if missing:
+        raise ValidationError({name: 'This field is required.' for name in missing})
+
+    event = Event(
+        title=row['title'],
+        description=row.get('description') or '',
+        organizer=user,
+        location=row['location'],
+        latitude=_parse_float('latitude', row.get('latitude')),
+        longitude=_parse_float('longitude', row.get('longitude')),
+        start_time=_parse_datetime('start_time', row['start_time']),
+        end_time=_parse_datetime('end_time', row['end_time']),
+        is_public=_parse_bool(row.get('is_public')),
+        capacity=_parse_capacity(row.get('capacity')),
+    )
+    event.clean()
+    return event
+
+
+def _write_batch(events):
+    with transaction.atomic():
+        created = Event.objects.bulk_create(events)
+        # bulk_create skips the post_save handlers that maintain derived data
+        EventStats.objects.bulk_create([EventStats(event=event, capacity=event.capacity) for event in created])
+        get_search_backend().index(created)
+        add_organizer_entries(created)
+        bump_versions(*{venue_scope(event.location) for event in created})
+    return len(created)
+
+
+def _import_batch(batch, report, dry_run):
+    by_id, by_username = _resolve_organizers([row for _, row in batch])
+    events = []
+    for line_number, row in batch:
+        try:
+            events.append(_build_event(row, by_id, by_username))
+        except ValidationError as exc:
+            report.errors.append((line_number, exc.message_dict if hasattr(exc, 'error_dict') else exc.messages))
+    report.valid += len(events)
+    if events and not dry_run:
+        report.created += _write_batch(events)
+
+
+def import_events(rows, batch_size=1000, dry_run=False):
+    """Validate ``(line_number, row)`` pairs and insert them in chunked transactions."""
+    report = ImportReport()
+    batch = []
+    for line_number, row in rows:
+        if not isinstance(row, dict):
+            report.errors.append((line_number, [f'Invalid row: {row}']))
+            continue
+        batch.append((line_number, row))
+        if len(batch) >= batch_size:
+            _import_batch(batch, report, dry_run)
+            batch = []
+    if batch:
+        _import_batch(batch, report, dry_run)
+    if report.created:
+        bump_versions(events_scope())
+    return report
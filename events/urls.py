@@ -2,19 +2,27 @@
 URL patterns for event-related endpoints.
 """
 from django.urls import path
+from .async_views import AsyncEventDetailView, AsyncEventListView, AsyncReviewListView
 from .views import (
     EventListCreateView,
     EventDetailView,
+    EventExportView,
+    VenueFreeSlotsView,
     EventUpdateView,
     EventDeleteView,
     RSVPCreateView,
     RSVPUpdateView,
+    BulkRSVPView,
+    EventAttendeesView,
     ReviewListCreateView,
+    TimelineView,
 )
 
 urlpatterns = [
     # Event endpoints
     path('events/', EventListCreateView.as_view(), name='event-list-create'),
+    path('events/export/', EventExportView.as_view(), name='event-export'),
+    path('events/free-slots/', VenueFreeSlotsView.as_view(), name='venue-free-slots'),
     path('events/<int:pk>/', EventDetailView.as_view(), name='event-detail'),
     path('events/<int:pk>/update/', EventUpdateView.as_view(), name='event-update'),
     path('events/<int:pk>/delete/', EventDeleteView.as_view(), name='event-delete'),
@@ -22,7 +30,17 @@ urlpatterns = [
     # RSVP endpoints
     path('events/<int:event_id>/rsvp/', RSVPCreateView.as_view(), name='rsvp-create'),
     path('events/<int:event_id>/rsvp/<int:user_id>/', RSVPUpdateView.as_view(), name='rsvp-update'),
+    path('events/rsvps/bulk/', BulkRSVPView.as_view(), name='rsvp-bulk'),
+    path('events/<int:event_id>/attendees/', EventAttendeesView.as_view(), name='event-attendees'),
     
     # Review endpoints
     path('events/<int:event_id>/reviews/', ReviewListCreateView.as_view(), name='review-list-create'),
+    
+    # Current user's "my events" timeline
+    path('me/timeline/', TimelineView.as_view(), name='my-timeline'),
+    
+    # Async read endpoints (same payloads, for ASGI deployments)
+    path('async/events/', AsyncEventListView.as_view(), name='async-event-list'),
+    path('async/events/<int:pk>/', AsyncEventDetailView.as_view(), name='async-event-detail'),
+    path('async/events/<int:event_id>/reviews/', AsyncReviewListView.as_view(), name='async-review-list'),
 ]
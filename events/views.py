@@ -1,44 +1,116 @@
-from rest_framework import generics, status
-from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
-from django_filters.rest_framework import DjangoFilterBackend
-from django_filters import FilterSet, CharFilter
-from rest_framework.filters import SearchFilter, OrderingFilter
+from datetime import timedelta
+
+from django import forms
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .models import Event, RSVP, Review
-from .serializers import EventSerializer, RSVPSerializer, ReviewSerializer
-
+from event_management.renderers import FastJSONRenderer
 
-class EventFilter(FilterSet):
-    """Custom filter for events with case-insensitive location search."""
-    location = CharFilter(field_name='location', lookup_expr='icontains')
-    
-    class Meta:
-        model = Event
-        fields = ['location', 'is_public']
+from . import outbox
+from .bulk import ERROR, bulk_upsert_rsvps
+from .fastpath import FastListMixin, attendee_row_builder, event_row_builder, review_row_builder
+from .fieldsets import SparseFieldsetMixin
+from .caching import CachedResponseMixin, event_scope, events_scope, reviews_scope
+from .filters import EventFilter, parse_window
+from .intervals import venue_index
+from .models import Event, RSVP, Review, TimelineEntry
+from .pagination import AttendeeCursorPagination, EventCursorPagination, ReviewCursorPagination, TimelineCursorPagination
+from .permissions import IsEventOrganizer
+from .search import EventSearchFilter
+from .serializers import (
+    AttendeeSerializer, BulkRSVPItemSerializer, EventSerializer, FreeSlotSerializer, RSVPSerializer, ReviewSerializer,
+    TimelineEntrySerializer,
+)
+from .stats import status_totals
+from .transfer import CONTENT_TYPES, FORMATS, csv_lines, export_rows, serialize_rows
 
 
-class EventListCreateView(generics.ListCreateAPIView):
-    queryset = Event.objects.all()
+class EventListCreateView(CachedResponseMixin, SparseFieldsetMixin, FastListMixin, generics.ListCreateAPIView):
+    queryset = Event.objects.with_aggregates()
     serializer_class = EventSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    token_user_allowed = True
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    row_builder = event_row_builder()
+    pagination_class = EventCursorPagination
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, OrderingFilter]
     filterset_class = EventFilter
     search_fields = ['title', 'description', 'organizer__username']
     ordering_fields = ['start_time', 'created_at']
     ordering = ['-start_time']
     
+    def get_cache_scopes(self):
+        return [events_scope()]
+    
     def perform_create(self, serializer):
         user = User.objects.first() or User.objects.create_user(username='admin', password='admin')
         serializer.save(organizer=user)
 
 
-class EventDetailView(generics.RetrieveAPIView):
-    queryset = Event.objects.all()
+class EventExportView(APIView):
+    """Stream every matching event as NDJSON (default) or CSV in constant memory."""
+    permission_classes = [IsAdminUser]
+    chunk_size = 2000
+    
+    def perform_content_negotiation(self, request, force=False):
+        # The body is not rendered by DRF, so never reject on the Accept header
+        return super().perform_content_negotiation(request, force=True)
+    
+    def get(self, request):
+        output_format = request.query_params.get('output', 'ndjson')
+        if output_format not in FORMATS:
+            return Response({'error': f'output must be one of: {", ".join(FORMATS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        filterset = EventFilter(request.query_params, queryset=Event.objects.all())
+        if not filterset.is_valid():
+            return Response({'error': filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rows = export_rows(filterset.qs, chunk_size=self.chunk_size)
+        response = StreamingHttpResponse(serialize_rows(rows, output_format), content_type=CONTENT_TYPES[output_format])
+        response['Content-Disposition'] = f'attachment; filename="events.{output_format}"'
+        return response
+
+
+class VenueFreeSlotsView(APIView):
+    """Gaps in one venue's schedule: ``?venue=<location>&window=start,end&min_duration=<minutes>``."""
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        venue = request.query_params.get('venue')
+        if not venue:
+            return Response({'error': 'venue is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start, end = parse_window(request.query_params.get('window'))
+        except forms.ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            min_duration = timedelta(minutes=int(request.query_params.get('min_duration', 0)))
+        except ValueError:
+            return Response({'error': 'min_duration must be a whole number of minutes'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        slots = venue_index(venue).free_slots(start, end, min_duration)
+        serializer = FreeSlotSerializer([{'start': slot_start, 'end': slot_end} for slot_start, slot_end in slots], many=True)
+        return Response({'venue': venue, 'slots': serializer.data})
+
+
+class EventDetailView(CachedResponseMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
+    queryset = Event.objects.with_aggregates()
     serializer_class = EventSerializer
     permission_classes = [AllowAny]
+    
+    def get_cache_scopes(self):
+        return [event_scope(self.kwargs['pk'])]
 
 
 class EventUpdateView(generics.UpdateAPIView):
@@ -53,9 +125,10 @@ class EventDeleteView(generics.DestroyAPIView):
     permission_classes = [AllowAny]
 
 
-class RSVPCreateView(generics.CreateAPIView):
+class RSVPCreateView(SparseFieldsetMixin, generics.CreateAPIView):
     serializer_class = RSVPSerializer
     permission_classes = [AllowAny]
+    throttle_scope = 'rsvp'
     
     def post(self, request, event_id):
         try:
@@ -63,22 +136,33 @@ class RSVPCreateView(generics.CreateAPIView):
         except Event.DoesNotExist:
             return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        user = User.objects.first() or User.objects.create_user(username='user1', password='pass')
-        
-        if RSVP.objects.filter(event=event, user=user).exists():
-            return Response({'error': 'Already RSVP\'d'}, status=status.HTTP_400_BAD_REQUEST)
+        if request.user.is_authenticated:
+            user = request.user
+        else:
+            user = User.objects.first() or User.objects.create_user(username='user1', password='pass')
         
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
         try:
-            serializer.save(user=user, event=event)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            # The notification is committed with the RSVP; the outbox relay publishes it.
+            # Saving claims a seat, or stores the RSVP as Waitlisted when the event is full.
+            with transaction.atomic():
+                rsvp = serializer.save(user=user, event=event)
+                outbox.enqueue(
+                    'events.tasks.send_rsvp_notification',
+                    [event.id, user.id, rsvp.status],
+                    dedupe_key=f'rsvp:{rsvp.pk}',
+                )
+        except IntegrityError:
+            # The (event, user) unique constraint settles concurrent duplicates
+            return Response({'error': 'Already RSVP\'d'}, status=status.HTTP_400_BAD_REQUEST)
         except ValidationError as e:
             return Response({'error': str(e.messages[0])}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class RSVPUpdateView(generics.UpdateAPIView):
+class RSVPUpdateView(SparseFieldsetMixin, generics.UpdateAPIView):
     serializer_class = RSVPSerializer
     permission_classes = [AllowAny]
     http_method_names = ['patch']
@@ -95,13 +179,141 @@ class RSVPUpdateView(generics.UpdateAPIView):
         return Response(serializer.data)
 
 
-class ReviewListCreateView(generics.ListCreateAPIView):
+class EventAttendeesView(FastListMixin, generics.ListAPIView):
+    """
+    An event's RSVPs in signup order, for its organizer: ``?status=Going``
+    narrows the list to one status, ``?output=csv`` streams every matching
+    row instead of one page. Pages carry the per-status totals.
+    """
+    serializer_class = AttendeeSerializer
+    permission_classes = [IsAuthenticated, IsEventOrganizer]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    row_builder = attendee_row_builder()
+    pagination_class = AttendeeCursorPagination
+    filter_backends = []
+    chunk_size = 2000
+    
+    def perform_content_negotiation(self, request, force=False):
+        # CSV bodies bypass the renderers, so check-in desks may send any Accept header
+        return super().perform_content_negotiation(request, force=True)
+    
+    def get_event(self):
+        if not hasattr(self, '_event'):
+            try:
+                self._event = Event.objects.only('id', 'organizer_id').get(pk=self.kwargs['event_id'])
+            except Event.DoesNotExist:
+                raise NotFound('Event not found')
+            self.check_object_permissions(self.request, self._event)
+        return self._event
+    
+    def get_queryset(self):
+        queryset = RSVP.objects.filter(event=self.get_event()).select_related('user')
+        rsvp_status = self.request.query_params.get('status')
+        return queryset.filter(status=rsvp_status) if rsvp_status else queryset
+    
+    def list(self, request, *args, **kwargs):
+        self.get_event()
+        output_format = request.query_params.get('output', 'json')
+        if output_format not in ('json', 'csv'):
+            return Response({'error': 'output must be one of: json, csv'}, status=status.HTTP_400_BAD_REQUEST)
+        statuses = dict(RSVP.STATUS_CHOICES)
+        if request.query_params.get('status', '') not in ('', *statuses):
+            return Response({'error': f'status must be one of: {", ".join(statuses)}'}, status=status.HTTP_400_BAD_REQUEST)
+        if output_format == 'json':
+            return super().list(request, *args, **kwargs)
+        
+        rows = self.export_rows(self.row_builder.values(self.get_queryset().order_by('created_at', 'id')))
+        response = StreamingHttpResponse(
+            csv_lines(rows, fieldnames=list(AttendeeSerializer.Meta.fields)), content_type=CONTENT_TYPES['csv']
+        )
+        response['Content-Disposition'] = f'attachment; filename="event-{self.kwargs["event_id"]}-attendees.csv"'
+        return response
+    
+    def export_rows(self, queryset):
+        """Yield output rows, fetching and building ``chunk_size`` at a time."""
+        batch = []
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            batch.append(row)
+            if len(batch) == self.chunk_size:
+                yield from self.row_builder.build(batch)
+                batch = []
+        yield from self.row_builder.build(batch)
+    
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['totals'] = status_totals(self.get_event().pk)
+        return response
+
+
+class TimelineView(generics.ListAPIView):
+    """
+    Events the current user organizes or RSVP'd Going/Maybe to, by start
+    time, read from their materialized timeline. ``?upcoming=true`` skips
+    events that have already started.
+    """
+    serializer_class = TimelineEntrySerializer
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    pagination_class = TimelineCursorPagination
+    filter_backends = []
+    
+    def get_queryset(self):
+        queryset = TimelineEntry.objects.filter(user_id=self.request.user.pk).select_related(
+            'event__organizer', 'event__stats'
+        )
+        if self.request.query_params.get('upcoming', '').lower() in ('1', 'true', 'yes'):
+            queryset = queryset.filter(start_time__gte=timezone.now())
+        return queryset
+
+
+class BulkRSVPView(APIView):
+    """Create or update many RSVPs at once, reporting a result per item."""
+    permission_classes = [IsAdminUser]
+    max_items = 5000
+    
+    def post(self, request):
+        items = request.data.get('rsvps') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Expected a non-empty list of RSVPs'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_items:
+            return Response({'error': f'At most {self.max_items} RSVPs per request'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = [None] * len(items)
+        valid, positions = [], []
+        for index, item in enumerate(items):
+            serializer = BulkRSVPItemSerializer(data=item)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+                positions.append(index)
+            else:
+                results[index] = {'index': index, 'result': ERROR, 'errors': serializer.errors}
+        
+        for result, index in zip(bulk_upsert_rsvps(valid), positions):
+            results[index] = dict(result, index=index)
+        
+        summary = {}
+        for result in results:
+            summary[result['result']] = summary.get(result['result'], 0) + 1
+        return Response({'summary': summary, 'results': results})
+
+
+class ReviewListCreateView(CachedResponseMixin, SparseFieldsetMixin, FastListMixin, generics.ListCreateAPIView):
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [AllowAny]
+    token_user_allowed = True
+    throttle_scope = 'review'
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    row_builder = review_row_builder()
+    pagination_class = ReviewCursorPagination
+    last_modified_fields = ('created_at',)
+    
+    def get_cache_scopes(self):
+        return [reviews_scope(self.kwargs['event_id'])]
     
     def get_queryset(self):
         event_id = self.kwargs.get('event_id')
-        return Review.objects.filter(event_id=event_id)
+        return super().get_queryset().filter(event_id=event_id)
     
     def post(self, request, event_id):
         try:
@@ -118,7 +330,13 @@ class ReviewListCreateView(generics.ListCreateAPIView):
         serializer.is_valid(raise_exception=True)
         
         try:
-            serializer.save(user=user, event=event)
+            with transaction.atomic():
+                review = serializer.save(user=user, event=event)
+                outbox.enqueue(
+                    'events.tasks.send_review_notification',
+                    [event.id, user.id, review.rating],
+                    dedupe_key=f'review:{review.pk}',
+                )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except ValidationError as e:
             return Response({'error': str(e.messages[0])}, status=status.HTTP_400_BAD_REQUEST)
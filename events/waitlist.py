@@ -0,0 +1,48 @@
+"""
+Waitlist promotion for capacity-limited events.
+
+When a Going RSVP gives up its seat (changes status or is deleted) or the
+event's capacity grows, the longest-waiting Waitlisted RSVPs move to Going,
+each through the same conditional seat claim as a new RSVP, and their users
+are notified through the outbox and get the event on their timeline.
+
+Correctness rests on the seat claim and on the promotion being conditional
+on the RSVP still being Waitlisted, not on row locks:
+``select_for_update(skip_locked=True)`` only lets concurrent promoters on
+Postgres skip each other's candidates and is a no-op on SQLite, where
+``BEGIN IMMEDIATE`` serializes writers instead.
+"""
+from django.db import transaction
+
+from . import outbox, stats, timeline
+from .caching import bump_versions, event_scope, events_scope
+from .models import RSVP
+
+
+def promote_waitlisted(event_id):
+    """Fill free seats from the waitlist, oldest first. Returns the promoted users' ids."""
+    promoted = []
+    with transaction.atomic():
+        while True:
+            # Concurrent promoters skip each other's candidates instead of queueing on them
+            candidate = (
+                RSVP.objects.select_for_update(skip_locked=True)
+                .filter(event_id=event_id, status='Waitlisted')
+                .order_by('created_at', 'pk').values_list('pk', 'user_id').first()
+            )
+            if candidate is None or not stats.claim_seat(event_id, 'Waitlisted'):
+                break
+            if not RSVP.objects.filter(pk=candidate[0], status='Waitlisted').update(status='Going'):
+                # Cancelled or changed since it was picked; give the seat back and try the next one
+                stats.apply_deltas(event_id, stats.rsvp_deltas('Going', 'Waitlisted'))
+                continue
+            promoted.append(candidate[1])
+        outbox.enqueue_many([
+            outbox.build_message('events.tasks.send_waitlist_promotion', [event_id, user_id])
+            for user_id in promoted
+        ])
+        # The status UPDATE sends no signals
+        timeline.sync_rsvp_entries([(user_id, event_id, 'Going') for user_id in promoted])
+    if promoted:
+        bump_versions(events_scope(), event_scope(event_id))
+    return promoted
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        from . import authentication, blacklist  # noqa: F401 (connects the cache and blacklist signals)
+        from . import checks  # noqa: F401  (registers the deploy checks)
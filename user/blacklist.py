@@ -0,0 +1,173 @@
+"""
+Bounded refresh-token blacklist with in-process membership checks.
+
+Every process keeps a bloom filter of blacklisted ``jti`` values. A
+refresh token whose ``jti`` is not in the filter cannot be blacklisted,
+so only possible members are confirmed with simplejwt's database check.
+The filter is caught up incrementally whenever a shared version counter
+in the Django cache shows another process blacklisted something, and is
+rebuilt from scratch only when it fills up. Catch-ups re-read the last
+``CATCH_UP_OVERLAP`` ids below the highest one seen: with concurrent
+writers (e.g. Postgres) a lower id can commit after a higher one, and a
+row missed that way would let its revoked token through. Expired tokens
+are pruned in chunks by a beat task.
+
+Cross-process freshness relies on a shared cache backend (Redis,
+memcached). With a process-local cache (``LocMemCache``, the default) a
+process would never learn of tokens revoked by another, so the filter is
+bypassed and every refresh is checked against the database.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from events.checks import cache_is_process_local
+
+VERSION_KEY = 'user:blacklist:version'
+MIN_CAPACITY = 1024
+# Ids a blacklist insert may trail the highest committed one by; bounded by concurrent writers
+CATCH_UP_OVERLAP = 200
+
+
+class BloomFilter:
+    """Fixed-capacity bloom filter over strings, using double hashing of one digest."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    """The process-wide filter of blacklisted ``jti`` values."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        # Ids inside the overlap window already in the filter, so re-reads do not count twice
+        self._recent_ids = set()
+        self._version = None
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self._bloom
+
+    def sync(self):
+        # Read the version before the rows, so a row committed in between is caught next time
+        version = cache.get(VERSION_KEY)
+        with self._lock:
+            if self._bloom is None:
+                self._rebuild()
+            elif version != self._version:
+                self._catch_up()
+            self._version = version
+
+    def add(self, jti):
+        """Record a token blacklisted by this process without waiting for the next catch-up."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._bloom, self._last_id, self._recent_ids, self._version = None, 0, set(), None
+
+    def _rows(self, queryset):
+        return list(queryset.order_by('pk').values_list('pk', 'token__jti'))
+
+    def _rebuild(self):
+        rows = self._rows(BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()))
+        # Room to double before the next rebuild
+        self._bloom = BloomFilter(max(MIN_CAPACITY, 2 * len(rows)))
+        self._load(rows)
+        self._advance(rows)
+
+    def _catch_up(self):
+        rows = self._rows(BlacklistedToken.objects.filter(pk__gt=self._last_id - CATCH_UP_OVERLAP))
+        new_rows = [(pk, jti) for pk, jti in rows if pk not in self._recent_ids]
+        if self._bloom.count + len(new_rows) > self._bloom.capacity:
+            self._rebuild()
+            return
+        self._load(new_rows)
+        self._advance(rows)
+
+    def _advance(self, rows):
+        self._last_id = max([self._last_id, *(pk for pk, _ in rows)])
+        floor = self._last_id - CATCH_UP_OVERLAP
+        self._recent_ids = {pk for pk in self._recent_ids if pk > floor} | {pk for pk, _ in rows if pk > floor}
+
+    def _load(self, rows):
+        for _, jti in rows:
+            self._bloom.add(jti)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """``RefreshToken`` whose blacklist check only hits the database for possible members."""
+
+    def check_blacklist(self):
+        # Fail closed: a process-local cache never carries other processes' revocations
+        if cache_is_process_local() or blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+def bump_version():
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def track_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        blacklist_filter.add(instance.token.jti)
+        # Other processes catch up once the row is visible to them
+        transaction.on_commit(bump_version)
+
+
+def prune_expired_tokens(chunk_size=1000):
+    """
+    Delete expired outstanding tokens and their blacklist entries, one
+    short transaction per chunk. Returns the number of tokens deleted.
+    """
+    now = timezone.now()
+    deleted = 0
+    while True:
+        # Tokens expire roughly in insertion order, so a pk-ordered scan finds them first
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
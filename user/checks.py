@@ -0,0 +1,16 @@
+from django.core.checks import Tags, Warning, register
+
+from events.checks import cache_is_process_local
+
+
+@register(Tags.caches, deploy=True)
+def check_blacklist_cache_is_shared(app_configs, **kwargs):
+    """The blacklist filter learns of other processes' revocations through the cache."""
+    if not cache_is_process_local():
+        return []
+    return [Warning(
+        'The default cache is local to each process, so the refresh-token blacklist filter is bypassed and '
+        'every token refresh is checked against the database.',
+        hint='Set CACHE_BACKEND to a shared cache (e.g. Redis) to let the filter skip those lookups.',
+        id='user.W001',
+    )]
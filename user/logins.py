@@ -0,0 +1,75 @@
+"""
+Batched ``last_login`` updates for token logins.
+
+Logins are buffered per process and written with one ``bulk_update``
+once ``LAST_LOGIN_FLUSH_INTERVAL`` seconds have passed since the last
+write (or ``LAST_LOGIN_FLUSH_SIZE`` users are pending), instead of one
+``UPDATE auth_user`` per token obtained. ``last_login`` can therefore lag
+by up to the interval; anything still buffered is written at exit.
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.utils import timezone
+
+_pending = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _interval():
+    return getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 60)
+
+
+def record_login(user):
+    """Note that ``user`` just logged in; written now or with the next batch."""
+    now = timezone.now()
+    user.last_login = now
+    if _interval() <= 0:
+        get_user_model().objects.filter(pk=user.pk).update(last_login=now)
+        return
+    with _lock:
+        _pending[user.pk] = now
+        due = (
+            time.monotonic() - _last_flush >= _interval()
+            or len(_pending) >= getattr(settings, 'LAST_LOGIN_FLUSH_SIZE', 1000)
+        )
+    if due:
+        flush()
+
+
+def flush():
+    """Write every buffered login; returns the number of users updated."""
+    global _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+    User = get_user_model()
+    # bulk_update sends no post_save, so cached users are not evicted by a login
+    users = [User(pk=pk, last_login=last_login) for pk, last_login in pending.items()]
+    User.objects.bulk_update(users, ['last_login'], batch_size=500)
+    return len(users)
+
+
+def pending_count():
+    return len(_pending)
+
+
+def discard_pending():
+    with _lock:
+        _pending.clear()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except DatabaseError:
+        pass
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    UserRegistrationSerializer.validate_email looks users up by email, which
+    auth_user does not index. The table belongs to django.contrib.auth, so
+    the index is added with raw SQL rather than through model state.
+    """
+
+    dependencies = [
+        ('user', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS user_auth_user_email_idx ON auth_user (email)',
+            reverse_sql='DROP INDEX IF EXISTS user_auth_user_email_idx',
+        ),
+    ]
@@ -0,0 +1,192 @@
+"""
+Bulk user provisioning, e.g. when onboarding a partner organization.
+
+Rows are processed in batches. Usernames and emails are checked against
+the file's earlier rows and against the database with one ``IN`` query
+each per batch. Passwords are hashed in a process pool, since the
+configured hasher (PBKDF2 by default) is CPU bound. Users and their
+profiles are then inserted with ``bulk_create`` in one transaction per
+batch. ``bulk_create`` sends no ``post_save``, so ``create_user_profile``
+never runs and every user gets exactly the profile built here.
+
+The database check is repeated inside the write transaction, which on
+SQLite (``BEGIN IMMEDIATE``) holds the write lock, so a concurrent
+registration cannot slip a duplicate in between.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import UserProfile
+
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name')
+PROFILE_FIELDS = ('full_name', 'bio', 'location')
+
+
+@dataclass
+class ProvisionReport:
+    valid: int = 0
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+
+@dataclass
+class _Candidate:
+    line_number: int
+    user: User
+    password: str
+    profile: dict
+
+
+def _init_worker():
+    # Spawned workers (macOS, Windows) start without configured settings
+    import django
+    django.setup()
+
+
+class PasswordHasher:
+    """Hash passwords with ``make_password``, in ``workers`` processes when there is more than one."""
+
+    def __init__(self, workers=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def hash_all(self, passwords):
+        # Rows without a password get an unusable one, as create_user(password=None) would
+        if self._pool is None:
+            return [make_password(password or None) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._pool.map(make_password, [password or None for password in passwords], chunksize=chunksize))
+
+
+def _clean(value):
+    return '' if value is None else str(value).strip()
+
+
+def _build_candidate(line_number, row, validate_passwords):
+    values = {name: _clean(row.get(name)) for name in USER_FIELDS}
+    values['email'] = User.objects.normalize_email(values['email'])
+    user = User(**values)
+    errors = {}
+    try:
+        user.clean_fields(exclude=['password'])
+    except ValidationError as exc:
+        errors.update(exc.message_dict)
+    if not values['email']:
+        errors['email'] = ['This field is required.']
+    else:
+        try:
+            validate_email(values['email'])
+        except ValidationError as exc:
+            errors['email'] = exc.messages
+
+    password = row.get('password') or ''
+    if password and validate_passwords:
+        try:
+            validate_password(password, user=user)
+        except ValidationError as exc:
+            errors['password'] = exc.messages
+    if errors:
+        raise ValidationError(errors)
+    profile = {name: _clean(row.get(name)) for name in PROFILE_FIELDS}
+    return _Candidate(line_number, user, password, profile)
+
+
+def _reject_taken(candidates, report):
+    """Drop candidates whose username or email already exists in the database; two queries."""
+    usernames = User.objects.filter(
+        username__in=[candidate.user.username for candidate in candidates]
+    ).values_list('username', flat=True)
+    emails = User.objects.filter(
+        email__in=[candidate.user.email for candidate in candidates]
+    ).values_list('email', flat=True)
+    usernames, emails = set(usernames), set(emails)
+    kept = []
+    for candidate in candidates:
+        errors = {}
+        if candidate.user.username in usernames:
+            errors['username'] = ['A user with that username already exists.']
+        if candidate.user.email in emails:
+            errors['email'] = ['A user with this email already exists.']
+        if errors:
+            report.errors.append((candidate.line_number, errors))
+        else:
+            kept.append(candidate)
+    return kept
+
+
+def _write_batch(candidates, report):
+    with transaction.atomic():
+        checked = _reject_taken(candidates, report)
+        # Taken since the first check, by a concurrent registration
+        report.valid -= len(candidates) - len(checked)
+        candidates = checked
+        users = User.objects.bulk_create([candidate.user for candidate in candidates])
+        if any(user.pk is None for user in users):
+            # Backends that cannot return ids from a bulk insert
+            ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, **candidate.profile) for user, candidate in zip(users, candidates)
+        ])
+    report.created += len(users)
+
+
+def _provision_batch(batch, report, hasher, dry_run):
+    candidates = _reject_taken(batch, report)
+    report.valid += len(candidates)
+    if not candidates or dry_run:
+        return
+    for candidate, password in zip(candidates, hasher.hash_all([candidate.password for candidate in candidates])):
+        candidate.user.password = password
+    _write_batch(candidates, report)
+
+
+def provision_users(rows, batch_size=1000, workers=None, dry_run=False, validate_passwords=True):
+    """Validate ``(line_number, row)`` pairs and create their users and profiles in chunked transactions."""
+    report = ProvisionReport()
+    seen_usernames, seen_emails = set(), set()
+    batch = []
+    with PasswordHasher(0 if dry_run else workers) as hasher:
+        for line_number, row in rows:
+            if not isinstance(row, dict):
+                report.errors.append((line_number, [f'Invalid row: {row}']))
+                continue
+            try:
+                candidate = _build_candidate(line_number, row, validate_passwords)
+            except ValidationError as exc:
+                report.errors.append((line_number, exc.message_dict))
+                continue
+
+            username, email = candidate.user.username, candidate.user.email
+            if username in seen_usernames or email in seen_emails:
+                field_name = 'username' if username in seen_usernames else 'email'
+                report.errors.append((line_number, {field_name: ['Duplicate of an earlier row.']}))
+                continue
+            seen_usernames.add(username)
+            seen_emails.add(email)
+
+            batch.append(candidate)
+            if len(batch) >= batch_size:
+                _provision_batch(batch, report, hasher, dry_run)
+                batch = []
+        if batch:
+            _provision_batch(batch, report, hasher, dry_run)
+    return report
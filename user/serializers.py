@@ -2,12 +2,16 @@
 Serializers for user-related models.
 """
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from event_management.metrics import InstrumentedSerializerMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from .blacklist import FilteredRefreshToken
+from .logins import record_login
 from .models import UserProfile
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     """Serializer for UserProfile model."""
     
     class Meta:
@@ -16,7 +20,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     """Serializer for User model with profile information."""
     profile = UserProfileSerializer(read_only=True)
     
@@ -26,7 +30,7 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     """Serializer for user registration with password validation."""
     password = serializers.CharField(
         write_only=True,
@@ -68,3 +72,18 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop('password2')
         user = User.objects.create_user(**validated_data)
         return user
+
+
+class BatchedLoginTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token login that records ``last_login`` through the batched writer."""
+    token_class = FilteredRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_login(self.user)
+        return data
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh whose blacklist check goes through the in-process filter."""
+    token_class = FilteredRefreshToken
@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from .blacklist import prune_expired_tokens
+
+
+@shared_task
+def prune_token_blacklist(chunk_size=1000):
+    """Delete expired outstanding and blacklisted refresh tokens in chunks."""
+    deleted = prune_expired_tokens(chunk_size)
+    return f'Pruned {deleted} expired token(s)'
@@ -4,6 +4,7 @@ Views for user-related endpoints.
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.models import User
 from .serializers import UserRegistrationSerializer, UserSerializer
 
@@ -13,6 +14,8 @@ class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = [AllowAny]
     serializer_class = UserRegistrationSerializer
+    # Password hashing is CPU-heavy
+    throttle_scope = 'register'
     
     def post(self, request, *args, **kwargs):
         """Create a new user account."""
@@ -24,3 +27,8 @@ class UserRegistrationView(generics.CreateAPIView):
                 'user': UserSerializer(user).data
             }, status=status.HTTP_201_CREATED)
         return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """JWT login, throttled per client like registration (it hashes the password too)."""
+    throttle_scope = 'token'